@@ -0,0 +1,314 @@
+"""
+Load and latency benchmark for every endpoint of the API.
+
+Drives the FastAPI app from main.py either in-process (through httpx's ASGI
+transport, lifespan included) or as a real uvicorn process over HTTP, against
+a scratch SQLite database or any DATABASE_URL given. Scenarios, in order:
+
+    create          POST /api/v1/ with distinct URLs
+    redirect_hot    GET /api/v1/{code}, codes drawn from a Zipf distribution
+    redirect_cold   GET /api/v1/{code}, every code once in random order
+    list            GET /api/v1/urls, walking the keyset pages
+    delete          DELETE /api/v1/urls/{code}
+
+Each scenario reports throughput and p50/p95/p99 latency. Results are written
+as JSON; --baseline compares them with a stored run and exits with status 1
+when throughput drops or tail latency grows by more than --tolerance.
+
+Usage:
+    python benchmarks/bench_api.py --target inprocess --output results.json
+    python benchmarks/bench_api.py --target uvicorn --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import httpx
+
+EXPECTED_STATUS = {
+    "create": {201},
+    "redirect_hot": {307},
+    "redirect_cold": {307},
+    "list": {200},
+    "delete": {200},
+}
+
+# Metrics compared against the baseline, and the direction that is worse
+COMPARED_METRICS = {"throughput_rps": "lower", "p95_ms": "higher", "p99_ms": "higher"}
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": count / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if count else 0.0,
+    }
+
+
+class ZipfSampler:
+    """Draws indexes 0..n-1 with probability proportional to 1 / (rank ** s)"""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+    def sample(self) -> int:
+        return bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, requests, concurrency: int) -> dict:
+    """
+    Send (method, path, json) requests with `concurrency` requests in flight
+
+    Args:
+        client: The client bound to the app under test
+        name: Scenario name, selects the expected status codes
+        requests: List of (method, path, json_body) tuples
+        concurrency: Number of concurrent workers
+
+    Returns:
+        dict: Summary plus the responses' JSON bodies in request order
+    """
+    latencies = []
+    errors = 0
+    bodies = [None] * len(requests)
+    pending = iter(enumerate(requests))
+
+    async def worker():
+        nonlocal errors
+        for index, (method, path, body) in pending:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in EXPECTED_STATUS[name]:
+                errors += 1
+            elif method == "POST":
+                bodies[index] = response.json()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = summarize(latencies, errors, time.perf_counter() - started)
+    summary["bodies"] = bodies
+    return summary
+
+
+async def run_suite(client: httpx.AsyncClient, args) -> dict:
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time())}-{rng.randrange(10 ** 6)}"
+    results = {}
+
+    creates = [("POST", "/api/v1/", {"original_url": f"https://bench.example.com/{run_id}/{i}"}) for i in range(args.urls)]
+    created = await run_scenario(client, "create", creates, args.concurrency)
+    codes = [body["data"]["short_code"] for body in created.pop("bodies") if body]
+    results["create"] = created
+    if not codes:
+        raise RuntimeError("No short URLs were created; is the database reachable and migrated?")
+
+    zipf = ZipfSampler(len(codes), args.zipf_s, rng)
+    hot = [("GET", f"/api/v1/{codes[zipf.sample()]}", None) for _ in range(args.redirects)]
+    results["redirect_hot"] = await run_scenario(client, "redirect_hot", hot, args.concurrency)
+
+    cold_codes = rng.sample(codes, len(codes))
+    cold = [("GET", f"/api/v1/{code}", None) for code in cold_codes[:args.redirects]]
+    results["redirect_cold"] = await run_scenario(client, "redirect_cold", cold, args.concurrency)
+
+    # Collect real cursors first, starting over when the last page is reached
+    cursors, after = [], None
+    while len(cursors) < args.lists:
+        cursors.append(after)
+        path = f"/api/v1/urls?limit={args.page_size}" + (f"&after={after}" if after is not None else "")
+        after = (await client.get(path)).json().get("next_cursor")
+    pages = [("GET", f"/api/v1/urls?limit={args.page_size}" + (f"&after={cursor}" if cursor is not None else ""), None)
+             for cursor in cursors]
+    results["list"] = await run_scenario(client, "list", pages, args.concurrency)
+
+    deletes = [("DELETE", f"/api/v1/urls/{code}", None) for code in rng.sample(codes, min(args.deletes, len(codes)))]
+    results["delete"] = await run_scenario(client, "delete", deletes, args.concurrency)
+
+    for summary in results.values():
+        summary.pop("bodies", None)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_inprocess(args) -> dict:
+    import main
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_suite(client, args)
+
+
+async def run_uvicorn(args) -> dict:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--workers", str(args.workers)],
+        cwd=ROOT_DIR, env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/docs")
+                    break
+                except httpx.TransportError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.2)
+            return await run_suite(client, args)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """
+    Compare scenario metrics with a baseline run
+
+    Returns:
+        list: (scenario, metric, baseline, current, change) for every regression
+    """
+    regressions = []
+    for scenario, metrics in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        for metric, worse in COMPARED_METRICS.items():
+            before, now = previous.get(metric), metrics.get(metric)
+            if not before:
+                continue
+            change = (now - before) / before
+            if (worse == "lower" and change < -tolerance) or (worse == "higher" and change > tolerance):
+                regressions.append((scenario, metric, before, now, change))
+    return regressions
+
+
+def print_table(scenarios: dict) -> None:
+    print(f"{'scenario':<14} {'requests':>8} {'errors':>6} {'rps':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, summary in scenarios.items():
+        print(f"{name:<14} {summary['requests']:>8} {summary['errors']:>6} {summary['throughput_rps']:>10.1f} "
+              f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+
+
+def prepare_database(database_url: str) -> None:
+    if database_url.startswith("sqlite"):
+        # Scratch SQLite databases get the schema directly; servers must be migrated
+        from sqlalchemy import create_engine
+        from src.models.url import Base
+        import src.models.click  # noqa: F401
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="API load and latency benchmark")
+    parser.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--database-url", help="defaults to a scratch SQLite file")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default=os.getenv("DB_MODE", "sync"))
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--urls", type=int, default=2000, help="URLs created (and keys for the redirect scenarios)")
+    parser.add_argument("--redirects", type=int, default=5000)
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent of the hot-key scenario")
+    parser.add_argument("--lists", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--deletes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=62)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    scratch = None
+    database_url = args.database_url
+    if not database_url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        database_url = f"sqlite:///{scratch.name}"
+    # Set before main.py is imported (in-process) or inherited by uvicorn. Every
+    # request comes from one client, which per-client rate limits would throttle
+    os.environ.update(DATABASE_URL=database_url, DB_MODE=args.db_mode,
+                      LOG_MODE=os.getenv("LOG_MODE", "prod"), LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"),
+                      RATE_LIMIT_ENABLED=os.getenv("RATE_LIMIT_ENABLED", "false"))
+    prepare_database(database_url)
+
+    try:
+        runner = run_inprocess if args.target == "inprocess" else run_uvicorn
+        scenarios = asyncio.run(runner(args))
+    finally:
+        if scratch:
+            os.unlink(scratch.name)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.target,
+            "database": database_url.split(":", 1)[0],
+            "db_mode": args.db_mode,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "scenarios": scenarios,
+    }
+    print_table(scenarios)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        for key in ("target", "database", "db_mode", "workers", "concurrency"):
+            if baseline.get("meta", {}).get(key) != results["meta"][key]:
+                print(f"warning: baseline {key}={baseline.get('meta', {}).get(key)!r}, this run {key}={results['meta'][key]!r}")
+        regressions = compare(results, baseline, args.tolerance)
+        for scenario, metric, before, now, change in regressions:
+            print(f"REGRESSION {scenario}.{metric}: {before:.2f} -> {now:.2f} ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
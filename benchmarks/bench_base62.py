@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the Base62 codec (src/utils/base62.py).
+
+Measures encode and decode throughput over ids of several magnitudes, next to
+the digit-at-a-time encoder that was previously duplicated in the service and
+the repository.
+
+Usage:
+    python benchmarks/bench_base62.py [--number 200000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.base62 import BASE62_ALPHABET, decode_base62, encode_base62
+
+MAGNITUDES = {"1e3": 1_000, "1e6": 1_000_000, "1e9": 1_000_000_000, "2^31-1": 2 ** 31 - 1}
+
+
+def concat_encode_base62(num: int) -> str:
+    # Previous implementation: one division and one prepend per digit
+    if num == 0:
+        return "0"
+    result = ""
+    while num > 0:
+        result = BASE62_ALPHABET[num % 62] + result
+        num //= 62
+    return result
+
+
+def ops_per_second(func, arg, number: int, repeat: int) -> float:
+    best = min(timeit.repeat(lambda: func(arg), number=number, repeat=repeat))
+    return number / best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    args = parser.parse_args(argv)
+
+    print(f"{'id':>8} {'code':>7} {'encode/s':>12} {'concat/s':>12} {'decode/s':>12}")
+    for label, num in MAGNITUDES.items():
+        code = encode_base62(num)
+        assert decode_base62(code) == num and concat_encode_base62(num) == code
+        encode = ops_per_second(encode_base62, num, args.number, args.repeat)
+        concat = ops_per_second(concat_encode_base62, num, args.number, args.repeat)
+        decode = ops_per_second(decode_base62, code, args.number, args.repeat)
+        print(f"{label:>8} {code:>7} {encode:>12,.0f} {concat:>12,.0f} {decode:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
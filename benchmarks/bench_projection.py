@@ -0,0 +1,118 @@
+"""
+Micro-benchmark of ORM hydration versus column projection on the read paths.
+
+For the redirect, dedup and listing reads, times the previous full-entity
+query (a URL instance per row, tracked in the session's identity map) next to
+the column-only repository method, and measures the bytes allocated per
+request with tracemalloc. Runs against an in-memory SQLite database so the
+difference is the Python-side cost, not the network.
+
+Usage:
+    python benchmarks/bench_projection.py [--urls 10000] [--number 2000] [--page-size 100]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.cache.redirect_cache import CachedUrl
+from src.models.url import Base, URL
+from src.repositories.create_url_repository import CreateUrlRepository
+from src.repositories.get_all_urls_repository import GetAllUrlsRepository
+from src.repositories.redirect_to_url_repository import RedirectToUrlRepository
+from src.utils.base62 import encode_base62
+from src.utils.url_digest import url_digest
+
+
+def _populate(session_factory, count: int) -> None:
+    rows = []
+    for url_id in range(1, count + 1):
+        original_url = f"https://example.com/articles/{url_id}?utm_source=benchmark"
+        rows.append({"id": url_id, "original_url": original_url, "original_url_hash": url_digest(original_url),
+                     "short_code": encode_base62(url_id)})
+    with session_factory() as db:
+        db.execute(insert(URL), rows)
+        db.commit()
+
+
+def _scenarios(db, count: int, page_size: int):
+    redirects = RedirectToUrlRepository()
+    creates = CreateUrlRepository()
+    listing = GetAllUrlsRepository()
+    pick = random.Random(0).randint
+
+    def orm_redirect():
+        # Previous path: full entity, then a copy for the cache
+        url = redirects.get_by_short_code_and_check_expiry(db, encode_base62(pick(1, count)))
+        return CachedUrl.from_url(url)
+
+    def orm_dedup():
+        original_url = f"https://example.com/articles/{pick(1, count)}?utm_source=benchmark"
+        return db.scalar(select(URL).where(URL.original_url_hash == url_digest(original_url)).limit(1))
+
+    def orm_page():
+        after = pick(0, count - page_size)
+        return list(db.scalars(select(URL).where(URL.id > after).order_by(URL.id).limit(page_size)))
+
+    return {
+        "redirect": (orm_redirect, lambda: CachedUrl(*redirects.get_redirect(db, encode_base62(pick(1, count))))),
+        "dedup": (orm_dedup, lambda: creates.get_by_original_url(
+            db, f"https://example.com/articles/{pick(1, count)}?utm_source=benchmark")),
+        f"page/{page_size}": (orm_page, lambda: listing.get_urls_page(db, page_size, pick(0, count - page_size))),
+    }
+
+
+def _measure(db, func, number: int, repeat: int):
+    def request():
+        func()
+        # Each request gets a fresh session in the app; drop what it loaded
+        db.expunge_all()
+
+    best = min(timeit.repeat(request, number=number, repeat=repeat))
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    peak = 0
+    for _ in range(min(number, 200)):
+        func()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        db.expunge_all()
+        tracemalloc.reset_peak()
+    tracemalloc.stop()
+    return best / number * 1e6, peak
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--urls", type=int, default=10000, help="rows in the table")
+    parser.add_argument("--number", type=int, default=2000, help="requests per timing run")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs (best is reported)")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    _populate(session_factory, args.urls)
+
+    print(f"{'read':>10} {'orm µs':>9} {'cols µs':>9} {'speedup':>8} {'orm bytes':>10} {'cols bytes':>11}")
+    with session_factory() as db:
+        for name, (orm, projected) in _scenarios(db, args.urls, args.page_size).items():
+            orm_us, orm_bytes = _measure(db, orm, args.number, args.repeat)
+            cols_us, cols_bytes = _measure(db, projected, args.number, args.repeat)
+            print(f"{name:>10} {orm_us:>9.1f} {cols_us:>9.1f} {orm_us / cols_us:>7.2f}x "
+                  f"{orm_bytes:>10,} {cols_bytes:>11,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,110 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from src.api import router
+from src.api.metrics import router as metrics_router
+from src.metrics import MetricsMiddleware, instrument_engines
+from src.limits import OverloadMiddleware, RateLimitMiddleware
+from src.services.expiry_sweeper import expiry_sweeper
+from src.services.click_buffer import click_buffer
+from src.services.cdn_purger import cdn_purger
+from src.cache.short_code_filter import short_code_filter
+from src.cache.redirect_snapshot import redirect_snapshot
+from src.cache.shared_cache import shared_redirect_cache
+from src.db.config import DB_MODE, EDGE_MODE, METRICS_ENABLED, RATE_LIMIT_ENABLED, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from src.utils.log_config import configure_logging
+from src.utils.server import server_options
+from src.db.session import get_engine, dispose_engine, read_replicas
+from src.db.async_session import get_async_engine, dispose_async_engine, async_read_replicas
 import uvicorn
 import logging
+import os
 from fastapi.middleware.cors import CORSMiddleware
 
-# Enable more detailed logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed from INFO to DEBUG for more details
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# LOG_MODE=dev: verbose DEBUG console output; LOG_MODE=prod: queued JSON lines
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker process, so each opens its own engine, pools and
+    # background tasks after it has started; disposed after it stops serving
+    if EDGE_MODE:
+        # Edge nodes only map the snapshot file: no engine, no background maintenance
+        redirect_snapshot.start()
+        logging.getLogger(__name__).info("Edge worker %d ready", os.getpid())
+        yield
+        await redirect_snapshot.stop()
+        return
+    if DB_MODE == "async":
+        get_async_engine()
+        replicas = async_read_replicas
+    else:
+        get_engine()
+        replicas = read_replicas
+    replicas.start()
+    # Background maintenance runs for as long as the app serves requests
+    expiry_sweeper.start()
+    click_buffer.start()
+    short_code_filter.start()
+    cdn_purger.start()
+    shared_redirect_cache.start()
+    logging.getLogger(__name__).info("Worker %d ready", os.getpid())
+    yield
+    # Stopping the click buffer writes out the clicks still held in memory, and
+    # stopping the purger sends the CDN purges still queued
+    await shared_redirect_cache.stop()
+    await cdn_purger.stop()
+    await short_code_filter.stop()
+    await click_buffer.stop()
+    await expiry_sweeper.stop()
+    await replicas.stop()
+    await async_read_replicas.dispose()
+    read_replicas.dispose()
+    await dispose_async_engine()
+    dispose_engine()
+
+app = FastAPI(title="URL Shortener API", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="URL Shortener API", version="0.1.0")
+# Shed load before it reaches the database: over-limit clients get a 429 and
+# requests beyond the in-flight cap a 503, both inside the metrics middleware
+# so they are counted
+app.add_middleware(OverloadMiddleware)
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 
-# Add CORS middleware
+# Add CORS middleware, around the shedding middleware so browsers can read
+# their 429 and 503 responses and the Retry-After hint
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, replace with specific origins
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+if METRICS_ENABLED:
+    # Outermost middleware, so the recorded latency covers the whole stack
+    instrument_engines()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
 if __name__ == "__main__":
     logger = logging.getLogger(__name__)
 
+    # SERVE_MODE=dev: one auto-reloading process; SERVE_MODE=prod: one worker per CPU
+    options = server_options()
+    address = f"http://{options['host']}:{options['port']}"
     logger.info("Starting URL Shortener API server...")
-    logger.info("API available at: http://0.0.0.0:8000")
-    logger.info("Documentation available at: http://0.0.0.0:8000/docs")
-
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="debug"  # Changed from "info" to "debug"
-    )
\ No newline at end of file
+    logger.info("API available at: %s", address)
+    logger.info("Documentation available at: %s/docs", address)
+    if "workers" in options:
+        logger.info(
+            "Serving with %d workers (%s loop, %s parser); up to %d database connections",
+            options["workers"], options["loop"], options["http"],
+            options["workers"] * (DB_POOL_SIZE + DB_MAX_OVERFLOW),
+        )
+
+    uvicorn.run("main:app", **options)
\ No newline at end of file
@@ -2,7 +2,7 @@ from logging.config import fileConfig
 import os
 import sys
 
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, make_url, pool
 from alembic import context
 
 # Add src to path
@@ -16,6 +16,7 @@ from db.config import DATABASE_URL
 
 # Load Base for autogenerate
 from models.url import Base
+import models.click  # noqa: F401  (registers url_clicks on Base.metadata)
 
 config = context.config
 
@@ -27,12 +28,24 @@ target_metadata = Base.metadata
 # Inject the real DB URL into Alembic
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
+# On PostgreSQL, migration f3c9a1d5b720 replaced these unique (or, for
+# ix_urls_id, redundant) indexes of the urls model with the partitioned
+# table's non-unique ones, which autogenerate must not try to "restore"
+PARTITIONED_URL_INDEXES = {"ix_urls_id", "ix_urls_short_code", "ix_urls_original_url_hash"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if make_url(DATABASE_URL).get_backend_name() != "postgresql":
+        return True
+    return not (type_ == "index" and object.table.name == "urls" and name in PARTITIONED_URL_INDEXES)
+
 
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -47,7 +60,9 @@ def run_migrations_online():
         poolclass=pool.NullPool,
     )
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection, target_metadata=target_metadata, include_object=include_object
+        )
 
         with context.begin_transaction():
             context.run_migrations()
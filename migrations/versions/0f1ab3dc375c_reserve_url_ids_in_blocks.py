@@ -0,0 +1,33 @@
+"""Reserve URL ids in blocks from urls_id_seq
+
+Revision ID: 0f1ab3dc375c
+Revises: 76643119b800
+Create Date: 2026-10-17 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from db.config import ID_BLOCK_SIZE
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f1ab3dc375c'
+down_revision: Union[str, Sequence[str], None] = '76643119b800'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every nextval() now reserves ID_BLOCK_SIZE ids for the caller. Inserts that
+    # still rely on the column default simply consume a whole block each.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(f"ALTER SEQUENCE urls_id_seq INCREMENT BY {int(ID_BLOCK_SIZE)}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER SEQUENCE urls_id_seq INCREMENT BY 1")
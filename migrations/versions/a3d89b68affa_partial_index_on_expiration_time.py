@@ -0,0 +1,36 @@
+"""Partial index on urls.expiration_time for the expiry sweeper
+
+Revision ID: a3d89b68affa
+Revises: a86137ad92ad
+Create Date: 2026-10-17 13:41:09.227614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d89b68affa'
+down_revision: Union[str, Sequence[str], None] = 'a86137ad92ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently, outside the migration transaction, so writes continue
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_urls_expiration_time', 'urls', ['expiration_time'],
+            unique=False,
+            postgresql_where=sa.text("expiration_time IS NOT NULL"),
+            sqlite_where=sa.text("expiration_time IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_urls_expiration_time', table_name='urls')
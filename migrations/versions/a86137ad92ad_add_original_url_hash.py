@@ -0,0 +1,83 @@
+"""Add indexed original_url_hash for deduplication
+
+Revision ID: a86137ad92ad
+Revises: 0f1ab3dc375c
+Create Date: 2026-10-17 11:03:27.918254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.url_digest import url_digest
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a86137ad92ad'
+down_revision: Union[str, Sequence[str], None] = '0f1ab3dc375c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_url_hashes(connection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Fill original_url_hash in id order, one short transaction per batch.
+    Rows whose digest is already taken (duplicates created before dedup was
+    race-free) keep a NULL hash: they still redirect, they just never serve
+    as the dedup target.
+    """
+    last_id = 0
+    updated = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, original_url FROM urls WHERE id > :last_id "
+                "ORDER BY id LIMIT :batch_size"
+            ),
+            {"last_id": last_id, "batch_size": batch_size},
+        ).all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+
+        digests = {}
+        for row in rows:
+            digests.setdefault(url_digest(row.original_url), row.id)
+        taken = set(connection.execute(
+            sa.text("SELECT original_url_hash FROM urls WHERE original_url_hash IN :digests")
+            .bindparams(sa.bindparam("digests", expanding=True)),
+            {"digests": list(digests)},
+        ).scalars())
+        params = [
+            {"id": row_id, "digest": digest}
+            for digest, row_id in digests.items()
+            if digest not in taken
+        ]
+        if params:
+            connection.execute(
+                sa.text("UPDATE urls SET original_url_hash = :digest WHERE id = :id"),
+                params,
+            )
+            updated += len(params)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('urls', sa.Column('original_url_hash', sa.String(length=64), nullable=True))
+    # Backfill and index outside the migration transaction so each batch commits
+    # on its own and the index build does not block writers
+    with op.get_context().autocommit_block():
+        backfill_url_hashes(op.get_bind())
+        op.create_index(
+            op.f('ix_urls_original_url_hash'), 'urls', ['original_url_hash'],
+            unique=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_urls_original_url_hash'), table_name='urls')
+    op.drop_column('urls', 'original_url_hash')
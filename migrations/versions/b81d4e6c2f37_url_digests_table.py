@@ -0,0 +1,50 @@
+"""Add url_digests, the unique digest index of the partitioned urls table
+
+Revision ID: b81d4e6c2f37
+Revises: f3c9a1d5b720
+Create Date: 2026-10-18 10:14:37.528461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d4e6c2f37'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a1d5b720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'url_digests',
+        sa.Column('original_url_hash', sa.String(length=64), nullable=False),
+        sa.Column('url_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('short_code', sa.String(length=10), nullable=False),
+        sa.Column('expiration_time', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('original_url_hash'),
+    )
+    op.create_index(
+        'ix_url_digests_expiration_time', 'url_digests', ['expiration_time'],
+        unique=False, postgresql_where=sa.text('expiration_time IS NOT NULL'),
+        sqlite_where=sa.text('expiration_time IS NOT NULL'),
+    )
+    # Only the partitioned table (PostgreSQL) dedups through url_digests. Each
+    # digest goes to its oldest row, the one creates have been returning
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "INSERT INTO url_digests (original_url_hash, url_id, created_at, short_code, expiration_time) "
+            "SELECT DISTINCT ON (original_url_hash) original_url_hash, id, created_at, short_code, expiration_time "
+            "FROM urls WHERE original_url_hash IS NOT NULL ORDER BY original_url_hash, id"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_url_digests_expiration_time', table_name='url_digests')
+    op.drop_table('url_digests')
@@ -0,0 +1,34 @@
+"""Add url_clicks table for aggregated click counts
+
+Revision ID: c51e0a7d93b2
+Revises: a3d89b68affa
+Create Date: 2026-10-17 15:02:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51e0a7d93b2'
+down_revision: Union[str, Sequence[str], None] = 'a3d89b68affa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'url_clicks',
+        sa.Column('short_code', sa.String(length=10), nullable=False),
+        sa.Column('clicks', sa.BigInteger(), nullable=False),
+        sa.Column('last_clicked_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('short_code'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('url_clicks')
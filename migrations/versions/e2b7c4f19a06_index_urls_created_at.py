@@ -0,0 +1,33 @@
+"""Index urls.created_at for incremental short code filter refreshes
+
+Revision ID: e2b7c4f19a06
+Revises: c51e0a7d93b2
+Create Date: 2026-10-17 16:27:51.803114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c4f19a06'
+down_revision: Union[str, Sequence[str], None] = 'c51e0a7d93b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently, outside the migration transaction, so writes continue
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_urls_created_at'), 'urls', ['created_at'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_urls_created_at'), table_name='urls')
@@ -0,0 +1,126 @@
+"""Range-partition urls by created_at, one partition per day
+
+Revision ID: f3c9a1d5b720
+Revises: e2b7c4f19a06
+Create Date: 2026-10-17 18:42:09.331507
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.config import URL_PARTITION_PRECREATE_DAYS
+from utils.url_partitions import DEFAULT_PARTITION, create_partition_sql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a1d5b720'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c4f19a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes the rebuilt table gets under the same names as before
+_INDEXES = (
+    'ix_urls_id',
+    'ix_urls_short_code',
+    'ix_urls_original_url_hash',
+    'ix_urls_created_at',
+    'ix_urls_expiration_time',
+)
+
+_COLUMNS = "id, original_url, original_url_hash, short_code, created_at, expiration_time"
+
+
+def _url_columns():
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('urls_id_seq')"),
+                  autoincrement=False, nullable=False),
+        sa.Column('original_url', sa.String(), nullable=False),
+        sa.Column('original_url_hash', sa.String(length=64), nullable=True),
+        sa.Column('short_code', sa.String(length=10), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expiration_time', sa.DateTime(), nullable=True),
+    ]
+
+
+def _set_aside(old_name: str) -> None:
+    """Rename urls, its primary key and its indexes out of the way of the new table"""
+    # urls_id_seq outlives the old table and keeps handing out the same ids
+    op.execute("ALTER SEQUENCE urls_id_seq OWNED BY NONE")
+    op.rename_table('urls', old_name)
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT urls_pkey TO {old_name}_pkey")
+    for name in _INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_{old_name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partitioning is PostgreSQL only; SQLite keeps the plain table
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # One transaction: urls stays locked from the rename until the commit, so
+    # no write is lost while rows are copied (run it when traffic is low)
+    _set_aside('urls_unpartitioned')
+
+    # A partitioned table can only enforce uniqueness on keys that contain the
+    # partition key, so id, short_code and the digest lose their global unique
+    # indexes. Generated codes stay unique through urls_id_seq, and creates
+    # dedup through the url_digests table instead (b81d4e6c2f37)
+    op.create_table(
+        'urls', *_url_columns(),
+        sa.PrimaryKeyConstraint('id', 'created_at', name='urls_pkey'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index('ix_urls_short_code', 'urls', ['short_code'], unique=False)
+    op.create_index('ix_urls_original_url_hash', 'urls', ['original_url_hash'], unique=False)
+    op.create_index('ix_urls_created_at', 'urls', ['created_at'], unique=False)
+    op.create_index(
+        'ix_urls_expiration_time', 'urls', ['expiration_time'],
+        unique=False, postgresql_where=sa.text('expiration_time IS NOT NULL'),
+    )
+    # (ix_urls_id is not recreated: the primary key starts with id)
+
+    connection = op.get_bind()
+    days = set(connection.execute(sa.text("SELECT DISTINCT created_at::date FROM urls_unpartitioned")).scalars())
+    today = datetime.utcnow().date()
+    days.update(today + timedelta(days=offset) for offset in range(URL_PARTITION_PRECREATE_DAYS + 1))
+    for day in sorted(days):
+        op.execute(create_partition_sql(day))
+    # Catches rows outside every daily partition, should the maintenance
+    # command not run for longer than URL_PARTITION_PRECREATE_DAYS
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF urls DEFAULT")
+
+    op.execute(f"INSERT INTO urls ({_COLUMNS}) SELECT {_COLUMNS} FROM urls_unpartitioned")
+    op.drop_table('urls_unpartitioned')
+    op.execute("ALTER SEQUENCE urls_id_seq OWNED BY urls.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _set_aside('urls_partitioned')
+
+    op.create_table('urls', *_url_columns(), sa.PrimaryKeyConstraint('id', name='urls_pkey'))
+    # Duplicates of a URL created while the digest was not unique keep a NULL
+    # hash, as in the original backfill: they redirect but are never the dedup target
+    op.execute(
+        f"INSERT INTO urls ({_COLUMNS}) "
+        "SELECT id, original_url, "
+        "CASE WHEN row_number() OVER (PARTITION BY original_url_hash ORDER BY id) = 1 "
+        "THEN original_url_hash END, short_code, created_at, expiration_time "
+        "FROM urls_partitioned"
+    )
+    op.create_index(op.f('ix_urls_id'), 'urls', ['id'], unique=False)
+    op.create_index(op.f('ix_urls_short_code'), 'urls', ['short_code'], unique=True)
+    op.create_index(op.f('ix_urls_original_url_hash'), 'urls', ['original_url_hash'], unique=True)
+    op.create_index(op.f('ix_urls_created_at'), 'urls', ['created_at'], unique=False)
+    op.create_index(
+        'ix_urls_expiration_time', 'urls', ['expiration_time'],
+        unique=False, postgresql_where=sa.text('expiration_time IS NOT NULL'),
+    )
+    # Dropping the partitioned table drops its partitions
+    op.drop_table('urls_partitioned')
+    op.execute("ALTER SEQUENCE urls_id_seq OWNED BY urls.id")
@@ -1,7 +1,16 @@
 from fastapi import APIRouter
-from src.api.urls import router as urls_router
+from src.db.config import DB_MODE, EDGE_MODE
+from src.api.stats import router as stats_router
+
+if EDGE_MODE:
+    from src.api.edge import router as urls_router
+elif DB_MODE == "async":
+    from src.api.async_urls import router as urls_router
+else:
+    from src.api.urls import router as urls_router
 
 router = APIRouter()
 
 # Include the URL endpoints
-router.include_router(urls_router)
\ No newline at end of file
+router.include_router(urls_router)
+router.include_router(stats_router)
@@ -0,0 +1,94 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from src.db.async_session import get_async_db, get_async_read_db, get_async_read_sessionmaker, get_async_sessionmaker
+from src.db.replicas import remember_write, wrote_recently
+from src.db.config import URLS_PAGE_SIZE, URLS_PAGE_MAX
+from src.controllers.url_controller import async_url_controller
+from src.schemas.url import URLShortenRequest, URLShortenResponse, URLBatchResponse
+from src.api.urls import redirect_response, read_batch_items, batch_json_response, STREAM_MEDIA_TYPES
+import logging
+
+# Same routes as src/api/urls.py, served from an AsyncSession (DB_MODE=async) so
+# database I/O never blocks the event loop
+router = APIRouter(tags=["URLs"])
+
+logger = logging.getLogger(__name__)
+
+@router.post("/", response_model=URLShortenResponse, status_code=201)
+async def create_short_url(request: URLShortenRequest, http_request: Request, response: Response,
+                           db: AsyncSession = Depends(get_async_db)):
+    remember_write(response)
+    base_url = f"{str(http_request.base_url).rstrip('/')}/api/v1"
+    return await async_url_controller.shorten_url(db, request, base_url)
+
+@router.post("/batch", response_model=URLBatchResponse)
+async def create_short_urls_batch(http_request: Request, db: AsyncSession = Depends(get_async_db)):
+    try:
+        items = await read_batch_items(http_request)
+    except HTTPException as e:
+        return JSONResponse(content={"status": "failure", "message": e.detail}, status_code=e.status_code)
+    base_url = f"{str(http_request.base_url).rstrip('/')}/api/v1"
+    response = batch_json_response(await async_url_controller.shorten_urls_batch(db, items, base_url))
+    remember_write(response)
+    return response
+
+async def _stream_all_urls(base_url: str, fmt: str, after: Optional[int], prefer_primary: bool):
+    # The stream outlives the request-scoped session, so it owns its own
+    async with (get_async_read_sessionmaker(prefer_primary) or get_async_sessionmaker())() as db:
+        async for chunk in async_url_controller.stream_urls(db, base_url, fmt, after):
+            yield chunk
+
+@router.get("/urls")
+async def get_all_urls(
+    request: Request,
+    limit: int = Query(URLS_PAGE_SIZE, ge=1, le=URLS_PAGE_MAX),
+    after: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every URL after the cursor instead of one page"),
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
+):
+    base_url = f"{str(request.base_url).rstrip('/')}/api/v1"
+    if stream:
+        return StreamingResponse(
+            _stream_all_urls(base_url, stream, after, wrote_recently(request.cookies)),
+            media_type=STREAM_MEDIA_TYPES[stream]
+        )
+    result = await async_url_controller.get_urls_page(read_db, base_url, limit, after)
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR if result.status == "failure" else status.HTTP_200_OK
+    return JSONResponse(content=result.model_dump(mode='json'), status_code=status_code)
+
+@router.get("/{short_code}")
+async def redirect_to_original_url(short_code: str, request: Request, db: AsyncSession = Depends(get_async_db),
+                                   read_db: AsyncSession = Depends(get_async_read_db)):
+    logger.debug("Redirect endpoint called with short_code: %s", short_code)
+    try:
+        url = await async_url_controller.get_original_url_by_code(
+            db, short_code, read_db, wrote_recently(request.cookies)
+        )
+        logger.debug("Found URL in database: %s", url)
+        return redirect_response(short_code, url, request.headers)
+    except HTTPException as e:
+        logger.error("HTTPException in redirect endpoint: %s", e)
+        return JSONResponse(
+            content={"status": "failure", "message": "URL not found"},
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        logger.error("Exception in redirect endpoint: %s", e)
+        return JSONResponse(
+            content={"status": "failure", "message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@router.delete("/urls/{short_code}")
+async def delete_url(short_code: str, db: AsyncSession = Depends(get_async_db)):
+    try:
+        content, code = await async_url_controller.delete_url(db, short_code)
+        response = JSONResponse(content=content, status_code=code)
+        remember_write(response)
+        return response
+    except HTTPException as e:
+        return JSONResponse(content={"status": "failure", "message": e.detail}, status_code=e.status_code)
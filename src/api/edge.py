@@ -0,0 +1,29 @@
+import time
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import Request
+from src.cache.redirect_snapshot import redirect_snapshot
+from src.db.config import REDIRECT_STATUS_CODE
+from src.utils.http_cache import redirect_headers, not_modified
+
+# Redirect-only routes of an edge node (EDGE_MODE): answered from the mmap'd
+# snapshot, with no database, cache or click counting behind them
+router = APIRouter(tags=["Edge"])
+
+@router.get("/{short_code}")
+async def redirect_from_snapshot(short_code: str, request: Request):
+    entry = redirect_snapshot.lookup_entry(short_code)
+    if entry is None:
+        return JSONResponse(
+            content={"status": "failure", "message": "URL not found"},
+            status_code=status.HTTP_404_NOT_FOUND,
+            headers={"cache-control": "no-store"}
+        )
+    # Snapshot targets are canonical, like the stored URLs they were exported from
+    target, expires = entry
+    headers = redirect_headers(short_code, target, expires - time.time() if expires is not None else None,
+                               expiration_time=expires)
+    if not_modified(request.headers, headers["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(status_code=REDIRECT_STATUS_CODE, headers=headers)
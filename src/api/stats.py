@@ -0,0 +1,69 @@
+from fastapi import APIRouter
+
+from src.cache.redirect_cache import redirect_cache
+from src.cache.redirect_snapshot import redirect_snapshot
+from src.cache.shared_cache import shared_redirect_cache
+from src.cache.short_code_filter import short_code_filter
+from src.db.async_session import current_async_engine, async_read_replicas
+from src.db.pool import pool_stats
+from src.db.session import current_engine, read_replicas
+from src.limits import create_limiter, redirect_limiter, overload_limiter
+from src.services.expiry_sweeper import expiry_sweeper
+from src.services.click_buffer import click_buffer
+from src.services.cdn_purger import cdn_purger
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+@router.get("/cache")
+async def get_cache_stats():
+    return {"status": "success", "data": redirect_cache.stats()}
+
+@router.get("/shared-cache")
+async def get_shared_cache_stats():
+    return {"status": "success", "data": shared_redirect_cache.stats()}
+
+@router.get("/sweeper")
+async def get_sweeper_stats():
+    return {"status": "success", "data": expiry_sweeper.stats()}
+
+@router.get("/clicks")
+async def get_click_stats():
+    return {"status": "success", "data": click_buffer.stats()}
+
+@router.get("/pool")
+async def get_pool_stats():
+    engines = {
+        "sync": current_engine(), "async": current_async_engine(),
+        **read_replicas.open_engines(), **async_read_replicas.open_engines(),
+    }
+    return {
+        "status": "success",
+        "data": {name: pool_stats(engine) for name, engine in engines.items() if engine is not None}
+    }
+
+@router.get("/filter")
+async def get_filter_stats():
+    return {"status": "success", "data": short_code_filter.stats()}
+
+@router.get("/replicas")
+async def get_replica_stats():
+    return {"status": "success", "data": {"sync": read_replicas.stats(), "async": async_read_replicas.stats()}}
+
+@router.get("/snapshot")
+async def get_snapshot_stats():
+    return {"status": "success", "data": redirect_snapshot.stats()}
+
+@router.get("/limits")
+async def get_limit_stats():
+    return {
+        "status": "success",
+        "data": {
+            "create": create_limiter.stats(),
+            "redirect": redirect_limiter.stats(),
+            "overload": overload_limiter.stats(),
+        }
+    }
+
+@router.get("/purges")
+async def get_purge_stats():
+    return {"status": "success", "data": cdn_purger.stats()}
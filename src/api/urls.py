@@ -1,121 +1,174 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse, RedirectResponse
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
-from src.db.session import get_db
-from src.controllers.url_controller import URLController
-from src.schemas.url import URLShortenRequest, URLShortenResponse, URLResponse, GetAllUrlsResponse
+from src.db.config import BATCH_MAX_ITEMS, URLS_PAGE_SIZE, URLS_PAGE_MAX, REDIRECT_STATUS_CODE
+from src.db.replicas import remember_write, wrote_recently
+from src.db.session import get_db, get_read_db, get_read_sessionmaker, get_sessionmaker
+from src.controllers.url_controller import url_controller
+from src.services.click_buffer import click_buffer
+from src.utils.http_cache import redirect_headers, not_modified, seconds_until
+from src.schemas.url import URLShortenRequest, URLShortenResponse, URLResponse, GetAllUrlsResponse, URLBatchResponse
+import json
 
 router = APIRouter(tags=["URLs"])
 
+# Endpoints using the blocking session are plain functions so FastAPI runs them in
+# its threadpool; waiting for a pooled connection must not stall the event loop,
+# which other requests need in order to return theirs
 @router.post("/", response_model=URLShortenResponse, status_code=201)
-async def create_short_url(request: URLShortenRequest, http_request: Request, db: Session = Depends(get_db)):
-    controller = URLController(db)
+def create_short_url(request: URLShortenRequest, http_request: Request, response: Response, db: Session = Depends(get_db)):
+    remember_write(response)
     base_url = f"{str(http_request.base_url).rstrip('/')}/api/v1"
-    return controller.shorten_url(request, base_url)
+    return url_controller.shorten_url(db, request, base_url)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def _too_many_items() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"A batch may contain at most {BATCH_MAX_ITEMS} items"
+    )
+
+def _parse_ndjson_line(items: list, line: bytes) -> None:
+    if line.strip():
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            # Reported as a per-item failure rather than rejecting the whole batch
+            items.append(ValueError(f"Invalid JSON: {e}"))
+
+async def read_batch_items(request: Request) -> list:
+    """
+    Read batch items from a JSON array, a {"items": [...]} object or an NDJSON stream
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    items = []
+    if content_type in NDJSON_CONTENT_TYPES:
+        pending = b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                _parse_ndjson_line(items, line)
+            if len(items) > BATCH_MAX_ITEMS:
+                raise _too_many_items()
+        _parse_ndjson_line(items, pending)
+    else:
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request body must be a JSON array or NDJSON")
+        items = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(items, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request body must be a JSON array or NDJSON")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise _too_many_items()
+    return items
+
+def batch_json_response(result: URLBatchResponse) -> JSONResponse:
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR if result.status == "failure" and not result.data else status.HTTP_200_OK
+    return JSONResponse(content=result.model_dump(mode='json'), status_code=status_code)
+
+@router.post("/batch", response_model=URLBatchResponse)
+async def create_short_urls_batch(http_request: Request, db: Session = Depends(get_db)):
+    try:
+        items = await read_batch_items(http_request)
+    except HTTPException as e:
+        return JSONResponse(content={"status": "failure", "message": e.detail}, status_code=e.status_code)
+    base_url = f"{str(http_request.base_url).rstrip('/')}/api/v1"
+    # A large batch keeps the database busy for a while; keep it off the event loop
+    result = await run_in_threadpool(url_controller.shorten_urls_batch, db, items, base_url)
+    response = batch_json_response(result)
+    remember_write(response)
+    return response
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+def _stream_all_urls(base_url: str, fmt: str, after: Optional[int], prefer_primary: bool):
+    # The stream outlives the request-scoped session, so it owns its own
+    db = (get_read_sessionmaker(prefer_primary) or get_sessionmaker())()
+    try:
+        yield from url_controller.stream_urls(db, base_url, fmt, after)
+    finally:
+        db.close()
 
 @router.get("/urls")
-async def get_all_urls(request: Request, db: Session = Depends(get_db)):
-    controller = URLController(db)
+def get_all_urls(
+    request: Request,
+    limit: int = Query(URLS_PAGE_SIZE, ge=1, le=URLS_PAGE_MAX),
+    after: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream every URL after the cursor instead of one page"),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
+):
     base_url = f"{str(request.base_url).rstrip('/')}/api/v1"
-    result = controller.get_all_urls(base_url)
+    if stream:
+        return StreamingResponse(
+            _stream_all_urls(base_url, stream, after, wrote_recently(request.cookies)),
+            media_type=STREAM_MEDIA_TYPES[stream]
+        )
+    result = url_controller.get_urls_page(read_db, base_url, limit, after)
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR if result.status == "failure" else status.HTTP_200_OK
     return JSONResponse(content=result.model_dump(mode='json'), status_code=status_code)
 
-import re
 import logging
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-def validate_and_fix_url(url: str) -> str:
+def redirect_response(short_code: str, url, request_headers=None):
     """
-    Validate and fix URL to ensure it has proper protocol for redirect
+    Build the redirect (or not-found) response for a looked-up short code.
+    Stored URLs are already canonical (see src.utils.url_validator), so the
+    target is sent as-is without validating or re-escaping it. Redirects carry
+    Cache-Control and validators (see src.utils.http_cache); a conditional
+    request for an unchanged link is answered 304 without a body
     """
-    if not url:
-        return url
-
-    # Add protocol if missing
-    if not url.startswith(('http://', 'https://')):
-        url = 'http://' + url
-
-    # Basic URL validation
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:'
-        r'(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-        r'localhost|'  # localhost
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'  # ...or ip
-        r')'
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE
+    if url and url.original_url:
+        logger.debug("Performing redirect to: %s", url.original_url)
+        click_buffer.record(short_code)
+        headers = redirect_headers(short_code, url.original_url, seconds_until(url.expiration_time),
+                                   url.created_at, url.expiration_time)
+        if request_headers is not None and not_modified(request_headers, headers["etag"], url.created_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(status_code=REDIRECT_STATUS_CODE, headers=headers)
+    logger.debug("No URL found for short_code: %s", short_code)
+    # Not cached: the code may be created (or a lagging replica catch up) any moment
+    return JSONResponse(
+        content={"status": "failure", "message": "URL not found"},
+        status_code=status.HTTP_404_NOT_FOUND,
+        headers={"cache-control": "no-store"}
     )
 
-    if url_pattern.match(url):
-        return url
-    else:
-        # If URL is still invalid after adding protocol, return None to indicate failure
-        return None
-
-from urllib.parse import urlparse
-
-def is_valid_url(url: str) -> bool:
-    """
-    Check if the URL is valid by parsing it
-    """
-    try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except Exception:
-        return False
-
 @router.get("/{short_code}")
-async def redirect_to_original_url(short_code: str, db: Session = Depends(get_db)):
-    logger.debug(f"Redirect endpoint called with short_code: {short_code}")
-    controller = URLController(db)
+def redirect_to_original_url(short_code: str, request: Request, db: Session = Depends(get_db),
+                             read_db: Session = Depends(get_read_db)):
+    logger.debug("Redirect endpoint called with short_code: %s", short_code)
     try:
-        url = controller.get_original_url_by_code(short_code)
-        logger.debug(f"Found URL in database: {url}")
-        if url and url.original_url:
-            logger.debug(f"Original URL to redirect to: {url.original_url}")
-            # Validate and sanitize the URL before redirecting
-            fixed_url = validate_and_fix_url(url.original_url)
-            logger.debug(f"Fixed URL: {fixed_url}")
-            if fixed_url and is_valid_url(fixed_url):
-                # Using 307 Temporary Redirect to preserve HTTP method
-                logger.debug(f"Performing redirect to: {fixed_url}")
-                return RedirectResponse(url=fixed_url, status_code=307)
-            else:
-                # If URL is invalid, treat as not found
-                logger.debug(f"Invalid URL detected (fixed_url: {fixed_url}, is_valid: {fixed_url and is_valid_url(fixed_url)}), returning failure response")
-                return JSONResponse(
-                    content={"status": "failure", "message": f"URL not found or invalid: {url.original_url}"},
-                    status_code=status.HTTP_404_NOT_FOUND
-                )
-        else:
-            logger.debug(f"No URL found for short_code: {short_code}")
-            return JSONResponse(
-                content={"status": "failure", "message": "URL not found"},
-                status_code=status.HTTP_404_NOT_FOUND
-            )
+        url = url_controller.get_original_url_by_code(db, short_code, read_db, wrote_recently(request.cookies))
+        logger.debug("Found URL in database: %s", url)
+        return redirect_response(short_code, url, request.headers)
     except HTTPException as e:
-        logger.error(f"HTTPException in redirect endpoint: {str(e)}")
+        logger.error("HTTPException in redirect endpoint: %s", e)
         return JSONResponse(
             content={"status": "failure", "message": "URL not found"},
             status_code=status.HTTP_404_NOT_FOUND
         )
     except Exception as e:
-        logger.error(f"Exception in redirect endpoint: {str(e)}")
+        logger.error("Exception in redirect endpoint: %s", e)
         return JSONResponse(
             content={"status": "failure", "message": str(e)},
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 @router.delete("/urls/{short_code}")
-async def delete_url(short_code: str, db: Session = Depends(get_db)):
-    controller = URLController(db)
+def delete_url(short_code: str, db: Session = Depends(get_db)):
     try:
-        response, code = controller.delete_url(short_code)
-        return JSONResponse(content=response, status_code=code)
+        content, code = url_controller.delete_url(db, short_code)
+        response = JSONResponse(content=content, status_code=code)
+        remember_write(response)
+        return response
     except HTTPException as e:
         return JSONResponse(content={"status": "failure", "message": e.detail}, status_code=e.status_code)
@@ -0,0 +1,19 @@
+from .redirect_cache import CachedUrl, RedirectCache, redirect_cache
+from .short_code_filter import BloomFilter, ShortCodeFilter, short_code_filter
+from .redirect_snapshot import RedirectSnapshot, SnapshotReader, redirect_snapshot, write_snapshot
+from .shared_cache import SharedRedirectCache, shared_redirect_cache
+
+__all__ = [
+    "CachedUrl",
+    "RedirectCache",
+    "redirect_cache",
+    "BloomFilter",
+    "ShortCodeFilter",
+    "short_code_filter",
+    "RedirectSnapshot",
+    "SnapshotReader",
+    "redirect_snapshot",
+    "write_snapshot",
+    "SharedRedirectCache",
+    "shared_redirect_cache"
+]
@@ -0,0 +1,198 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional
+
+from src.db.config import (
+    REDIRECT_CACHE_MAX_ENTRIES,
+    REDIRECT_CACHE_MAX_BYTES,
+    REDIRECT_CACHE_TTL_SECONDS,
+    REDIRECT_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+# Rough per-entry cost of the OrderedDict node, the entry tuple and the CachedUrl
+# object itself, on top of the key and URL strings that are measured exactly
+ENTRY_OVERHEAD_BYTES = 240
+
+
+class CachedUrl:
+    """Session-independent copy of the URL columns the redirect path reads"""
+
+    __slots__ = ("short_code", "original_url", "created_at", "expiration_time")
+
+    def __init__(self, short_code: str, original_url: str, created_at: datetime,
+                 expiration_time: Optional[datetime] = None):
+        self.short_code = short_code
+        self.original_url = original_url
+        self.created_at = created_at
+        self.expiration_time = expiration_time
+
+    @classmethod
+    def from_url(cls, url) -> "CachedUrl":
+        """
+        Copy the redirect columns out of a URL row
+
+        Args:
+            url: The URL object loaded from the database
+
+        Returns:
+            CachedUrl: A detached copy that is safe to share between requests
+        """
+        return cls(url.short_code, url.original_url, url.created_at, url.expiration_time)
+
+
+class RedirectCache:
+    """
+    Bounded LRU cache of short code lookups with per-entry TTLs.
+
+    Positive entries never outlive the row's expiration_time, and unknown or
+    expired codes are remembered as misses for a short negative TTL.
+    """
+
+    # Returned by get() when the cache has no answer for a short code
+    MISS = object()
+
+    def __init__(self, max_entries: int = REDIRECT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = REDIRECT_CACHE_MAX_BYTES,
+                 ttl_seconds: float = REDIRECT_CACHE_TTL_SECONDS,
+                 negative_ttl_seconds: float = REDIRECT_CACHE_NEGATIVE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # short_code -> (value, deadline, size); value is None for cached misses
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, short_code: str):
+        """
+        Look up a short code
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            CachedUrl for a cached link, None for a cached miss, or RedirectCache.MISS
+            if the database has to be consulted
+        """
+        with self._lock:
+            entry = self._entries.get(short_code)
+            if entry is None:
+                self.misses += 1
+                return self.MISS
+            value, deadline, size = entry
+            if self._clock() >= deadline:
+                del self._entries[short_code]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return self.MISS
+            self._entries.move_to_end(short_code)
+            self.hits += 1
+            return value
+
+    def put(self, url) -> CachedUrl:
+        """
+        Cache a URL row found in the database
+
+        Args:
+            url: The URL object (or CachedUrl) to cache
+
+        Returns:
+            CachedUrl: The cached copy of the row
+        """
+        cached = url if isinstance(url, CachedUrl) else CachedUrl.from_url(url)
+        ttl = self.ttl_seconds
+        if cached.expiration_time is not None:
+            ttl = min(ttl, (cached.expiration_time - datetime.utcnow()).total_seconds())
+        if ttl > 0:
+            size = (ENTRY_OVERHEAD_BYTES + sys.getsizeof(cached.short_code)
+                    + sys.getsizeof(cached.original_url))
+            self._store(cached.short_code, cached, ttl, size)
+        return cached
+
+    def put_missing(self, short_code: str) -> None:
+        """
+        Remember that a short code does not resolve to a live link
+
+        Args:
+            short_code: The short code that was not found or is expired
+        """
+        if self.negative_ttl_seconds > 0:
+            self._store(short_code, None, self.negative_ttl_seconds,
+                        ENTRY_OVERHEAD_BYTES + sys.getsizeof(short_code))
+
+    def invalidate(self, short_code: str) -> None:
+        """
+        Drop any cached answer for a short code
+
+        Args:
+            short_code: The short code that was created or deleted
+        """
+        with self._lock:
+            entry = self._entries.pop(short_code, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Snapshot of the cache counters
+
+        Returns:
+            dict: Hit/miss/eviction counters and the current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _store(self, short_code: str, value, ttl: float, size: int) -> None:
+        if not self.enabled or size > self.max_bytes:
+            return
+        deadline = self._clock() + ttl
+        with self._lock:
+            previous = self._entries.pop(short_code, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[short_code] = (value, deadline, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+
+# Process-wide cache shared by every request handled by this worker
+redirect_cache = RedirectCache()
@@ -0,0 +1,292 @@
+import asyncio
+import calendar
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from src.db.config import REDIRECT_SNAPSHOT_PATH, REDIRECT_SNAPSHOT_POLL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# File layout, all little-endian:
+#   header  (64 bytes)  magic, version, record size, record count, heap offset,
+#                       heap size, creation time
+#   index   (count * 32 bytes) one record per code, sorted by the code's bytes:
+#                       code (16 bytes, NUL-padded), URL offset in the heap (u64),
+#                       URL length (u32), expiry as Unix seconds (u32, 0 = never)
+#   heap    the UTF-8 redirect targets, back to back
+MAGIC = b"URLSNAP1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQd16x")
+RECORD = struct.Struct("<16sQII")
+KEY_SIZE = 16
+NO_EXPIRY = 0
+MAX_EXPIRY = 0xFFFFFFFF
+
+
+def _expiry_seconds(expiration_time: Optional[datetime]) -> int:
+    if expiration_time is None:
+        return NO_EXPIRY
+    # Stored datetimes are naive UTC
+    return min(max(calendar.timegm(expiration_time.utctimetuple()), 1), MAX_EXPIRY)
+
+
+def write_snapshot(rows: Iterable[Tuple[str, str, Optional[datetime]]], path: str) -> dict:
+    """
+    Write a snapshot file and atomically put it in place of `path`
+
+    Readers holding the previous file keep their mapping until they swap, so
+    a snapshot can be replaced while edge workers serve from it.
+
+    Args:
+        rows: (short_code, original_url, expiration_time) sorted by the
+              short code's UTF-8 bytes, without duplicates
+        path: Destination file
+
+    Returns:
+        dict: Record count and file size
+
+    Raises:
+        ValueError: If a code is longer than 16 bytes or rows are not sorted
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temporary = f"{path}.tmp-{os.getpid()}"
+    count = heap_size = 0
+    previous = b""
+    try:
+        with open(temporary, "wb") as out, tempfile.TemporaryFile(dir=directory) as heap:
+            out.write(b"\0" * HEADER.size)
+            for short_code, original_url, expiration_time in rows:
+                key = short_code.encode("utf-8")
+                if len(key) > KEY_SIZE:
+                    raise ValueError(f"Short code longer than {KEY_SIZE} bytes: {short_code!r}")
+                key = key.ljust(KEY_SIZE, b"\0")
+                if key <= previous:
+                    raise ValueError(f"Rows are not sorted by short code at {short_code!r}")
+                url = original_url.encode("utf-8")
+                out.write(RECORD.pack(key, heap_size, len(url), _expiry_seconds(expiration_time)))
+                heap.write(url)
+                heap_size += len(url)
+                count += 1
+                previous = key
+            heap.seek(0)
+            shutil.copyfileobj(heap, out)
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, VERSION, RECORD.size, count, HEADER.size + count * RECORD.size,
+                                  heap_size, time.time()))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+    return {"records": count, "bytes": HEADER.size + count * RECORD.size + heap_size}
+
+
+class SnapshotReader:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Opening only maps the file and checks the header, so it takes the same
+    time for any table size. Pages are loaded on demand and shared through the
+    page cache by every process mapping the same file. A lookup is a binary
+    search over the fixed-size index: log2(count) 16-byte key comparisons.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        magic, version, record_size, self.count, self.heap_offset, heap_size, self.created_at = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} redirect snapshot")
+        if self.heap_offset + heap_size != len(self._map):
+            raise ValueError(f"{path} is truncated")
+        self.size = len(self._map)
+        if hasattr(mmap, "MADV_RANDOM"):
+            # Lookups touch a few scattered pages; read-ahead would only waste cache
+            self._map.madvise(mmap.MADV_RANDOM)
+
+    def lookup(self, short_code: str, now: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Find a short code's redirect target
+
+        Args:
+            short_code: The short code to look up
+            now: Current Unix time, for the expiry check
+
+        Returns:
+            Tuple[bool, Optional[str]]: (found, target); the target is None when
+            the code is unknown or expired
+        """
+        found, target, _ = self.find(short_code, now)
+        return found, target
+
+    def find(self, short_code: str, now: Optional[float] = None) -> Tuple[bool, Optional[str], int]:
+        """
+        lookup(), also returning the code's expiry
+
+        Returns:
+            Tuple[bool, Optional[str], int]: (found, target, expiry as Unix
+            seconds or NO_EXPIRY)
+        """
+        key = short_code.encode("utf-8")
+        if len(key) > KEY_SIZE:
+            return False, None, NO_EXPIRY
+        key = key.ljust(KEY_SIZE, b"\0")
+        data = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) >> 1
+            offset = HEADER.size + middle * RECORD.size
+            probe = data[offset:offset + KEY_SIZE]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                _, url_offset, url_length, expires = RECORD.unpack_from(data, offset)
+                if expires != NO_EXPIRY and (now if now is not None else time.time()) > expires:
+                    return True, None, expires
+                start = self.heap_offset + url_offset
+                return True, data[start:start + url_length].decode("utf-8"), expires
+        return False, None, NO_EXPIRY
+
+
+class RedirectSnapshot:
+    """
+    The snapshot currently served by an edge worker, swapped when the file changes.
+
+    Every poll_seconds the path is stat()ed; when it points at a new file (the
+    exporter replaces it with a rename) the new file is mapped and swapped in.
+    Lookups in flight keep the previous reader, whose mapping is released once
+    the last of them returns.
+    """
+
+    def __init__(self, path: str = REDIRECT_SNAPSHOT_PATH,
+                 poll_seconds: float = REDIRECT_SNAPSHOT_POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._reader: Optional[SnapshotReader] = None
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.swaps = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._reader is not None
+
+    def lookup(self, short_code: str) -> Optional[str]:
+        """
+        Redirect target of a short code
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            Optional[str]: The target, or None if unknown, expired or no snapshot is loaded
+        """
+        entry = self.lookup_entry(short_code)
+        return entry[0] if entry is not None else None
+
+    def lookup_entry(self, short_code: str) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        Redirect target of a short code and when it expires
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            Optional[Tuple[str, Optional[int]]]: (target, expiry as Unix seconds
+            or None if it never expires), or None if unknown, expired or no
+            snapshot is loaded
+        """
+        reader = self._reader
+        if reader is None:
+            self.misses += 1
+            return None
+        found, target, expires = reader.find(short_code)
+        if target is not None:
+            self.hits += 1
+            return target, (expires if expires != NO_EXPIRY else None)
+        if found:
+            self.expired += 1
+        else:
+            self.misses += 1
+        return None
+
+    def load(self) -> bool:
+        """
+        Map the file at self.path if it is not the one already served
+
+        Returns:
+            bool: True if a new snapshot was swapped in
+        """
+        stat = os.stat(self.path)
+        current = self._reader
+        if current is not None and current.identity == (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return False
+        reader = SnapshotReader(self.path)
+        self._reader = reader
+        self.swaps += 1
+        self.last_error = None
+        logger.info("Redirect snapshot loaded: %d records, %d bytes", reader.count, reader.size)
+        return True
+
+    def start(self) -> None:
+        """Load the snapshot (failing loudly if it is unusable) and watch for replacements"""
+        self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever(), name="redirect-snapshot")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        reader = self._reader
+        return {
+            "path": self.path,
+            "ready": reader is not None,
+            "records": reader.count if reader else 0,
+            "bytes": reader.size if reader else 0,
+            "age_seconds": time.time() - reader.created_at if reader else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "swaps": self.swaps,
+            "last_error": self.last_error,
+        }
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                self.load()
+            except Exception as e:
+                # Keep serving the previous snapshot
+                self.last_error = str(e)
+                logger.exception("Redirect snapshot reload failed")
+
+
+# Process-wide snapshot served in edge mode
+redirect_snapshot = RedirectSnapshot()
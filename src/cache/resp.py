@@ -0,0 +1,301 @@
+import asyncio
+import socket
+import threading
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlsplit
+
+# Client side of the Redis serialization protocol (RESP2), enough for the
+# shared cache: pooled connections, pipelines and a pub/sub subscription.
+# Works against Redis, Valkey, KeyDB or any server speaking the protocol
+
+Command = Sequence[object]
+
+
+class RespError(Exception):
+    """Error reply sent by the server (e.g. WRONGTYPE, NOAUTH)"""
+
+
+def parse_url(url: str) -> Tuple[str, int, Optional[str], int]:
+    """
+    Split a redis://[:password@]host[:port][/db] URL
+
+    Returns:
+        Tuple[str, int, Optional[str], int]: host, port, password and database number
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "redis":
+        raise ValueError(f"Unsupported shared cache URL scheme: {parts.scheme!r}")
+    password = unquote(parts.password) if parts.password else None
+    db = int(parts.path.lstrip("/") or 0)
+    return parts.hostname or "localhost", parts.port or 6379, password, db
+
+
+def encode_command(args: Command) -> bytes:
+    """Encode one command as a RESP array of bulk strings"""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = str(arg).encode("ascii")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def _handshake(password: Optional[str], db: int) -> List[Command]:
+    commands = []
+    if password:
+        commands.append(("AUTH", password))
+    if db:
+        commands.append(("SELECT", db))
+    return commands
+
+
+def _check(replies: list) -> list:
+    for reply in replies:
+        if isinstance(reply, RespError):
+            raise reply
+    return replies
+
+
+def read_reply(stream):
+    """
+    Read one reply from a buffered binary file
+
+    Returns:
+        The decoded reply: str for status replies, bytes or None for bulk
+        strings, int, list, or a RespError instance for error replies
+
+    Raises:
+        ConnectionError: If the server closed the connection
+    """
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the shared cache server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"$":
+        length = int(body)
+        return None if length < 0 else stream.read(length + 2)[:-2]
+    if kind == b"*":
+        length = int(body)
+        return None if length < 0 else [read_reply(stream) for _ in range(length)]
+    if kind == b":":
+        return int(body)
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        return RespError(body.decode("utf-8"))
+    raise ConnectionError(f"Unexpected reply from the shared cache server: {line[:32]!r}")
+
+
+async def read_reply_async(reader: asyncio.StreamReader):
+    """read_reply() for an asyncio stream"""
+    try:
+        return await _read_reply_async(reader)
+    except asyncio.IncompleteReadError:
+        # An EOFError, which callers expecting OSError would let through
+        raise ConnectionError("Connection closed by the shared cache server") from None
+
+
+async def _read_reply_async(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the shared cache server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"$":
+        length = int(body)
+        return None if length < 0 else (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(body)
+        return None if length < 0 else [await _read_reply_async(reader) for _ in range(length)]
+    if kind == b":":
+        return int(body)
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        return RespError(body.decode("utf-8"))
+    raise ConnectionError(f"Unexpected reply from the shared cache server: {line[:32]!r}")
+
+
+class RespClient:
+    """
+    Blocking client with a small pool of connections, safe to share between threads.
+
+    A pipeline writes all its commands in one send and then reads the replies,
+    so it costs one round trip however many commands it holds. A connection
+    that fails or times out is closed rather than returned to the pool, since
+    unread replies would be handed to the next caller.
+    """
+
+    def __init__(self, url: str, timeout_seconds: float, pool_size: int = 8):
+        self.host, self.port, self.password, self.db = parse_url(url)
+        self.timeout_seconds = timeout_seconds
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._idle: List[tuple] = []
+
+    def pipeline(self, commands: Sequence[Command]) -> list:
+        """
+        Send several commands in one round trip
+
+        Args:
+            commands: The commands to send, in order
+
+        Returns:
+            list: One reply per command; error replies are RespError instances
+
+        Raises:
+            OSError: If the server cannot be reached or does not answer in time
+        """
+        conn = self._acquire()
+        sock, stream = conn
+        try:
+            sock.sendall(b"".join(encode_command(command) for command in commands))
+            replies = [read_reply(stream) for _ in commands]
+        except BaseException:
+            self._close(conn)
+            raise
+        self._release(conn)
+        return replies
+
+    def execute(self, *args):
+        """
+        Send one command
+
+        Returns:
+            The command's reply
+
+        Raises:
+            RespError: If the server answered with an error
+            OSError: If the server cannot be reached or does not answer in time
+        """
+        return _check(self.pipeline([args]))[0]
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    def _acquire(self) -> tuple:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout_seconds)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        handshake = _handshake(self.password, self.db)
+        if handshake:
+            try:
+                sock.sendall(b"".join(encode_command(command) for command in handshake))
+                _check([read_reply(conn[1]) for _ in handshake])
+            except BaseException:
+                self._close(conn)
+                raise
+        return conn
+
+    def _release(self, conn: tuple) -> None:
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn: tuple) -> None:
+        sock, stream = conn
+        try:
+            stream.close()
+        finally:
+            sock.close()
+
+
+class AsyncRespClient:
+    """RespClient counterpart for the event loop, with the same pooling rules"""
+
+    def __init__(self, url: str, timeout_seconds: float, pool_size: int = 8):
+        self.host, self.port, self.password, self.db = parse_url(url)
+        self.timeout_seconds = timeout_seconds
+        self.pool_size = pool_size
+        self._idle: List[tuple] = []
+
+    async def pipeline(self, commands: Sequence[Command]) -> list:
+        """
+        Send several commands in one round trip
+
+        Args:
+            commands: The commands to send, in order
+
+        Returns:
+            list: One reply per command; error replies are RespError instances
+
+        Raises:
+            OSError: If the server cannot be reached or does not answer in time
+        """
+        conn = self._idle.pop() if self._idle else await self.connect()
+        try:
+            replies = await asyncio.wait_for(self._exchange(conn, commands), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            conn[1].close()
+            raise TimeoutError("Shared cache server did not answer in time") from None
+        except BaseException:
+            conn[1].close()
+            raise
+        if len(self._idle) < self.pool_size:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+        return replies
+
+    async def execute(self, *args):
+        """
+        Send one command
+
+        Returns:
+            The command's reply
+
+        Raises:
+            RespError: If the server answered with an error
+            OSError: If the server cannot be reached or does not answer in time
+        """
+        return _check(await self.pipeline([args]))[0]
+
+    async def connect(self, timeout_seconds: Optional[float] = None) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """
+        Open a new, unpooled connection (authenticated and with its database selected)
+
+        Args:
+            timeout_seconds: Time allowed to connect, if not the client's timeout
+
+        Returns:
+            Tuple[asyncio.StreamReader, asyncio.StreamWriter]: The connection's streams
+        """
+        timeout_seconds = timeout_seconds or self.timeout_seconds
+        try:
+            conn = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout_seconds)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timed out connecting to the shared cache server") from None
+        handshake = _handshake(self.password, self.db)
+        if handshake:
+            try:
+                _check(await asyncio.wait_for(self._exchange(conn, handshake), timeout_seconds))
+            except BaseException:
+                conn[1].close()
+                raise
+        return conn
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    @staticmethod
+    async def _exchange(conn: tuple, commands: Sequence[Command]) -> list:
+        reader, writer = conn
+        writer.write(b"".join(encode_command(command) for command in commands))
+        await writer.drain()
+        return [await read_reply_async(reader) for _ in commands]
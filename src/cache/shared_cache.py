@@ -0,0 +1,404 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.cache.redirect_cache import CachedUrl, RedirectCache, redirect_cache
+from src.cache.resp import AsyncRespClient, RespClient, RespError, encode_command, read_reply_async
+from src.cache.short_code_filter import ShortCodeFilter, short_code_filter
+from src.db.config import (
+    SHARED_CACHE_URL,
+    SHARED_CACHE_TTL_SECONDS,
+    SHARED_CACHE_KEY_PREFIX,
+    SHARED_CACHE_CHANNEL,
+    SHARED_CACHE_TIMEOUT_SECONDS,
+    SHARED_CACHE_RETRY_SECONDS,
+    SHARED_CACHE_POOL_SIZE,
+    SHARED_CACHE_WRITE_INTERVAL_SECONDS,
+    SHARED_CACHE_MAX_PENDING_WRITES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors that make the shared cache count as unavailable
+CACHE_ERRORS = (OSError, RespError, ValueError)
+
+# A deleted link's key holds an empty tombstone for this long. Fills are only
+# written where no key exists, so a fill read just before the delete (or from a
+# lagging replica) cannot bring the link back
+TOMBSTONE_MS = 60000
+
+SUBSCRIBE_TIMEOUT_SECONDS = 5
+
+# Messages on the channel announcing new links start with this, followed by
+# their short codes separated by spaces; a delete publishes the bare code.
+# Short codes are alphanumeric, so neither can be mistaken for the other
+CREATED_PREFIX = "+"
+
+
+def encode_entry(url: CachedUrl) -> bytes:
+    """Serialize the redirect columns; stored URLs never contain a newline"""
+    expires = url.expiration_time.isoformat() if url.expiration_time is not None else ""
+    return f"{url.original_url}\n{url.created_at.isoformat()}\n{expires}".encode("utf-8")
+
+
+def decode_entry(short_code: str, value: bytes) -> CachedUrl:
+    """Inverse of encode_entry()"""
+    original_url, created_at, expires = value.decode("utf-8").split("\n")
+    return CachedUrl(short_code, original_url, datetime.fromisoformat(created_at),
+                     datetime.fromisoformat(expires) if expires else None)
+
+
+class SharedRedirectCache:
+    """
+    Redirect cache shared by every worker and pod, on a Redis-protocol server.
+
+    Sits behind each worker's RedirectCache: a local miss asks the shared
+    cache, and only a shared miss reaches the database. Entries expire with a
+    per-key TTL that never outlives the link. Entries read from the database
+    are queued and written by a background task in one pipeline per interval,
+    so the request that found them does not wait for the write.
+
+    Deleting a link replaces its entry with a short-lived tombstone and
+    publishes the short code on the invalidation channel in one pipeline;
+    every worker's subscriber drops the code from its local cache. New links
+    are announced on the same channel, so every worker adds their codes to
+    its short code filter (and drops a cached miss for them) at once instead
+    of on its next filter refresh. After losing its subscription a worker
+    clears its local cache, since it may have missed deletes in the meantime;
+    announcements it missed reach its filter on the next refresh.
+
+    Any error marks the server unavailable for retry_seconds, during which
+    lookups fall back to the database without trying the network.
+    """
+
+    def __init__(self, url: str = SHARED_CACHE_URL,
+                 ttl_seconds: int = SHARED_CACHE_TTL_SECONDS,
+                 key_prefix: str = SHARED_CACHE_KEY_PREFIX,
+                 channel: str = SHARED_CACHE_CHANNEL,
+                 timeout_seconds: float = SHARED_CACHE_TIMEOUT_SECONDS,
+                 retry_seconds: float = SHARED_CACHE_RETRY_SECONDS,
+                 pool_size: int = SHARED_CACHE_POOL_SIZE,
+                 write_interval_seconds: float = SHARED_CACHE_WRITE_INTERVAL_SECONDS,
+                 max_pending_writes: int = SHARED_CACHE_MAX_PENDING_WRITES,
+                 local: RedirectCache = redirect_cache,
+                 code_filter: ShortCodeFilter = short_code_filter,
+                 clock: Callable[[], float] = time.monotonic):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.write_interval_seconds = write_interval_seconds
+        self.max_pending_writes = max_pending_writes
+        self.local = local
+        self.code_filter = code_filter
+        self._clock = clock
+        self.client = RespClient(url, timeout_seconds, pool_size) if url else None
+        self.async_client = AsyncRespClient(url, timeout_seconds, pool_size) if url else None
+        self._lock = threading.Lock()
+        # key -> (encoded entry, TTL in milliseconds)
+        self._pending: Dict[str, Tuple[bytes, int]] = {}
+        self._down_until = 0.0
+        self._tasks = []
+        self.subscribed = False
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+        self.writes = 0
+        self.dropped_writes = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+        self.announcements_sent = 0
+        self.announcements_received = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and self._clock() >= self._down_until
+
+    def key(self, short_code: str) -> str:
+        return self.key_prefix + short_code
+
+    def get(self, short_code: str) -> Optional[CachedUrl]:
+        """
+        Look up a short code
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            Optional[CachedUrl]: The cached link, or None if the database has to
+            be consulted (not cached, or the server is unavailable)
+        """
+        if not self._usable():
+            return None
+        try:
+            value = self.client.execute("GET", self.key(short_code))
+        except CACHE_ERRORS as e:
+            self._failed(e)
+            return None
+        return self._found(short_code, value)
+
+    async def get_async(self, short_code: str) -> Optional[CachedUrl]:
+        """get() on the event loop"""
+        if not self._usable():
+            return None
+        try:
+            value = await self.async_client.execute("GET", self.key(short_code))
+        except CACHE_ERRORS as e:
+            self._failed(e)
+            return None
+        return self._found(short_code, value)
+
+    def put(self, url: CachedUrl) -> None:
+        """
+        Queue a link read from the database for the next pipelined write
+
+        Args:
+            url: The cached copy of the row
+        """
+        if not self.available:
+            return
+        ttl = self.ttl_seconds
+        if url.expiration_time is not None:
+            ttl = min(ttl, (url.expiration_time - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+        with self._lock:
+            if len(self._pending) < self.max_pending_writes:
+                self._pending[self.key(url.short_code)] = (encode_entry(url), int(ttl * 1000))
+            else:
+                self.dropped_writes += 1
+
+    def invalidate(self, short_code: str) -> None:
+        """
+        Remove a deleted link and tell every worker to drop its local copy
+
+        Args:
+            short_code: The short code that was deleted
+        """
+        commands = self._invalidation(short_code)
+        if commands:
+            try:
+                self.client.pipeline(commands)
+                self.invalidations_sent += 1
+            except CACHE_ERRORS as e:
+                self._failed(e)
+
+    async def invalidate_async(self, short_code: str) -> None:
+        """invalidate() on the event loop"""
+        commands = self._invalidation(short_code)
+        if commands:
+            try:
+                await self.async_client.pipeline(commands)
+                self.invalidations_sent += 1
+            except CACHE_ERRORS as e:
+                self._failed(e)
+
+    def announce(self, short_codes: List[str]) -> None:
+        """
+        Tell every worker about newly created links
+
+        Args:
+            short_codes: The short codes just created
+        """
+        command = self._announcement(short_codes)
+        if command:
+            try:
+                self.client.execute(*command)
+                self.announcements_sent += 1
+            except CACHE_ERRORS as e:
+                self._failed(e)
+
+    async def announce_async(self, short_codes: List[str]) -> None:
+        """announce() on the event loop"""
+        command = self._announcement(short_codes)
+        if command:
+            try:
+                await self.async_client.execute(*command)
+                self.announcements_sent += 1
+            except CACHE_ERRORS as e:
+                self._failed(e)
+
+    async def flush(self) -> int:
+        """
+        Write every queued entry in one pipeline
+
+        Returns:
+            int: Number of entries written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or not self.available:
+            return 0
+        commands = [("SET", key, value, "PX", ttl_ms, "NX") for key, (value, ttl_ms) in pending.items()]
+        try:
+            await self.async_client.pipeline(commands)
+        except CACHE_ERRORS as e:
+            # Cache fills are best effort: the next lookup queues them again
+            self._failed(e)
+            self.dropped_writes += len(commands)
+            return 0
+        self.writes += len(commands)
+        return len(commands)
+
+    def start(self) -> None:
+        """Start the write and invalidation tasks on the running event loop"""
+        if self.enabled and not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._write_forever(), name="shared-cache-writer"),
+                asyncio.create_task(self._listen_forever(), name="shared-cache-subscriber"),
+            ]
+
+    async def stop(self) -> None:
+        """Cancel the background tasks, write what is queued and close the connections"""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await self.flush()
+        self.async_client.close()
+        self.client.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "available": self.available,
+            "subscribed": self.subscribed,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "pending_writes": pending,
+            "writes": self.writes,
+            "dropped_writes": self.dropped_writes,
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+            "announcements_sent": self.announcements_sent,
+            "announcements_received": self.announcements_received,
+            "last_error": self.last_error,
+        }
+
+    def _usable(self) -> bool:
+        if self.available:
+            return True
+        if self.enabled:
+            self.bypassed += 1
+        return False
+
+    def _found(self, short_code: str, value: Optional[bytes]) -> Optional[CachedUrl]:
+        if not value:
+            # Unknown, or a tombstone left by a delete
+            self.misses += 1
+            return None
+        try:
+            url = decode_entry(short_code, value)
+        except ValueError:
+            # Written by something else under our prefix: let the database answer
+            self.misses += 1
+            return None
+        if url.expiration_time is not None and url.expiration_time <= datetime.utcnow():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return url
+
+    def _invalidation(self, short_code: str) -> list:
+        if not self.enabled:
+            return []
+        key = self.key(short_code)
+        with self._lock:
+            self._pending.pop(key, None)
+        # Even while marked unavailable: a missed delete would keep the link alive
+        return [("SET", key, "", "PX", TOMBSTONE_MS), ("PUBLISH", self.channel, short_code)]
+
+    def _announcement(self, short_codes: List[str]) -> Optional[tuple]:
+        # Unlike a delete, a missed announcement only leaves the other workers'
+        # filters behind until their next refresh: not worth waiting on a down server
+        if not short_codes or not self.available:
+            return None
+        return ("PUBLISH", self.channel, CREATED_PREFIX + " ".join(short_codes))
+
+    def _failed(self, error: Exception) -> None:
+        self.errors += 1
+        self.last_error = str(error) or type(error).__name__
+        if self.available:
+            logger.warning("Shared cache unavailable, using the database for %.0fs: %s",
+                           self.retry_seconds, self.last_error)
+        self._down_until = self._clock() + self.retry_seconds
+
+    async def _write_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.write_interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Shared cache write failed")
+
+    async def _listen_forever(self) -> None:
+        lost_subscription = False
+        while True:
+            try:
+                # Not on any request's path, so it can wait out a busy event loop
+                reader, writer = await self.async_client.connect(SUBSCRIBE_TIMEOUT_SECONDS)
+                try:
+                    writer.write(encode_command(("SUBSCRIBE", self.channel)))
+                    await writer.drain()
+                    while True:
+                        self._on_message(await read_reply_async(reader), lost_subscription)
+                finally:
+                    self.subscribed = False
+                    writer.close()
+            except CACHE_ERRORS as e:
+                # Lookups keep using the server; they notice an outage themselves
+                self.errors += 1
+                self.last_error = str(e) or type(e).__name__
+                logger.warning("Shared cache subscription lost, retrying in %.0fs: %s",
+                               self.retry_seconds, self.last_error)
+                lost_subscription = True
+            await asyncio.sleep(self.retry_seconds)
+
+    def _on_message(self, reply, lost_subscription: bool) -> None:
+        if isinstance(reply, RespError):
+            raise reply
+        if not isinstance(reply, list) or len(reply) != 3:
+            return
+        kind, _, payload = reply
+        if kind == b"message":
+            message = payload.decode("utf-8")
+            if message.startswith(CREATED_PREFIX):
+                for short_code in message[len(CREATED_PREFIX):].split():
+                    self.code_filter.add(short_code)
+                    self.local.invalidate(short_code)
+                self.announcements_received += 1
+            else:
+                self.local.invalidate(message)
+                self.invalidations_received += 1
+        elif kind == b"subscribe":
+            self.subscribed = True
+            if lost_subscription:
+                # Deletes published while we were not listening were missed
+                self.local.clear()
+
+
+# Process-wide client; disabled unless SHARED_CACHE_URL is set
+shared_redirect_cache = SharedRedirectCache()
@@ -0,0 +1,322 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.db.config import (
+    DB_MODE,
+    SHORT_CODE_FILTER_ENABLED,
+    SHORT_CODE_FILTER_FPR,
+    SHORT_CODE_FILTER_MIN_CAPACITY,
+    SHORT_CODE_FILTER_REFRESH_SECONDS,
+    SHORT_CODE_FILTER_REBUILD_SECONDS,
+)
+from src.db.async_session import get_async_sessionmaker
+from src.db.session import get_sessionmaker
+from src.repositories.redirect_to_url_repository import RedirectToUrlRepository, AsyncRedirectToUrlRepository
+
+logger = logging.getLogger(__name__)
+
+# Each refresh re-reads codes created this long before the previous refresh
+# started, covering rows whose transaction committed after created_at was set
+REFRESH_OVERLAP_SECONDS = 60
+
+# Rebuilds size the filter for this many times the current row count
+GROWTH_FACTOR = 2
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Positions come from double hashing one 128-bit BLAKE2b digest, so a lookup
+    is one hash plus k bit probes. Lookups take no lock; adds must be
+    serialized by the caller.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.target_fpr = false_positive_rate
+        bits = -self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)
+        self.num_bits = max(int(math.ceil(bits / 8)) * 8, 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray(self.num_bits // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def estimated_fpr(self) -> float:
+        """False-positive probability for the number of keys added so far"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+class ShortCodeFilter:
+    """
+    Bloom filter of existing short codes, consulted before redirect lookups.
+
+    A code the filter has never seen cannot exist, so the redirect path answers
+    404 without querying the database. The filter is built from a streamed scan
+    when the app starts (lookups fall through to the database until then) and
+    gets codes created by this worker immediately. Codes created by other
+    workers arrive over the shared cache's channel as they are created, and
+    a refresh every refresh_seconds picks up any that were not announced (no
+    shared cache, or a lost subscription). Clients inside their
+    read-your-writes window bypass the filter altogether. Deleted and expired
+    codes stay in the filter (they only cost the lookup the filter would
+    otherwise save) until the periodic rebuild, which also resizes it.
+    """
+
+    def __init__(self, false_positive_rate: float = SHORT_CODE_FILTER_FPR,
+                 min_capacity: int = SHORT_CODE_FILTER_MIN_CAPACITY,
+                 refresh_seconds: float = SHORT_CODE_FILTER_REFRESH_SECONDS,
+                 rebuild_seconds: float = SHORT_CODE_FILTER_REBUILD_SECONDS,
+                 enabled: bool = SHORT_CODE_FILTER_ENABLED):
+        self.false_positive_rate = false_positive_rate
+        self.min_capacity = min_capacity
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.enabled = enabled
+        self.repository = RedirectToUrlRepository()
+        self.async_repository = AsyncRedirectToUrlRepository()
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        # Codes added while a rebuild is scanning, replayed into the new filter
+        self._pending: Optional[List[str]] = None
+        self._refreshed_from: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.definite_misses = 0
+        self.false_positives = 0
+        self.builds = 0
+        self.last_build_seconds = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_contain(self, short_code: str) -> bool:
+        """
+        Check whether a short code may exist
+
+        Args:
+            short_code: The short code to check
+
+        Returns:
+            bool: False only if the code definitely does not exist
+        """
+        bloom = self._filter
+        if bloom is None or short_code in bloom:
+            return True
+        self.definite_misses += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """Count a lookup the filter let through that found no live row"""
+        self.false_positives += 1
+
+    def add(self, short_code: str) -> None:
+        """
+        Add a newly created short code
+
+        Args:
+            short_code: The short code to add
+        """
+        with self._lock:
+            # Announced codes include this worker's own, which are already in
+            if self._filter is not None and short_code not in self._filter:
+                self._filter.add(short_code)
+            if self._pending is not None:
+                self._pending.append(short_code)
+
+    def rebuild(self, session_factory) -> None:
+        """
+        Replace the filter with one built from a streamed scan of every code
+
+        Args:
+            session_factory: Callable returning a new Session
+        """
+        started = time.perf_counter()
+        scan_started = datetime.utcnow()
+        self._begin_build()
+        try:
+            with session_factory() as db:
+                bloom = self._new_filter(self.repository.count_short_codes(db))
+                for short_code in self.repository.stream_short_codes(db):
+                    bloom.add(short_code)
+            self._install(bloom, scan_started)
+        finally:
+            self._end_build()
+        self._record_build(bloom, time.perf_counter() - started)
+
+    async def rebuild_async(self, session_factory) -> None:
+        """
+        Async counterpart of rebuild()
+
+        Args:
+            session_factory: Callable returning a new AsyncSession
+        """
+        started = time.perf_counter()
+        scan_started = datetime.utcnow()
+        self._begin_build()
+        try:
+            async with session_factory() as db:
+                bloom = self._new_filter(await self.async_repository.count_short_codes(db))
+                async for short_code in self.async_repository.stream_short_codes(db):
+                    bloom.add(short_code)
+            self._install(bloom, scan_started)
+        finally:
+            self._end_build()
+        self._record_build(bloom, time.perf_counter() - started)
+
+    def refresh(self, session_factory) -> int:
+        """
+        Add codes created (by any worker) since the previous refresh
+
+        Args:
+            session_factory: Callable returning a new Session
+
+        Returns:
+            int: Number of codes read
+        """
+        started = datetime.utcnow()
+        with session_factory() as db:
+            short_codes = list(self.repository.stream_short_codes(db, self._refresh_since()))
+        return self._add_refreshed(short_codes, started)
+
+    async def refresh_async(self, session_factory) -> int:
+        """
+        Async counterpart of refresh()
+
+        Args:
+            session_factory: Callable returning a new AsyncSession
+
+        Returns:
+            int: Number of codes read
+        """
+        started = datetime.utcnow()
+        async with session_factory() as db:
+            short_codes = [
+                short_code async for short_code in self.async_repository.stream_short_codes(db, self._refresh_since())
+            ]
+        return self._add_refreshed(short_codes, started)
+
+    def start(self) -> None:
+        """Build the filter and keep it current in the background"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_forever(), name="short-code-filter")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        misses = self.definite_misses + self.false_positives
+        return {
+            "enabled": self.enabled,
+            "ready": bloom is not None,
+            "capacity": bloom.capacity if bloom else 0,
+            "entries": bloom.count if bloom else 0,
+            "memory_bytes": bloom.memory_bytes if bloom else 0,
+            "hash_functions": bloom.num_hashes if bloom else 0,
+            "target_false_positive_rate": self.false_positive_rate,
+            "estimated_false_positive_rate": bloom.estimated_fpr if bloom else 0.0,
+            "definite_misses": self.definite_misses,
+            # Misses the filter let through; includes deleted and expired codes
+            "false_positives": self.false_positives,
+            "observed_false_positive_rate": self.false_positives / misses if misses else 0.0,
+            "builds": self.builds,
+            "last_build_seconds": self.last_build_seconds,
+            "last_error": self.last_error,
+        }
+
+    def _new_filter(self, row_count: int) -> BloomFilter:
+        return BloomFilter(max(row_count * GROWTH_FACTOR, self.min_capacity), self.false_positive_rate)
+
+    def _begin_build(self) -> None:
+        with self._lock:
+            self._pending = []
+
+    def _end_build(self) -> None:
+        with self._lock:
+            self._pending = None
+
+    def _install(self, bloom: BloomFilter, scan_started: datetime) -> None:
+        with self._lock:
+            for short_code in self._pending or ():
+                bloom.add(short_code)
+            self._filter = bloom
+            self._refreshed_from = scan_started
+
+    def _refresh_since(self) -> datetime:
+        return self._refreshed_from - timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+
+    def _add_refreshed(self, short_codes: List[str], started: datetime) -> int:
+        with self._lock:
+            for short_code in short_codes:
+                # Codes re-read from the overlap window are usually present already
+                if short_code not in self._filter:
+                    self._filter.add(short_code)
+            self._refreshed_from = started
+        return len(short_codes)
+
+    def _record_build(self, bloom: BloomFilter, duration: float) -> None:
+        self.builds += 1
+        self.last_build_seconds = duration
+        self.last_error = None
+        logger.info("Short code filter built: %d codes, %d bytes, %.3fs", bloom.count, bloom.memory_bytes, duration)
+
+    async def _run_forever(self) -> None:
+        next_rebuild = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_rebuild:
+                    if DB_MODE == "async":
+                        await self.rebuild_async(get_async_sessionmaker())
+                    else:
+                        await asyncio.to_thread(self.rebuild, get_sessionmaker())
+                    next_rebuild = time.monotonic() + self.rebuild_seconds
+                elif DB_MODE == "async":
+                    await self.refresh_async(get_async_sessionmaker())
+                else:
+                    await asyncio.to_thread(self.refresh, get_sessionmaker())
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Short code filter update failed")
+            await asyncio.sleep(self.refresh_seconds)
+
+
+# Process-wide filter consulted by the redirect services
+short_code_filter = ShortCodeFilter()
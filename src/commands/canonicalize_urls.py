@@ -0,0 +1,168 @@
+"""
+One-off command that rewrites existing rows to the canonical redirect target
+stored by the create path, so redirects can emit original_url unchanged.
+
+Rows are processed in id order, one short transaction per batch. A row whose
+new digest already belongs to another row keeps a NULL original_url_hash (it
+still redirects, it just never serves as the dedup target). Rows that are not
+valid URLs, and so always answered 404 on redirect, are expired instead: the
+redirect path treats them as not found and the expiry sweeper purges them.
+
+On a partitioned urls table, where dedup goes through url_digests, a
+canonicalized row gives up its claim on the old digest and claims the new one
+the way creates do; the digest stays NULL if a live link already holds it.
+
+Usage:
+    python -m src.commands.canonicalize_urls [--batch-size 1000] [--dry-run]
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+
+from src.db.session import get_sessionmaker
+from src.models.url import URL, URLDigest
+from src.repositories.create_url_repository import CreateUrlRepository
+from src.repositories.url_partition_repository import UrlPartitionRepository, url_partitions
+from src.utils.url_digest import url_digest
+from src.utils.url_validator import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _taken_digests(db, digests: list, changed: list, now: datetime, partitioned: bool) -> set:
+    """Digests already held by a row outside this batch's changed rows"""
+    if not digests:
+        return set()
+    if partitioned:
+        # The urls digest index is not unique there: holders are in url_digests
+        return set(db.scalars(
+            select(URLDigest.original_url_hash).where(
+                URLDigest.original_url_hash.in_(digests),
+                URLDigest.url_id.notin_(changed),
+                (URLDigest.expiration_time == None) | (URLDigest.expiration_time > now),
+            )
+        ))
+    return set(db.scalars(
+        select(URL.original_url_hash)
+        .where(URL.original_url_hash.in_(digests), URL.id.notin_(changed))
+    ))
+
+
+def _canonicalize_batch(db, rows, now: datetime, dry_run: bool,
+                        urls: Optional[CreateUrlRepository] = None) -> dict:
+    # urls is given when the table is partitioned, to claim digests in url_digests
+    changed = {}
+    expired = []
+    by_id = {row.id: row for row in rows}
+    for row in rows:
+        canonical_url = canonicalize_url(row.original_url)
+        if canonical_url is None:
+            if row.expiration_time is None or row.expiration_time > now:
+                expired.append(row.id)
+        elif canonical_url != row.original_url:
+            changed[row.id] = canonical_url
+
+    digests = {}
+    for row_id, canonical_url in changed.items():
+        digests.setdefault(url_digest(canonical_url), row_id)
+    taken = _taken_digests(db, list(digests), list(changed), now, urls is not None)
+    owner = {row_id: digest for digest, row_id in digests.items()}
+
+    if not dry_run and urls is not None and changed:
+        # Drop the stale claims on the old digests, then claim the new ones
+        db.execute(delete(URLDigest).where(URLDigest.url_id.in_(list(changed)))
+                   .execution_options(synchronize_session=False))
+        claimed = urls.claim_digests(db, [{
+            "original_url_hash": digest,
+            "id": row_id,
+            "created_at": by_id[row_id].created_at,
+            "short_code": by_id[row_id].short_code,
+            "expiration_time": by_id[row_id].expiration_time,
+        } for digest, row_id in digests.items()])
+        # Authoritative: digests of expired or deleted links were taken over
+        taken = set(digests) - claimed
+
+    updates = [
+        {
+            "id": row_id,
+            "original_url": canonical_url,
+            "original_url_hash": owner.get(row_id) if owner.get(row_id) not in taken else None,
+        }
+        for row_id, canonical_url in changed.items()
+    ]
+
+    if not dry_run:
+        if updates:
+            # Free the old digests first so a row may take over its own new one
+            db.execute(update(URL).where(URL.id.in_(list(changed))).values(original_url_hash=None))
+            db.execute(update(URL), updates)
+        if expired:
+            db.execute(update(URL).where(URL.id.in_(expired)).values(expiration_time=now))
+            if urls is not None:
+                db.execute(update(URLDigest).where(URLDigest.url_id.in_(expired)).values(expiration_time=now)
+                           .execution_options(synchronize_session=False))
+        db.commit()
+    return {
+        "canonicalized": len(updates),
+        "hash_conflicts": sum(1 for item in updates if item["original_url_hash"] is None),
+        "expired_invalid": len(expired),
+    }
+
+
+def canonicalize_existing_urls(session_factory, batch_size: int = DEFAULT_BATCH_SIZE,
+                               dry_run: bool = False,
+                               partitions: UrlPartitionRepository = url_partitions) -> dict:
+    """
+    Canonicalize every stored URL in batches
+
+    Args:
+        session_factory: Callable returning a new Session
+        batch_size: Rows read and updated per transaction
+        dry_run: Report what would change without writing
+        partitions: Tells whether urls is partitioned, and so dedups through url_digests
+
+    Returns:
+        dict: Counts of scanned, canonicalized, conflicting and expired rows
+    """
+    totals = {"scanned": 0, "canonicalized": 0, "hash_conflicts": 0, "expired_invalid": 0}
+    now = datetime.utcnow()
+    last_id = 0
+    with session_factory() as db:
+        urls = CreateUrlRepository(partitions=partitions) if partitions.is_partitioned(db) else None
+        while True:
+            rows = db.execute(
+                select(URL.id, URL.original_url, URL.created_at, URL.short_code, URL.expiration_time)
+                .where(URL.id > last_id)
+                .order_by(URL.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return totals
+            last_id = rows[-1].id
+            totals["scanned"] += len(rows)
+            for key, value in _canonicalize_batch(db, rows, now, dry_run, urls).items():
+                totals[key] += value
+            logger.info("Canonicalized URLs up to id %d: %s", last_id, totals)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Canonicalize stored redirect targets")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    totals = canonicalize_existing_urls(get_sessionmaker(), args.batch_size, args.dry_run)
+    print(totals)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
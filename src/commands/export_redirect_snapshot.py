@@ -0,0 +1,75 @@
+"""
+Export the live redirects into a snapshot file for edge nodes (EDGE_MODE).
+
+Streams short_code, original_url and expiration_time of every unexpired row
+in byte order of the short code (COLLATE "C" on PostgreSQL, so the order does
+not depend on the database locale) and writes them with write_snapshot(). The
+file replaces the previous one with a rename, so edge workers pick it up on
+their next poll without a restart. Run it on a schedule (e.g. every minute)
+and ship the file to the edge nodes.
+
+Usage:
+    python -m src.commands.export_redirect_snapshot [--output redirects.snapshot]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import or_, select
+
+from src.cache.redirect_snapshot import write_snapshot
+from src.db.config import REDIRECT_SNAPSHOT_PATH
+from src.db.session import get_sessionmaker
+from src.models.url import URL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def export_redirect_snapshot(session_factory, path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Write every unexpired redirect to a snapshot file
+
+    Args:
+        session_factory: Callable returning a new Session
+        path: Destination file
+        batch_size: Rows fetched per round trip
+
+    Returns:
+        dict: Record count, file size and duration
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    with session_factory() as db:
+        short_code = URL.short_code
+        if db.get_bind().dialect.name == "postgresql":
+            short_code = short_code.collate("C")
+        query = (
+            select(URL.short_code, URL.original_url, URL.expiration_time)
+            .where(or_(URL.expiration_time.is_(None), URL.expiration_time > now))
+            .order_by(short_code)
+            .execution_options(yield_per=batch_size)
+        )
+        result = write_snapshot(db.execute(query), path)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export redirects to a snapshot file for edge nodes")
+    parser.add_argument("--output", default=REDIRECT_SNAPSHOT_PATH)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    result = export_redirect_snapshot(get_sessionmaker(), args.output, args.batch_size)
+    print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Maintain the daily partitions of urls (PostgreSQL, migration f3c9a1d5b720).
+
+Creates the partitions for today and the next URL_PARTITION_PRECREATE_DAYS
+days, then retires every past partition whose links have all expired: it is
+dropped, or detached and moved to URL_PARTITION_ARCHIVE_SCHEMA when one is set.
+Retiring a partition is a catalog change however many rows it holds, so
+expired links leave without a mass DELETE, dead tuples or index bloat, and the
+indexes still attached only cover recent days. A partition that still holds a
+live (or never-expiring) link is kept until it has none. Caches need no purge:
+every retired link has expired, which they check on their own. The url_digests
+rows of expired links are deleted in batches, so creates of those URLs start
+from a fresh digest and the table stays as small as the set of live links.
+
+Run it daily (e.g. from cron); each partition is handled in its own short
+transaction, and one that cannot be locked in time is retried on the next run.
+
+Usage:
+    python -m src.commands.manage_url_partitions [--days-ahead 7] [--archive-schema NAME] [--dry-run]
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.exc import DBAPIError
+
+from src.db.config import URL_PARTITION_ARCHIVE_SCHEMA, URL_PARTITION_PRECREATE_DAYS
+from src.db.session import get_sessionmaker
+from src.repositories.url_partition_repository import UrlPartitionRepository, url_partitions
+from src.utils.url_partitions import DEFAULT_PARTITION, days_to_create, partition_name
+
+logger = logging.getLogger(__name__)
+
+
+def _ended(partitions: List[dict], now: datetime) -> List[dict]:
+    # No new rows can be created in a range that lies wholly in the past
+    return [partition for partition in partitions if partition["end"] is not None and partition["end"] <= now]
+
+
+def manage_url_partitions(session_factory, days_ahead: int = URL_PARTITION_PRECREATE_DAYS,
+                          archive_schema: str = URL_PARTITION_ARCHIVE_SCHEMA, dry_run: bool = False,
+                          now: Optional[datetime] = None,
+                          repository: UrlPartitionRepository = url_partitions) -> dict:
+    """
+    Create upcoming partitions and retire fully expired ones
+
+    Args:
+        session_factory: Callable returning a new Session
+        days_ahead: Days past today to create partitions for
+        archive_schema: Schema retired partitions are moved to; empty to drop them
+        dry_run: Report what would change without changing anything
+        now: Reference time (defaults to the current UTC time)
+        repository: Access to the partitions
+
+    Returns:
+        dict: Partitions created, retired, kept and failed, the number of
+        expired digests purged and of rows in the default partition
+    """
+    now = now or datetime.utcnow()
+    result = {"partitioned": False, "created": [], "retired": [], "kept": [], "failed": [],
+              "digests_purged": 0, "default_rows": 0}
+    with session_factory() as db:
+        if not repository.is_partitioned(db):
+            return result
+        result["partitioned"] = True
+        partitions = repository.list_partitions(db)
+
+        existing = [partition["start"].date() for partition in partitions if partition["start"] is not None]
+        for day in days_to_create(existing, now.date(), days_ahead):
+            name = partition_name(day)
+            try:
+                if not dry_run:
+                    repository.create_partition(db, day)
+                result["created"].append(name)
+            except DBAPIError as e:
+                db.rollback()
+                logger.warning("Could not create partition %s: %s", name, e)
+                result["failed"].append(name)
+
+        for partition in _ended(partitions, now):
+            name = partition["name"]
+            if not repository.is_fully_expired(db, name, now):
+                result["kept"].append(name)
+                continue
+            try:
+                if not dry_run and archive_schema:
+                    repository.archive_partition(db, name, archive_schema)
+                elif not dry_run:
+                    repository.drop_partition(db, name)
+                result["retired"].append(name)
+            except DBAPIError as e:
+                db.rollback()
+                logger.warning("Could not retire partition %s, retrying next run: %s", name, e)
+                result["failed"].append(name)
+
+        if not dry_run:
+            result["digests_purged"] = repository.delete_expired_digests(db, now)
+
+        result["default_rows"] = repository.count_default_rows(db)
+        if result["default_rows"]:
+            # They are never retired, and block creating a partition for their day
+            logger.warning("%d urls rows fell outside the daily partitions into %s",
+                           result["default_rows"], DEFAULT_PARTITION)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create upcoming urls partitions and retire expired ones")
+    parser.add_argument("--days-ahead", type=int, default=URL_PARTITION_PRECREATE_DAYS)
+    parser.add_argument("--archive-schema", default=URL_PARTITION_ARCHIVE_SCHEMA,
+                        help="Detach retired partitions into this schema instead of dropping them")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    result = manage_url_partitions(get_sessionmaker(), args.days_ahead, args.archive_schema, args.dry_run)
+    print(result)
+    if not result["partitioned"]:
+        logger.error("urls is not partitioned: run the migrations on PostgreSQL first")
+        return 1
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,73 +1,263 @@
+import json
+from typing import AsyncIterator, Iterable, Iterator, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from src.services.create_url_service import CreateUrlService
-from src.services.redirect_to_url_service import RedirectToUrlService
-from src.services.get_all_urls_service import GetAllUrlsService
-from src.services.delete_url_service import DeleteUrlService
-from src.schemas.url import URLShortenRequest, URLShortenResponse, URLResponse, GetAllUrlsResponse, URLItem
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.services.create_url_service import CreateUrlService, AsyncCreateUrlService
+from src.services.redirect_to_url_service import RedirectToUrlService, AsyncRedirectToUrlService
+from src.services.get_all_urls_service import GetAllUrlsService, AsyncGetAllUrlsService
+from src.services.delete_url_service import DeleteUrlService, AsyncDeleteUrlService
+from src.services.batch_create_url_service import BatchCreateUrlService, AsyncBatchCreateUrlService
+from src.schemas.url import URLShortenRequest, URLShortenResponse, URLResponse, GetAllUrlsResponse, URLItem, URLBatchResponse
+
+def _shorten_success(url, base_url: str) -> URLShortenResponse:
+    short_url = f"{base_url}/{url.short_code}"
+    return URLShortenResponse(
+        status="success",
+        data={
+            "short_code": url.short_code,
+            "short_url": short_url,
+            "original_url": url.original_url,
+            "expires_at": url.expiration_time
+        }
+    )
+
+def _url_item(url, base_url: str) -> URLItem:
+    return URLItem(
+        short_code=url.short_code,
+        original_url=url.original_url,
+        short_url=f"{base_url}/{url.short_code}",
+        created_at=url.created_at,
+        expires_at=getattr(url, 'expiration_time', None)
+    )
+
+def _page_response(urls: list, base_url: str, limit: int) -> GetAllUrlsResponse:
+    # A full page may be followed by more rows; a short page is the last one
+    next_cursor = urls[-1].id if len(urls) == limit else None
+    return GetAllUrlsResponse(status="success", data=[_url_item(url, base_url) for url in urls], next_cursor=next_cursor)
+
+# Rows serialized per chunk written to a streaming response
+STREAM_CHUNK_ROWS = 500
+
+def _stream_line(row, base_url: str) -> str:
+    return json.dumps({
+        "short_code": row.short_code,
+        "original_url": row.original_url,
+        "short_url": f"{base_url}/{row.short_code}",
+        "created_at": row.created_at.isoformat(),
+        "expires_at": row.expiration_time.isoformat() if row.expiration_time else None,
+    })
+
+class _StreamFormatter:
+    """Turns listing rows into NDJSON lines or one streamed GetAllUrlsResponse JSON document"""
+
+    def __init__(self, base_url: str, fmt: str):
+        self.base_url = base_url
+        self.ndjson = fmt == "ndjson"
+        self.pending = []
+        self.first = True
+
+    def head(self) -> str:
+        return "" if self.ndjson else '{"status": "success", "data": ['
+
+    def add(self, row) -> Optional[str]:
+        self.pending.append(_stream_line(row, self.base_url))
+        return self.flush() if len(self.pending) >= STREAM_CHUNK_ROWS else None
+
+    def flush(self) -> str:
+        if not self.pending:
+            return ""
+        if self.ndjson:
+            chunk = "\n".join(self.pending) + "\n"
+        else:
+            chunk = ("" if self.first else ", ") + ", ".join(self.pending)
+        self.first = False
+        self.pending = []
+        return chunk
+
+    def tail(self) -> str:
+        return self.flush() + ("" if self.ndjson else '], "next_cursor": null, "message": null}')
+
+def _format_stream(rows: Iterable, base_url: str, fmt: str) -> Iterator[str]:
+    formatter = _StreamFormatter(base_url, fmt)
+    yield formatter.head()
+    for row in rows:
+        chunk = formatter.add(row)
+        if chunk:
+            yield chunk
+    yield formatter.tail()
+
+async def _format_stream_async(rows: AsyncIterator, base_url: str, fmt: str) -> AsyncIterator[str]:
+    formatter = _StreamFormatter(base_url, fmt)
+    yield formatter.head()
+    async for row in rows:
+        chunk = formatter.add(row)
+        if chunk:
+            yield chunk
+    yield formatter.tail()
+
+def _batch_response(results: list, summary: dict, base_url: str) -> URLBatchResponse:
+    for result in results:
+        if result["status"] == "success":
+            result["short_url"] = f"{base_url}/{result['short_code']}"
+    return URLBatchResponse(
+        status="success" if not summary["failed"] else ("failure" if summary["failed"] == len(results) else "partial"),
+        data=results,
+        **summary
+    )
+
+def _redirect_sessions(db, read_db, short_code: str, recent_write: bool = False) -> tuple:
+    # Lookups go to read_db; when that is a replica, the primary backs up its misses
+    if read_db is None or read_db is db:
+        return db, short_code, None, recent_write
+    return read_db, short_code, db, recent_write
+
+def _delete_result(deleted: bool):
+    if deleted:
+        return {"status": "success", "message": "URL deleted successfully"}, status.HTTP_200_OK
+    else:
+        return {"status": "failure", "message": "URL not found"}, status.HTTP_404_NOT_FOUND
 
 class URLController:
-    def __init__(self, db: Session):
-        self.service = CreateUrlService(db)
-        self.get_all_service = GetAllUrlsService(db)
+    """
+    Request handling for the URL endpoints.
+
+    Built once per process together with its services and repositories; each
+    call receives the request's session (db) and, for reads, the session of
+    the read replica chosen for it (read_db, which is db when there is none).
+    """
 
-    def shorten_url(self, request: URLShortenRequest, base_url: str) -> URLShortenResponse:
+    def __init__(self):
+        self.create_service = CreateUrlService()
+        self.batch_service = BatchCreateUrlService()
+        self.redirect_service = RedirectToUrlService()
+        self.get_all_service = GetAllUrlsService()
+        self.delete_service = DeleteUrlService()
+
+    def shorten_url(self, db: Session, request: URLShortenRequest, base_url: str) -> URLShortenResponse:
         try:
             original_url = str(request.original_url)
-            url = self.service.create_short_url(
+            url = self.create_service.create_short_url(
+                db,
                 original_url=original_url,
                 expiration_minutes=request.expiration_minutes
             )
-            short_url = f"{base_url}/{url.short_code}"
-            return URLShortenResponse(
-                status="success",
-                data={
-                    "short_code": url.short_code,
-                    "short_url": short_url,
-                    "original_url": url.original_url,
-                    "expires_at": url.expiration_time
-                }
+            return _shorten_success(url, base_url)
+        except ValueError as ve:
+            return URLShortenResponse(status="failure", message=str(ve))
+        except Exception as e:
+            return URLShortenResponse(status="failure", message=f"Failed to create short URL: {str(e)}")
+
+    def shorten_urls_batch(self, db: Session, items: list, base_url: str) -> URLBatchResponse:
+        try:
+            results, summary = self.batch_service.create_short_urls(db, items)
+            return _batch_response(results, summary, base_url)
+        except Exception as e:
+            return URLBatchResponse(status="failure", message=f"Failed to create short URLs: {str(e)}")
+
+    def get_original_url(self, db: Session, short_code: str, read_db: Optional[Session] = None) -> URLResponse:
+        url = self.redirect_service.get_original_url(*_redirect_sessions(db, read_db, short_code))
+        if not url:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or expired")
+        return URLResponse(original_url=url.original_url, short_code=url.short_code, created_at=url.created_at)
+
+    def get_original_url_by_code(self, db: Session, short_code: str, read_db: Optional[Session] = None,
+                                 recent_write: bool = False):
+        try:
+            return self.redirect_service.get_original_url(*_redirect_sessions(db, read_db, short_code, recent_write))
+        except Exception:
+            return None
+
+    def get_all_urls(self, db: Session, base_url: str) -> GetAllUrlsResponse:
+        try:
+            urls = self.get_all_service.get_all_urls(db)
+            data = [_url_item(url, base_url) for url in urls]
+            return GetAllUrlsResponse(status="success", data=data)
+        except Exception as e:
+            return GetAllUrlsResponse(status="failure", data=[], message=f"Failed to fetch URLs: {str(e)}")
+
+    def get_urls_page(self, db: Session, base_url: str, limit: int, after: Optional[int] = None) -> GetAllUrlsResponse:
+        try:
+            return _page_response(self.get_all_service.get_urls_page(db, limit, after), base_url, limit)
+        except Exception as e:
+            return GetAllUrlsResponse(status="failure", data=[], message=f"Failed to fetch URLs: {str(e)}")
+
+    def stream_urls(self, db: Session, base_url: str, fmt: str, after: Optional[int] = None) -> Iterator[str]:
+        return _format_stream(self.get_all_service.stream_urls(db, after), base_url, fmt)
+
+    def delete_url(self, db: Session, short_code: str):
+        return _delete_result(self.delete_service.delete_url(db, short_code))
+
+
+class AsyncURLController:
+    """URLController counterpart used when DB_MODE=async"""
+
+    def __init__(self):
+        self.create_service = AsyncCreateUrlService()
+        self.batch_service = AsyncBatchCreateUrlService()
+        self.redirect_service = AsyncRedirectToUrlService()
+        self.get_all_service = AsyncGetAllUrlsService()
+        self.delete_service = AsyncDeleteUrlService()
+
+    async def shorten_url(self, db: AsyncSession, request: URLShortenRequest, base_url: str) -> URLShortenResponse:
+        try:
+            url = await self.create_service.create_short_url(
+                db,
+                original_url=str(request.original_url),
+                expiration_minutes=request.expiration_minutes
             )
+            return _shorten_success(url, base_url)
         except ValueError as ve:
             return URLShortenResponse(status="failure", message=str(ve))
         except Exception as e:
             return URLShortenResponse(status="failure", message=f"Failed to create short URL: {str(e)}")
 
-    def get_original_url(self, short_code: str) -> URLResponse:
-        redirect_service = RedirectToUrlService(self.service.db)
-        url = redirect_service.get_original_url(short_code)
+    async def shorten_urls_batch(self, db: AsyncSession, items: list, base_url: str) -> URLBatchResponse:
+        try:
+            results, summary = await self.batch_service.create_short_urls(db, items)
+            return _batch_response(results, summary, base_url)
+        except Exception as e:
+            return URLBatchResponse(status="failure", message=f"Failed to create short URLs: {str(e)}")
+
+    async def get_original_url(self, db: AsyncSession, short_code: str,
+                               read_db: Optional[AsyncSession] = None) -> URLResponse:
+        url = await self.redirect_service.get_original_url(*_redirect_sessions(db, read_db, short_code))
         if not url:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found or expired")
         return URLResponse(original_url=url.original_url, short_code=url.short_code, created_at=url.created_at)
 
-    def get_original_url_by_code(self, short_code: str):
+    async def get_original_url_by_code(self, db: AsyncSession, short_code: str,
+                                       read_db: Optional[AsyncSession] = None, recent_write: bool = False):
         try:
-            redirect_service = RedirectToUrlService(self.service.db)
-            return redirect_service.get_original_url(short_code)
+            return await self.redirect_service.get_original_url(
+                *_redirect_sessions(db, read_db, short_code, recent_write)
+            )
         except Exception:
             return None
 
-    def get_all_urls(self, base_url: str) -> GetAllUrlsResponse:
+    async def get_all_urls(self, db: AsyncSession, base_url: str) -> GetAllUrlsResponse:
         try:
-            urls = self.get_all_service.get_all_urls()
-            data = [
-                URLItem(
-                    short_code=url.short_code,
-                    original_url=url.original_url,
-                    short_url=f"{base_url}/{url.short_code}",
-                    created_at=url.created_at,
-                    expires_at=getattr(url, 'expiration_time', None)
-                )
-                for url in urls
-            ]
+            urls = await self.get_all_service.get_all_urls(db)
+            data = [_url_item(url, base_url) for url in urls]
             return GetAllUrlsResponse(status="success", data=data)
         except Exception as e:
             return GetAllUrlsResponse(status="failure", data=[], message=f"Failed to fetch URLs: {str(e)}")
 
-    def delete_url(self, short_code: str):
-        delete_service = DeleteUrlService(self.service.db)
-        deleted = delete_service.delete_url(short_code)
-        if deleted:
-            return {"status": "success", "message": "URL deleted successfully"}, status.HTTP_200_OK
-        else:
-            return {"status": "failure", "message": "URL not found"}, status.HTTP_404_NOT_FOUND
+    async def get_urls_page(self, db: AsyncSession, base_url: str, limit: int,
+                            after: Optional[int] = None) -> GetAllUrlsResponse:
+        try:
+            urls = await self.get_all_service.get_urls_page(db, limit, after)
+            return _page_response(urls, base_url, limit)
+        except Exception as e:
+            return GetAllUrlsResponse(status="failure", data=[], message=f"Failed to fetch URLs: {str(e)}")
+
+    def stream_urls(self, db: AsyncSession, base_url: str, fmt: str, after: Optional[int] = None) -> AsyncIterator[str]:
+        return _format_stream_async(self.get_all_service.stream_urls(db, after), base_url, fmt)
+
+    async def delete_url(self, db: AsyncSession, short_code: str):
+        return _delete_result(await self.delete_service.delete_url(db, short_code))
+
+
+# Shared by every request of the process; sessions are passed per call
+url_controller = URLController()
+async_url_controller = AsyncURLController()
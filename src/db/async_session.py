@@ -0,0 +1,86 @@
+import os
+from typing import AsyncIterator, Optional
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+from .config import ASYNC_DATABASE_URL, ASYNC_DATABASE_REPLICA_URLS
+from .pool import TimedAsyncAdaptedQueuePool, pool_options
+from .replicas import AsyncReplicaSet, wrote_recently
+
+# The async engine is created on first use so the sync stack does not need an
+# asyncio driver installed
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, TimedAsyncAdaptedQueuePool)
+        )
+        # expire_on_commit=False: attributes stay loaded after commit instead of
+        # triggering an implicit (and, under asyncio, illegal) lazy refresh
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=_async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+def current_async_engine() -> Optional[AsyncEngine]:
+    """The async engine if it has been created, without creating it"""
+    return _async_engine
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    get_async_engine()
+    return _AsyncSessionLocal
+
+async def dispose_async_engine() -> None:
+    """Close every pooled connection and forget the engine"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _AsyncSessionLocal = None
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+def _create_async_replica_engine(url: str, name: str) -> AsyncEngine:
+    return create_async_engine(url, **pool_options(url, TimedAsyncAdaptedQueuePool.with_telemetry(name)))
+
+# Read replicas of the primary; empty unless (ASYNC_)DATABASE_REPLICA_URLS is set
+async_read_replicas = AsyncReplicaSet(
+    ASYNC_DATABASE_REPLICA_URLS, _create_async_replica_engine,
+    lambda engine: async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+)
+
+def get_async_read_sessionmaker(prefer_primary: bool = False) -> Optional[async_sessionmaker]:
+    """
+    Session factory for read-only queries that tolerate replica lag
+
+    Args:
+        prefer_primary: Read from the primary (e.g. the client just wrote)
+
+    Returns:
+        Optional[async_sessionmaker]: A replica's factory, or None when reads go to the primary
+    """
+    if prefer_primary or not async_read_replicas:
+        return None
+    return async_read_replicas.get_sessionmaker()
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)) -> AsyncIterator[AsyncSession]:
+    """Async counterpart of src.db.session.get_read_db"""
+    factory = get_async_read_sessionmaker(prefer_primary=wrote_recently(request.cookies))
+    if factory is None:
+        yield db
+        return
+    async with factory() as read_db:
+        yield read_db
+
+def _after_fork_in_child() -> None:
+    # See src.db.session: fresh pools for the child, the parent's left open
+    for engine in (_async_engine, *async_read_replicas.open_engines().values()):
+        if engine is not None:
+            engine.sync_engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
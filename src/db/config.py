@@ -5,7 +5,186 @@ from urllib.parse import quote_plus
 from dotenv import load_dotenv
 load_dotenv()
 
-DATABASE_URL = f"postgresql://{os.getenv('DB_USER')}:{quote_plus(os.getenv('DB_PASSWORD', ''))}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+# DATABASE_URL overrides the URL composed from the DB_* variables (e.g. sqlite:///./local.db)
+DATABASE_URL = os.getenv('DATABASE_URL') or f"postgresql://{os.getenv('DB_USER')}:{quote_plus(os.getenv('DB_PASSWORD', ''))}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+
+# Database access mode: "sync" (blocking Session, the original stack) or "async" (AsyncSession)
+DB_MODE = os.getenv('DB_MODE', 'sync').lower()
+
+# Async drivers used when DB_MODE=async and ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync SQLAlchemy URL for its asyncio counterpart"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or to_async_url(DATABASE_URL)
+
+# Read replicas (comma-separated URLs). Redirects and listings read from them
+# round-robin, skipping replicas that fail; writes always go to DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+ASYNC_DATABASE_REPLICA_URLS = (
+    [url.strip() for url in os.getenv('ASYNC_DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    or [to_async_url(url) for url in DATABASE_REPLICA_URLS]
+)
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv('REPLICA_HEALTH_CHECK_SECONDS', 5))
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', 30))  # A failed replica is skipped this long
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 10))  # Clients that wrote read from the primary
 
 # TTL configuration for bonus feature
 MINUTES_TTL_APP = int(os.getenv('MINUTES_TTL_APP', 1440))  # Default to 24 hours
+
+# Redirect cache configuration (REDIRECT_CACHE_MAX_ENTRIES=0 disables the cache)
+REDIRECT_CACHE_MAX_ENTRIES = int(os.getenv('REDIRECT_CACHE_MAX_ENTRIES', 100000))
+REDIRECT_CACHE_MAX_BYTES = int(os.getenv('REDIRECT_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # Default to 64 MiB
+REDIRECT_CACHE_TTL_SECONDS = float(os.getenv('REDIRECT_CACHE_TTL_SECONDS', 300))
+REDIRECT_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv('REDIRECT_CACHE_NEGATIVE_TTL_SECONDS', 5))
+
+# Size of the ID blocks each worker reserves from urls_id_seq (applied to the
+# sequence's INCREMENT BY by migration 0f1ab3dc375c)
+ID_BLOCK_SIZE = int(os.getenv('ID_BLOCK_SIZE', 100))
+
+# Maximum number of items accepted by POST /api/v1/batch
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 100000))
+
+# GET /api/v1/urls: default and maximum page size, and rows per fetch when streaming
+URLS_PAGE_SIZE = int(os.getenv('URLS_PAGE_SIZE', 100))
+URLS_PAGE_MAX = int(os.getenv('URLS_PAGE_MAX', 1000))
+URLS_STREAM_BATCH_SIZE = int(os.getenv('URLS_STREAM_BATCH_SIZE', 1000))
+
+# Background purge of expired URLs (one short transaction per batch)
+EXPIRY_SWEEPER_ENABLED = os.getenv('EXPIRY_SWEEPER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+EXPIRY_SWEEPER_INTERVAL_SECONDS = float(os.getenv('EXPIRY_SWEEPER_INTERVAL_SECONDS', 60))
+EXPIRY_SWEEPER_BATCH_SIZE = int(os.getenv('EXPIRY_SWEEPER_BATCH_SIZE', 1000))
+EXPIRY_SWEEPER_MAX_BATCHES = int(os.getenv('EXPIRY_SWEEPER_MAX_BATCHES', 100))  # Per run
+EXPIRY_SWEEPER_PAUSE_SECONDS = float(os.getenv('EXPIRY_SWEEPER_PAUSE_SECONDS', 0.05))  # Between batches
+
+# Click counting: per-worker in-memory aggregation flushed to url_clicks
+CLICK_TRACKING_ENABLED = os.getenv('CLICK_TRACKING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+CLICK_FLUSH_INTERVAL_SECONDS = float(os.getenv('CLICK_FLUSH_INTERVAL_SECONDS', 10))
+CLICK_BUFFER_MAX_KEYS = int(os.getenv('CLICK_BUFFER_MAX_KEYS', 100000))  # Distinct codes held between flushes
+
+# Connection pool shared by every session of a worker (one per engine). Size it
+# so workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) fits the server or PgBouncer pool
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # Seconds; -1 keeps connections forever
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+DB_POOL_WAIT_WARN_SECONDS = float(os.getenv('DB_POOL_WAIT_WARN_SECONDS', 0.1))  # Log checkouts slower than this
+
+# Prometheus metrics (GET /metrics): request latency per route and SQL timings
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Logging: "dev" keeps verbose console output, "prod" writes JSON lines from a
+# background thread and samples access logs. LOG_LEVEL defaults per mode
+LOG_MODE = os.getenv('LOG_MODE', 'dev').lower()
+LOG_LEVEL = os.getenv('LOG_LEVEL', '').upper() or None
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # Records dropped beyond this backlog
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv('ACCESS_LOG_SAMPLE_RATE', 0.01))  # 5xx responses are always logged
+
+# `python main.py`: "dev" serves from one (auto-reloading) process, "prod" from
+# WEB_CONCURRENCY worker processes, each with its own engines, caches and
+# background tasks. WEB_CONCURRENCY=0 starts one worker per available CPU
+SERVE_MODE = os.getenv('SERVE_MODE', LOG_MODE).lower()
+SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('SERVER_PORT', 8000))
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 0))
+SERVER_BACKLOG = int(os.getenv('SERVER_BACKLOG', 2048))  # Pending connections queued by the kernel
+# Keep idle client connections open longer than the load balancer's idle timeout
+KEEPALIVE_TIMEOUT_SECONDS = int(os.getenv('KEEPALIVE_TIMEOUT_SECONDS', 75))
+GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv('GRACEFUL_SHUTDOWN_SECONDS', 30))  # In-flight drain time after SIGTERM
+SERVER_LIMIT_CONCURRENCY = int(os.getenv('SERVER_LIMIT_CONCURRENCY', 0))  # Per worker, 503 beyond it; 0 = unlimited
+
+# Bloom filter of existing short codes: definite misses get a 404 without a query.
+# Codes created by other workers are picked up every REFRESH_SECONDS
+SHORT_CODE_FILTER_ENABLED = os.getenv('SHORT_CODE_FILTER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+SHORT_CODE_FILTER_FPR = float(os.getenv('SHORT_CODE_FILTER_FPR', 0.01))
+SHORT_CODE_FILTER_MIN_CAPACITY = int(os.getenv('SHORT_CODE_FILTER_MIN_CAPACITY', 1000000))
+SHORT_CODE_FILTER_REFRESH_SECONDS = float(os.getenv('SHORT_CODE_FILTER_REFRESH_SECONDS', 5))
+SHORT_CODE_FILTER_REBUILD_SECONDS = float(os.getenv('SHORT_CODE_FILTER_REBUILD_SECONDS', 3600))  # Drops deleted codes, resizes
+
+# Edge mode: serve only GET /{short_code}, from a snapshot file written by
+# `python -m src.commands.export_redirect_snapshot`, without any database. A
+# replaced file is picked up within REDIRECT_SNAPSHOT_POLL_SECONDS
+EDGE_MODE = os.getenv('EDGE_MODE', 'false').lower() in ('1', 'true', 'yes')
+REDIRECT_SNAPSHOT_PATH = os.getenv('REDIRECT_SNAPSHOT_PATH', './redirects.snapshot')
+REDIRECT_SNAPSHOT_POLL_SECONDS = float(os.getenv('REDIRECT_SNAPSHOT_POLL_SECONDS', 5))
+
+# Per-client token buckets, keyed by the client address (or, when set, the
+# RATE_LIMIT_KEY_HEADER value); 429 with Retry-After when empty. Limits are per
+# worker process. Keys whose bucket has refilled are forgotten, and at most
+# RATE_LIMIT_MAX_KEYS are tracked. Off by default: behind a proxy, turn on
+# RATE_LIMIT_TRUST_FORWARDED_FOR as well, or every user shares the proxy's buckets
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_CREATE_PER_SECOND = float(os.getenv('RATE_LIMIT_CREATE_PER_SECOND', 5))  # POST / and /batch
+RATE_LIMIT_CREATE_BURST = int(os.getenv('RATE_LIMIT_CREATE_BURST', 20))
+RATE_LIMIT_REDIRECT_PER_SECOND = float(os.getenv('RATE_LIMIT_REDIRECT_PER_SECOND', 50))  # GET /{short_code}
+RATE_LIMIT_REDIRECT_BURST = int(os.getenv('RATE_LIMIT_REDIRECT_BURST', 200))
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+# The app issues no API keys: only set a header that a gateway in front has
+# validated, or clients sidestep the limit by sending a new key per request
+RATE_LIMIT_KEY_HEADER = os.getenv('RATE_LIMIT_KEY_HEADER', '')  # Empty: limit by address only
+# Behind a proxy: take the client address from the last X-Forwarded-For entry
+RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv('RATE_LIMIT_TRUST_FORWARDED_FOR', 'false').lower() in ('1', 'true', 'yes')
+
+# Overload shedding: at most MAX_IN_FLIGHT_REQUESTS per worker; later requests
+# wait up to OVERLOAD_QUEUE_SECONDS for a slot, then get a 503. 0 = unlimited
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv('MAX_IN_FLIGHT_REQUESTS', 64))
+OVERLOAD_QUEUE_SECONDS = float(os.getenv('OVERLOAD_QUEUE_SECONDS', 0.1))
+OVERLOAD_MAX_QUEUED = int(os.getenv('OVERLOAD_MAX_QUEUED', 256))  # Waiters beyond this are shed at once
+OVERLOAD_RETRY_AFTER_SECONDS = int(os.getenv('OVERLOAD_RETRY_AFTER_SECONDS', 1))
+
+# Deleted links are purged from the CDN by a CDN_PURGE_METHOD request to
+# CDN_PURGE_URL, with {short_code} replaced, sent in the background. Empty: no purge
+CDN_PURGE_URL = os.getenv('CDN_PURGE_URL', '')
+CDN_PURGE_METHOD = os.getenv('CDN_PURGE_METHOD', 'PURGE')
+CDN_PURGE_HEADER = os.getenv('CDN_PURGE_HEADER', '')  # e.g. "Fastly-Key: <token>"
+CDN_PURGE_INTERVAL_SECONDS = float(os.getenv('CDN_PURGE_INTERVAL_SECONDS', 1))
+CDN_PURGE_TIMEOUT_SECONDS = float(os.getenv('CDN_PURGE_TIMEOUT_SECONDS', 5))
+CDN_PURGE_MAX_PENDING = int(os.getenv('CDN_PURGE_MAX_PENDING', 10000))
+
+# HTTP caching of redirects: browsers keep one for up to REDIRECT_MAX_AGE_SECONDS
+# and shared caches (CDNs) for up to REDIRECT_CDN_MAX_AGE_SECONDS, never past the
+# link's expiration_time; links expiring sooner than REDIRECT_NO_STORE_WITHIN_SECONDS
+# are sent no-store. Clicks answered by a cache never reach click tracking, and a
+# browser may keep following a deleted link for its max-age. 0 disables caching.
+# A longer CDN lifetime (s-maxage) is opt-in: it defaults to an hour only when
+# CDN_PURGE_URL is set, since nothing else removes a deleted link from the CDN
+REDIRECT_STATUS_CODE = int(os.getenv('REDIRECT_STATUS_CODE', 307))  # 301, 302, 307 or 308
+REDIRECT_MAX_AGE_SECONDS = int(os.getenv('REDIRECT_MAX_AGE_SECONDS', 60))
+REDIRECT_CDN_MAX_AGE_SECONDS = int(
+    os.getenv('REDIRECT_CDN_MAX_AGE_SECONDS') or (3600 if CDN_PURGE_URL else REDIRECT_MAX_AGE_SECONDS)
+)
+REDIRECT_NO_STORE_WITHIN_SECONDS = int(os.getenv('REDIRECT_NO_STORE_WITHIN_SECONDS', 60))
+REDIRECT_SURROGATE_KEY_HEADER = os.getenv('REDIRECT_SURROGATE_KEY_HEADER', 'Surrogate-Key')  # Empty: not sent
+
+# Shared redirect cache over the Redis protocol (redis://[:password@]host:port/db),
+# consulted after a worker's own cache and before the database, so workers and
+# pods warm one cache between them. Deletes are published on SHARED_CACHE_CHANNEL
+# and every worker drops its own copy; new codes are announced on it too, for
+# every worker's short code filter. Empty: disabled. While the server is
+# unreachable, lookups go straight to the database for SHARED_CACHE_RETRY_SECONDS
+SHARED_CACHE_URL = os.getenv('SHARED_CACHE_URL', '')
+SHARED_CACHE_TTL_SECONDS = int(os.getenv('SHARED_CACHE_TTL_SECONDS', 3600))  # Never past expiration_time
+SHARED_CACHE_KEY_PREFIX = os.getenv('SHARED_CACHE_KEY_PREFIX', 'url:')
+SHARED_CACHE_CHANNEL = os.getenv('SHARED_CACHE_CHANNEL', 'url-invalidations')
+SHARED_CACHE_TIMEOUT_SECONDS = float(os.getenv('SHARED_CACHE_TIMEOUT_SECONDS', 0.05))
+SHARED_CACHE_RETRY_SECONDS = float(os.getenv('SHARED_CACHE_RETRY_SECONDS', 5))
+SHARED_CACHE_POOL_SIZE = int(os.getenv('SHARED_CACHE_POOL_SIZE', 8))  # Idle connections kept per worker
+# Entries found in the database are written in one pipeline per interval
+SHARED_CACHE_WRITE_INTERVAL_SECONDS = float(os.getenv('SHARED_CACHE_WRITE_INTERVAL_SECONDS', 0.01))
+SHARED_CACHE_MAX_PENDING_WRITES = int(os.getenv('SHARED_CACHE_MAX_PENDING_WRITES', 10000))
+
+# Range partitioning of urls by created_at (PostgreSQL, migration f3c9a1d5b720).
+# manage_url_partitions keeps daily partitions URL_PARTITION_PRECREATE_DAYS ahead
+# and retires the partitions whose links have all expired: dropped, or detached
+# into URL_PARTITION_ARCHIVE_SCHEMA when set. Retention is then a partition drop,
+# so the expiry sweeper (EXPIRY_SWEEPER_ENABLED) can be turned off
+URL_PARTITION_PRECREATE_DAYS = int(os.getenv('URL_PARTITION_PRECREATE_DAYS', 7))
+URL_PARTITION_ARCHIVE_SCHEMA = os.getenv('URL_PARTITION_ARCHIVE_SCHEMA', '')  # Empty: drop
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from .config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_POOL_WAIT_WARN_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTelemetry:
+    """
+    Checkout wait times of a connection pool.
+
+    A checkout only waits when every pooled and overflow connection is in use,
+    so slow checkouts and timeouts are the early sign of an undersized pool.
+    """
+
+    def __init__(self, name: str, warn_seconds: float = DB_POOL_WAIT_WARN_SECONDS):
+        self.name = name
+        self.warn_seconds = warn_seconds
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            if timed_out:
+                self.timeouts += 1
+            elif wait >= self.warn_seconds:
+                self.slow_checkouts += 1
+        if timed_out:
+            logger.error("%s pool exhausted: no connection after %.3fs", self.name, wait)
+        elif wait >= self.warn_seconds:
+            logger.warning("%s pool checkout waited %.3fs", self.name, wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": self.total_wait_seconds,
+                "avg_wait_seconds": self.total_wait_seconds / self.checkouts if self.checkouts else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class _TimedCheckout:
+    telemetry: PoolTelemetry
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.telemetry.record(time.perf_counter() - started)
+        return connection
+
+    @classmethod
+    def with_telemetry(cls, name: str):
+        """Subclass reporting to its own PoolTelemetry, for an engine whose waits are tracked separately"""
+        return type(cls.__name__, (cls,), {"telemetry": PoolTelemetry(name)})
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long each checkout waited"""
+    telemetry = PoolTelemetry("sync")
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited"""
+    telemetry = PoolTelemetry("async")
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Engine keyword arguments for the configured pool
+
+    Args:
+        url: The database URL the engine connects to
+        poolclass: Pool class to use for server databases
+
+    Returns:
+        dict: Keyword arguments for create_engine() / create_async_engine()
+    """
+    parsed = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's pool
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def pool_stats(engine) -> dict:
+    """
+    Live statistics of an engine's connection pool
+
+    Args:
+        engine: An Engine or AsyncEngine
+
+    Returns:
+        dict: Pool occupancy and, for timed pools, checkout wait statistics
+    """
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, _TimedCheckout):
+        stats.update(pool.telemetry.stats())
+    return stats
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+
+from .config import (
+    DATABASE_REPLICA_URLS,
+    ASYNC_DATABASE_REPLICA_URLS,
+    REPLICA_HEALTH_CHECK_SECONDS,
+    REPLICA_RETRY_SECONDS,
+    READ_YOUR_WRITES_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cookie set on write responses; holds the time until which that client's reads go to the primary
+READ_YOUR_WRITES_COOKIE = "rw_until"
+
+
+class Replica:
+    """One read replica: its engine (opened on first use) and health"""
+
+    def __init__(self, url: str, name: str):
+        self.url = url
+        self.name = name
+        self.engine = None
+        self.sessionmaker = None
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def stats(self) -> dict:
+        return {
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "open": self.engine is not None,
+            "reads": self.reads,
+            "failures": self.failures,
+            "retry_in_seconds": max(self.down_until - time.monotonic(), 0.0),
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """
+    Read replicas of the primary database, chosen round-robin per session.
+
+    A replica that raises a connection-level error is skipped for
+    retry_seconds; the background health check re-admits it as soon as it
+    answers again (and takes out replicas that stop answering). When no
+    replica is healthy, readers fall back to the primary.
+    """
+
+    def __init__(self, urls: List[str], engine_factory: Callable, sessionmaker_factory: Callable,
+                 name: str = "sync", retry_seconds: float = REPLICA_RETRY_SECONDS,
+                 check_seconds: float = REPLICA_HEALTH_CHECK_SECONDS):
+        self.name = name
+        self.replicas = [Replica(url, f"{name}_replica_{index}") for index, url in enumerate(urls)]
+        self.engine_factory = engine_factory
+        self.sessionmaker_factory = sessionmaker_factory
+        self.retry_seconds = retry_seconds
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Pick the next healthy replica
+
+        Returns:
+            Optional[Replica]: The replica to read from, or None to read from the primary
+        """
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._next]
+                self._next = (self._next + 1) % len(self.replicas)
+                if replica.healthy:
+                    replica.reads += 1
+                    break
+            else:
+                return None
+            if replica.engine is None:
+                self._open(replica)
+        return replica
+
+    def get_sessionmaker(self):
+        """Session factory of the next healthy replica, or None when reads must use the primary"""
+        replica = self.choose()
+        return replica.sessionmaker if replica is not None else None
+
+    def mark_down(self, replica: Replica, reason: str) -> None:
+        was_healthy = replica.healthy
+        replica.down_until = time.monotonic() + self.retry_seconds
+        replica.failures += 1
+        replica.last_error = reason
+        if was_healthy:
+            logger.warning("Read replica %s taken out of rotation: %s", replica.name, reason)
+
+    def mark_up(self, replica: Replica) -> None:
+        if not replica.healthy:
+            logger.info("Read replica %s back in rotation", replica.name)
+        replica.down_until = 0.0
+
+    async def check(self) -> None:
+        """Ping every replica once, updating its health"""
+        for replica in self.replicas:
+            with self._lock:
+                if replica.engine is None:
+                    self._open(replica)
+            try:
+                await self._ping(replica.engine)
+            except Exception as e:
+                self.mark_down(replica, str(e))
+            else:
+                self.mark_up(replica)
+
+    def start(self) -> None:
+        """Health-check the replicas in the background"""
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run_forever(), name=f"{self.name}-replica-health")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def open_engines(self) -> Dict[str, object]:
+        """Engines of the replicas opened so far, by replica name"""
+        return {replica.name: replica.engine for replica in self.replicas if replica.engine is not None}
+
+    def stats(self) -> List[dict]:
+        return [replica.stats() for replica in self.replicas]
+
+    def _open(self, replica: Replica) -> None:
+        replica.engine = self.engine_factory(replica.url, replica.name)
+        replica.sessionmaker = self.sessionmaker_factory(replica.engine)
+
+        def on_error(context):
+            # Connection-level failures (refused, dropped, unreachable) take the
+            # replica out; statement errors are left to the caller
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+                self.mark_down(replica, str(context.original_exception))
+
+        event.listen(getattr(replica.engine, "sync_engine", replica.engine), "handle_error", on_error)
+
+    async def _ping(self, engine) -> None:
+        await asyncio.to_thread(_ping_sync, engine)
+
+    def _close_engines(self) -> List:
+        with self._lock:
+            engines = [replica.engine for replica in self.replicas if replica.engine is not None]
+            for replica in self.replicas:
+                replica.engine = replica.sessionmaker = None
+        return engines
+
+    def dispose(self) -> None:
+        """Close every replica connection; engines reopen on next use"""
+        for engine in self._close_engines():
+            engine.dispose()
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Read replica health check failed")
+            await asyncio.sleep(self.check_seconds)
+
+
+class AsyncReplicaSet(ReplicaSet):
+    """ReplicaSet of AsyncEngines, used when DB_MODE=async"""
+
+    def __init__(self, urls: List[str], engine_factory: Callable, sessionmaker_factory: Callable, **kwargs):
+        super().__init__(urls, engine_factory, sessionmaker_factory, name="async", **kwargs)
+
+    async def _ping(self, engine) -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def dispose(self) -> None:
+        for engine in self._close_engines():
+            await engine.dispose()
+
+
+def _ping_sync(engine) -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def replicas_configured() -> bool:
+    return bool(DATABASE_REPLICA_URLS or ASYNC_DATABASE_REPLICA_URLS)
+
+
+def wrote_recently(cookies: Dict[str, str]) -> bool:
+    """
+    Whether a client's read-your-writes window is still open
+
+    Args:
+        cookies: The request cookies
+
+    Returns:
+        bool: True if the client's reads should go to the primary
+    """
+    try:
+        return float(cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def remember_write(response, window: float = READ_YOUR_WRITES_SECONDS) -> None:
+    """
+    Route the client's reads to the primary for the next `window` seconds, so
+    it sees its own writes however far the replicas lag
+
+    Args:
+        response: The response to the write request
+        window: Seconds during which the client reads from the primary
+    """
+    if replicas_configured() and window > 0:
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, f"{time.time() + window:.3f}",
+            max_age=int(window) + 1, httponly=True, samesite="lax"
+        )
@@ -1,16 +1,93 @@
+import os
+from typing import Optional
+from fastapi import Depends
 from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import DATABASE_URL
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import Request
+from .config import DATABASE_URL, DATABASE_REPLICA_URLS
+from .pool import TimedQueuePool, pool_options
+from .replicas import ReplicaSet, wrote_recently
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The one sync engine (and pool) of the process. It is created by the application
+# lifespan, or on first use, so importing this module does not connect anywhere
+_engine: Optional[Engine] = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-Base = declarative_base()
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, TimedQueuePool))
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+def current_engine() -> Optional[Engine]:
+    """The sync engine if it has been created, without creating it"""
+    return _engine
+
+def get_sessionmaker() -> sessionmaker:
+    get_engine()
+    return SessionLocal
+
+def dispose_engine() -> None:
+    """Close every pooled connection and forget the engine"""
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
 
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+def _create_replica_engine(url: str, name: str) -> Engine:
+    return create_engine(url, **pool_options(url, TimedQueuePool.with_telemetry(name)))
+
+# Read replicas of the primary; empty unless DATABASE_REPLICA_URLS is set
+read_replicas = ReplicaSet(
+    DATABASE_REPLICA_URLS, _create_replica_engine,
+    lambda engine: sessionmaker(bind=engine, autocommit=False, autoflush=False)
+)
+
+def get_read_sessionmaker(prefer_primary: bool = False) -> Optional[sessionmaker]:
+    """
+    Session factory for read-only queries that tolerate replica lag
+
+    Args:
+        prefer_primary: Read from the primary (e.g. the client just wrote)
+
+    Returns:
+        Optional[sessionmaker]: A replica's factory, or None when reads go to the primary
+    """
+    if prefer_primary or not read_replicas:
+        return None
+    return read_replicas.get_sessionmaker()
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Session for redirects and listings: a replica's, or the request's primary
+    session itself when there is no healthy replica or the client is inside
+    its read-your-writes window
+    """
+    factory = get_read_sessionmaker(prefer_primary=wrote_recently(request.cookies))
+    if factory is None:
+        yield db
+        return
+    read_db = factory()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+def _after_fork_in_child() -> None:
+    # Pooled connections are sockets shared with the parent: give the child
+    # fresh pools without closing the parent's connections
+    for engine in (_engine, *read_replicas.open_engines().values()):
+        if engine is not None:
+            engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
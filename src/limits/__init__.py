@@ -0,0 +1,13 @@
+from .token_bucket import TokenBucketLimiter, create_limiter, redirect_limiter
+from .concurrency import ConcurrencyLimiter, overload_limiter
+from .middleware import OverloadMiddleware, RateLimitMiddleware
+
+__all__ = [
+    "TokenBucketLimiter",
+    "create_limiter",
+    "redirect_limiter",
+    "ConcurrencyLimiter",
+    "overload_limiter",
+    "OverloadMiddleware",
+    "RateLimitMiddleware"
+]
@@ -0,0 +1,111 @@
+import asyncio
+from collections import deque
+
+from src.db.config import MAX_IN_FLIGHT_REQUESTS, OVERLOAD_QUEUE_SECONDS, OVERLOAD_MAX_QUEUED
+
+
+class ConcurrencyLimiter:
+    """
+    Cap on requests in flight, with a short bounded queue in front of it.
+
+    Unlike asyncio.Semaphore it is not bound to the first event loop that
+    waits on it, and it counts what it sheds. A released slot is handed
+    straight to the oldest waiter, so a queued request is never overtaken by
+    one that arrived after it.
+    """
+
+    def __init__(self, limit: int = MAX_IN_FLIGHT_REQUESTS,
+                 queue_seconds: float = OVERLOAD_QUEUE_SECONDS,
+                 max_queued: int = OVERLOAD_MAX_QUEUED):
+        self.limit = limit
+        self.queue_seconds = queue_seconds
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    async def acquire(self) -> bool:
+        """
+        Wait briefly for a slot
+
+        Returns:
+            bool: True if the request holds a slot and must release() it, False
+            if it should be shed
+        """
+        if not self.enabled:
+            return True
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queued or self.queue_seconds <= 0:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_seconds)
+        except asyncio.TimeoutError:
+            # release() may have handed over the slot just as the wait timed out
+            if not waiter.done():
+                waiter.cancel()
+                self.shed += 1
+                return False
+        except BaseException:
+            # The client went away while queued: pass on a slot it was given
+            if waiter.done():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Give a slot back, to the oldest waiter if there is one"""
+        if not self.enabled:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot changes hands, so in_flight stays the same
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        """
+        Snapshot of the limiter counters
+
+        Returns:
+            dict: Requests in flight and waiting, and admitted/shed counts
+        """
+        return {
+            "enabled": self.enabled,
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "max_queued": self.max_queued,
+            "queue_seconds": self.queue_seconds,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+        }
+
+
+# Requests this worker serves at once; the rest wait briefly or get a 503
+overload_limiter = ConcurrencyLimiter()
@@ -0,0 +1,132 @@
+from typing import Optional
+
+from starlette.responses import JSONResponse
+
+from src.db.config import RATE_LIMIT_KEY_HEADER, RATE_LIMIT_TRUST_FORWARDED_FOR, OVERLOAD_RETRY_AFTER_SECONDS
+from src.limits.concurrency import ConcurrencyLimiter, overload_limiter
+from src.limits.token_bucket import TokenBucketLimiter, create_limiter, redirect_limiter, retry_after_header
+
+
+def classify_request(method: str, path: str, prefix: str = "/api/v1") -> Optional[str]:
+    """
+    Name the rate limit a request counts against
+
+    Runs before routing, so it matches the paths of the URL endpoints directly.
+
+    Args:
+        method: The HTTP method
+        path: The request path
+        prefix: The prefix the URL router is mounted under
+
+    Returns:
+        "create", "redirect", or None for requests that are not rate limited
+    """
+    if not path.startswith(prefix + "/"):
+        return None
+    rest = path[len(prefix) + 1:]
+    if method == "POST" and rest in ("", "batch"):
+        return "create"
+    if method == "GET" and rest and "/" not in rest and rest != "urls":
+        return "redirect"
+    return None
+
+
+def client_key(scope, key_header: str = RATE_LIMIT_KEY_HEADER,
+               trust_forwarded_for: bool = RATE_LIMIT_TRUST_FORWARDED_FOR) -> str:
+    """
+    Identify the client a request is counted against
+
+    Keys are not authenticated here, so a key header is only honored when one
+    is configured (RATE_LIMIT_KEY_HEADER, empty by default); set it only where
+    a gateway rejects unknown keys, or rotating keys sidesteps the limit.
+
+    Args:
+        scope: The ASGI connection scope
+        key_header: Header carrying a validated API key, preferred over the address
+        trust_forwarded_for: Whether a proxy in front of us sets X-Forwarded-For
+
+    Returns:
+        str: "key:<api key>" or "ip:<client address>"
+    """
+    wanted = key_header.lower().encode("latin-1") if key_header else None
+    forwarded = None
+    for name, value in scope.get("headers", ()):
+        if name == wanted and value:
+            return "key:" + value.decode("latin-1")
+        if name == b"x-forwarded-for":
+            forwarded = value
+    if trust_forwarded_for and forwarded:
+        # Our proxy appends the address it saw; anything before it came from the client
+        return "ip:" + forwarded.decode("latin-1").rsplit(",", 1)[-1].strip()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying per-client token buckets.
+
+    Creates and redirects have separate buckets, so a client shortening in bulk
+    does not use up the budget of the links it hands out. An empty bucket is
+    answered with a 429 and Retry-After before the request reaches a session.
+    """
+
+    def __init__(self, app, limiters=None, prefix: str = "/api/v1"):
+        self.app = app
+        self.limiters = limiters if limiters is not None else {
+            "create": create_limiter, "redirect": redirect_limiter
+        }
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            limiter: Optional[TokenBucketLimiter] = self.limiters.get(
+                classify_request(scope["method"], scope["path"], self.prefix)
+            )
+            if limiter is not None and limiter.enabled:
+                allowed, retry_after = limiter.acquire(client_key(scope))
+                if not allowed:
+                    response = JSONResponse(
+                        content={"status": "failure", "message": "Too many requests"},
+                        status_code=429,
+                        headers={"retry-after": retry_after_header(retry_after)},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+
+class OverloadMiddleware:
+    """
+    Pure ASGI middleware capping the requests a worker serves at once.
+
+    Past the cap a request waits a moment for a slot and is then shed with a
+    503 and Retry-After, which keeps latency bounded for the requests that are
+    admitted instead of letting every request queue on the connection pool.
+    """
+
+    def __init__(self, app, limiter: ConcurrencyLimiter = overload_limiter,
+                 skip_prefixes=("/metrics", "/api/v1/stats"),
+                 retry_after_seconds: int = OVERLOAD_RETRY_AFTER_SECONDS):
+        self.app = app
+        self.limiter = limiter
+        self.skip_prefixes = tuple(skip_prefixes)
+        self.retry_after = retry_after_header(retry_after_seconds)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire():
+            response = JSONResponse(
+                content={"status": "failure", "message": "Server is overloaded"},
+                status_code=503,
+                headers={"retry-after": self.retry_after},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
@@ -0,0 +1,126 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from src.db.config import (
+    RATE_LIMIT_CREATE_PER_SECOND,
+    RATE_LIMIT_CREATE_BURST,
+    RATE_LIMIT_REDIRECT_PER_SECOND,
+    RATE_LIMIT_REDIRECT_BURST,
+    RATE_LIMIT_MAX_KEYS,
+)
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets, each stored as a single float.
+
+    A bucket refilling at `rate` tokens per second up to `burst` is tracked by
+    the time at which it will be full again (the generic cell rate algorithm),
+    so a key costs one dict entry rather than a token count and a timestamp.
+    Once that time has passed the bucket is full and the key carries no state,
+    which is what lets idle keys be dropped without changing any decision.
+
+    Keys are kept in least recently used order: idle ones are swept off the
+    front as new keys arrive, and beyond max_keys the oldest key is dropped even
+    if it is still draining, which hands that client a full bucket rather than
+    growing without bound. Called from the event loop only, so it takes no lock.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = RATE_LIMIT_MAX_KEYS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._capacity = self._interval * self.burst
+        # key -> monotonic time at which its bucket is full again
+        self._full_at: "OrderedDict[str, float]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.max_keys > 0
+
+    def acquire(self, key: str) -> Tuple[bool, float]:
+        """
+        Take one token from a key's bucket
+
+        Args:
+            key: The client the request is counted against
+
+        Returns:
+            Tuple[bool, float]: Whether the request may proceed, and if not, the
+            seconds until a token is available
+        """
+        if not self.enabled:
+            return True, 0.0
+        now = self._clock()
+        full_at = max(self._full_at.get(key, now), now) + self._interval
+        if full_at - now > self._capacity:
+            self.limited += 1
+            return False, full_at - now - self._capacity
+        self._full_at[key] = full_at
+        self._full_at.move_to_end(key)
+        self.allowed += 1
+        self._evict(now)
+        return True, 0.0
+
+    def tokens(self, key: str) -> int:
+        """
+        Whole tokens left in a key's bucket
+
+        Args:
+            key: The client to look up
+
+        Returns:
+            int: Requests the key may still make right now
+        """
+        if not self.enabled:
+            return self.burst
+        debt = self._full_at.get(key, 0.0) - self._clock()
+        return self.burst if debt <= 0 else int((self._capacity - debt) / self._interval + 1e-9)
+
+    def stats(self) -> dict:
+        """
+        Snapshot of the limiter counters
+
+        Returns:
+            dict: Configured limits, tracked keys and allowed/limited counts
+        """
+        return {
+            "enabled": self.enabled,
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "keys": len(self._full_at),
+            "max_keys": self.max_keys,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self, now: float) -> None:
+        entries = self._full_at
+        # A front key untouched for a whole bucket's refill time is full; stop at
+        # the first that is not, so each call does O(1) amortised work
+        while entries:
+            key, full_at = next(iter(entries.items()))
+            if full_at > now and len(entries) <= self.max_keys:
+                break
+            del entries[key]
+            if full_at > now:
+                self.evictions += 1
+
+
+def retry_after_header(seconds: float) -> str:
+    """Whole seconds for a Retry-After header, never below 1"""
+    return str(max(1, math.ceil(seconds)))
+
+
+# Per-worker limits for the two endpoints that cost the database the most
+create_limiter = TokenBucketLimiter(RATE_LIMIT_CREATE_PER_SECOND, RATE_LIMIT_CREATE_BURST)
+redirect_limiter = TokenBucketLimiter(RATE_LIMIT_REDIRECT_PER_SECOND, RATE_LIMIT_REDIRECT_BURST)
@@ -0,0 +1,13 @@
+from .registry import Counter, Histogram, MetricsRegistry, metrics_registry
+from .middleware import MetricsMiddleware
+from .sql import instrument_engines
+from . import collectors  # noqa: F401  (registers pool, cache and click gauges)
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "metrics_registry",
+    "MetricsMiddleware",
+    "instrument_engines"
+]
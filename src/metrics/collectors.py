@@ -0,0 +1,98 @@
+from src.cache.redirect_cache import redirect_cache
+from src.cache.redirect_snapshot import redirect_snapshot
+from src.cache.shared_cache import shared_redirect_cache
+from src.cache.short_code_filter import short_code_filter
+from src.db.async_session import current_async_engine, async_read_replicas
+from src.db.pool import pool_stats
+from src.db.session import current_engine, read_replicas
+from src.limits import create_limiter, redirect_limiter, overload_limiter
+from src.metrics.registry import metrics_registry
+from src.services.click_buffer import click_buffer
+from src.services.cdn_purger import cdn_purger
+
+
+def _pool_value(key: str):
+    def collect():
+        engines = {
+            "sync": current_engine(), "async": current_async_engine(),
+            **read_replicas.open_engines(), **async_read_replicas.open_engines(),
+        }
+        values = {}
+        for name, engine in engines.items():
+            if engine is not None:
+                stats = pool_stats(engine)
+                if key in stats:
+                    values[(name,)] = stats[key]
+        return values
+    return collect
+
+
+def _stat(source, key: str):
+    return lambda: {(): source.stats()[key]}
+
+
+metrics_registry.callback("db_pool_size", "Configured pool size", ["engine"], _pool_value("size"))
+metrics_registry.callback("db_pool_checked_out", "Connections in use", ["engine"], _pool_value("checked_out"))
+metrics_registry.callback("db_pool_overflow", "Overflow connections open", ["engine"], _pool_value("overflow"))
+metrics_registry.callback(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up waiting for a connection", ["engine"],
+    _pool_value("timeouts"), "counter"
+)
+metrics_registry.callback(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for connections", ["engine"],
+    _pool_value("total_wait_seconds"), "counter"
+)
+metrics_registry.callback(
+    "db_replica_healthy", "1 while the read replica is in rotation", ["replica"],
+    lambda: {(replica.name,): int(replica.healthy) for replicas in (read_replicas, async_read_replicas)
+             for replica in replicas.replicas}
+)
+metrics_registry.callback("redirect_cache_entries", "Entries in the redirect cache", [], _stat(redirect_cache, "entries"))
+metrics_registry.callback("redirect_cache_hits_total", "Redirect cache hits", [], _stat(redirect_cache, "hits"), "counter")
+metrics_registry.callback("redirect_cache_misses_total", "Redirect cache misses", [], _stat(redirect_cache, "misses"), "counter")
+metrics_registry.callback(
+    "shared_cache_available", "1 while the shared cache is in use", [],
+    lambda: {(): int(shared_redirect_cache.available)} if shared_redirect_cache.enabled else {}
+)
+metrics_registry.callback("shared_cache_hits_total", "Shared cache hits", [], _stat(shared_redirect_cache, "hits"), "counter")
+metrics_registry.callback("shared_cache_misses_total", "Shared cache misses", [], _stat(shared_redirect_cache, "misses"), "counter")
+metrics_registry.callback(
+    "shared_cache_errors_total", "Shared cache requests that failed", [],
+    _stat(shared_redirect_cache, "errors"), "counter"
+)
+metrics_registry.callback("click_buffer_pending_keys", "Short codes with unflushed clicks", [], _stat(click_buffer, "pending_keys"))
+metrics_registry.callback("click_buffer_dropped_total", "Clicks dropped by a full buffer", [], _stat(click_buffer, "dropped"), "counter")
+metrics_registry.callback("short_code_filter_memory_bytes", "Bloom filter size", [], _stat(short_code_filter, "memory_bytes"))
+metrics_registry.callback(
+    "short_code_filter_estimated_fpr", "Bloom filter false-positive probability", [],
+    _stat(short_code_filter, "estimated_false_positive_rate")
+)
+metrics_registry.callback(
+    "short_code_filter_definite_misses_total", "Redirects answered 404 by the filter", [],
+    _stat(short_code_filter, "definite_misses"), "counter"
+)
+metrics_registry.callback("redirect_snapshot_records", "Records in the served snapshot", [], _stat(redirect_snapshot, "records"))
+metrics_registry.callback(
+    "redirect_snapshot_age_seconds", "Age of the served snapshot", [],
+    lambda: {(): redirect_snapshot.stats()["age_seconds"]} if redirect_snapshot.ready else {}
+)
+metrics_registry.callback(
+    "rate_limited_requests_total", "Requests answered 429 by a per-client limit", ["limit"],
+    lambda: {("create",): create_limiter.limited, ("redirect",): redirect_limiter.limited}, "counter"
+)
+metrics_registry.callback(
+    "rate_limit_keys", "Clients with a draining token bucket", ["limit"],
+    lambda: {("create",): create_limiter.stats()["keys"], ("redirect",): redirect_limiter.stats()["keys"]}
+)
+metrics_registry.callback("requests_in_flight", "Requests holding an in-flight slot", [], _stat(overload_limiter, "in_flight"))
+metrics_registry.callback("requests_waiting", "Requests queued for an in-flight slot", [], _stat(overload_limiter, "waiting"))
+metrics_registry.callback(
+    "overload_shed_requests_total", "Requests answered 503 by the in-flight cap", [],
+    _stat(overload_limiter, "shed"), "counter"
+)
+metrics_registry.callback("cdn_purges_pending", "Deleted short codes waiting to be purged", [], _stat(cdn_purger, "pending"))
+metrics_registry.callback("cdn_purges_total", "Short codes purged from the CDN", [], _stat(cdn_purger, "purged"), "counter")
+metrics_registry.callback(
+    "cdn_purge_failures_total", "CDN purge requests that failed and were queued again", [],
+    _stat(cdn_purger, "failed"), "counter"
+)
@@ -0,0 +1,57 @@
+import time
+
+from src.metrics.registry import metrics_registry
+from src.metrics.sql import request_query_count
+
+HTTP_REQUESTS = metrics_registry.counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, including streamed bodies", ["method", "route"]
+)
+HTTP_REQUEST_QUERIES = metrics_registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ["method", "route"],
+    (0, 1, 2, 3, 5, 10, 25, 50, 100)
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and query count per route.
+
+    Requests are labelled with the name of the matched route (e.g.
+    redirect_to_original_url) rather than the raw path, which keeps the number
+    of series bounded however many short codes are requested.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        queries = [0]
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = request_query_count.set(queries)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            request_query_count.reset(token)
+            route = scope.get("route")
+            route_name = getattr(route, "name", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route_name, str(status_code))
+            HTTP_REQUEST_DURATION.observe(duration, method, route_name)
+            HTTP_REQUEST_QUERIES.observe(queries[0], method, route_name)
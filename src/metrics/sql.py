@@ -0,0 +1,52 @@
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.metrics.registry import metrics_registry
+
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK", "SET"})
+
+DB_QUERY_DURATION = metrics_registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ["operation"], DB_BUCKETS
+)
+
+# Statements executed by the current request; set by the HTTP middleware. Context
+# variables follow the request into run_in_threadpool and asyncio tasks
+request_query_count: ContextVar[Optional[List[int]]] = ContextVar("request_query_count", default=None)
+
+_installed = False
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip()[:8].split(None, 1)
+    operation = keyword[0].upper() if keyword else ""
+    return operation if operation in _OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the connection: when a statement
+    # fails after_cursor_execute never runs, and the context goes away with it
+    if context is not None:
+        context.metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "metrics_query_start", None)
+    if started is None:
+        return
+    DB_QUERY_DURATION.observe(time.perf_counter() - started, _operation(statement))
+    counter = request_query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def instrument_engines() -> None:
+    """Time every statement of every engine (sync and async) in this process"""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
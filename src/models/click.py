@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+
+# Relative so Alembic, which imports models.* from src/, shares the same Base
+from .url import Base
+
+class URLClick(Base):
+    __tablename__ = "url_clicks"
+
+    # Keyed by short code rather than a foreign key, so flushing counts never
+    # contends with deletes of the urls row
+    short_code = Column(String(10), primary_key=True)
+    clicks = Column(BigInteger, nullable=False, default=0)
+    last_clicked_at = Column(DateTime, nullable=True)
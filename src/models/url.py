@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import re
@@ -6,11 +6,48 @@ import re
 Base = declarative_base()
 
 class URL(Base):
+    # On PostgreSQL, migration f3c9a1d5b720 range-partitions this table by
+    # created_at: the primary key becomes (id, created_at) and short_code and
+    # original_url_hash are indexed but no longer unique (see url_partitions).
+    # The model keeps the unpartitioned shape SQLite is created from;
+    # migrations/env.py leaves the replaced indexes out of autogenerate, and
+    # url_digests stands in for the unique digest index
     __tablename__ = "urls"
+    __table_args__ = (
+        # Partial index: only rows that can expire, for the expiry sweeper
+        Index(
+            "ix_urls_expiration_time", "expiration_time",
+            postgresql_where=text("expiration_time IS NOT NULL"),
+            sqlite_where=text("expiration_time IS NOT NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     original_url = Column(String, nullable=False)  # Changed from url_original to original_url
+    original_url_hash = Column(String(64), unique=True, nullable=True, index=True)  # SHA-256 of the normalized original_url, for dedup
     short_code = Column(String(10), unique=True, nullable=False, index=True)  # Changed from code_short to short_code
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # Indexed for the short code filter refresh
     expiration_time = Column(DateTime, nullable=True)  # For TTL feature
-    
+
+
+class URLDigest(Base):
+    # One row per digest: the unique index on original_url_hash that a
+    # partitioned urls table cannot have. Creates claim the digest here with
+    # INSERT ... ON CONFLICT before inserting into urls, and the row points at
+    # the urls row (url_id, created_at) that holds it. Only written while urls
+    # is partitioned (migration b81d4e6c2f37)
+    __tablename__ = "url_digests"
+    __table_args__ = (
+        # Expired digests can be taken over, and are purged by the partition command
+        Index(
+            "ix_url_digests_expiration_time", "expiration_time",
+            postgresql_where=text("expiration_time IS NOT NULL"),
+            sqlite_where=text("expiration_time IS NOT NULL"),
+        ),
+    )
+
+    original_url_hash = Column(String(64), primary_key=True)
+    url_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    short_code = Column(String(10), nullable=False)
+    expiration_time = Column(DateTime, nullable=True)
@@ -1,15 +1,25 @@
 
-from .base_repo import BaseRepo
-from .create_url_repository import CreateUrlRepository
-from .redirect_to_url_repository import RedirectToUrlRepository
-from .get_all_urls_repository import GetAllUrlsRepository
-from .delete_url_repository import DeleteUrlRepository
+from .base_repo import BaseRepo, AsyncBaseRepo
+from .create_url_repository import CreateUrlRepository, AsyncCreateUrlRepository
+from .redirect_to_url_repository import RedirectToUrlRepository, AsyncRedirectToUrlRepository
+from .get_all_urls_repository import GetAllUrlsRepository, AsyncGetAllUrlsRepository
+from .delete_url_repository import DeleteUrlRepository, AsyncDeleteUrlRepository
+from .click_repository import ClickRepository, AsyncClickRepository
+from .url_partition_repository import UrlPartitionRepository
 
 __all__ = [
     "BaseRepo",
     "CreateUrlRepository",
     "RedirectToUrlRepository", 
     "GetAllUrlsRepository",
-    "DeleteUrlRepository"
+    "DeleteUrlRepository",
+    "AsyncBaseRepo",
+    "AsyncCreateUrlRepository",
+    "AsyncRedirectToUrlRepository",
+    "AsyncGetAllUrlsRepository",
+    "AsyncDeleteUrlRepository",
+    "ClickRepository",
+    "AsyncClickRepository",
+    "UrlPartitionRepository"
 ]
 
@@ -1,48 +1,96 @@
 from typing import TypeVar, Generic, Optional, List
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import delete, select
 from datetime import datetime
 
 T = TypeVar('T')
 
 class BaseRepo(Generic[T]):
-    """Base repository with common CRUD operations"""
-    
-    def __init__(self, db: Session, model: T):
-        self.db = db
+    """
+    Base repository with common CRUD operations.
+
+    Repositories hold no session: they are built once per process and every
+    method takes the session of the request or job it works for.
+    """
+
+    def __init__(self, model: T):
+        self.model = model
+
+    def create(self, db: Session, obj) -> T:
+        """Create a new object in database"""
+        db.add(obj)
+        db.commit()
+        db.refresh(obj)
+        return obj
+
+    def get_by_id(self, db: Session, id: int) -> Optional[T]:
+        """Get object by ID"""
+        return db.query(self.model).filter(self.model.id == id).first()
+
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[T]:
+        """Get all objects with pagination"""
+        return db.query(self.model).offset(skip).limit(limit).all()
+
+    def update(self, db: Session, id: int, obj_data: dict) -> Optional[T]:
+        """Update object by ID"""
+        obj = self.get_by_id(db, id)
+        if obj:
+            for key, value in obj_data.items():
+                setattr(obj, key, value)
+            db.commit()
+            db.refresh(obj)
+            return obj
+        return None
+
+    def delete(self, db: Session, id: int) -> bool:
+        """Delete object by ID"""
+        obj = self.get_by_id(db, id)
+        if obj:
+            db.delete(obj)
+            db.commit()
+            return True
+        return False
+
+
+class AsyncBaseRepo(Generic[T]):
+    """Base repository with common CRUD operations on an AsyncSession (see BaseRepo)"""
+
+    def __init__(self, model: T):
         self.model = model
 
-    def create(self, obj) -> T:
+    async def create(self, db: AsyncSession, obj) -> T:
         """Create a new object in database"""
-        self.db.add(obj)
-        self.db.commit()
-        self.db.refresh(obj)
+        db.add(obj)
+        await db.commit()
+        await db.refresh(obj)
         return obj
 
-    def get_by_id(self, id: int) -> Optional[T]:
+    async def get_by_id(self, db: AsyncSession, id: int) -> Optional[T]:
         """Get object by ID"""
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        return await db.get(self.model, id)
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
+    async def get_all(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[T]:
         """Get all objects with pagination"""
-        return self.db.query(self.model).offset(skip).limit(limit).all()
+        result = await db.scalars(select(self.model).offset(skip).limit(limit))
+        return list(result)
 
-    def update(self, id: int, obj_data: dict) -> Optional[T]:
+    async def update(self, db: AsyncSession, id: int, obj_data: dict) -> Optional[T]:
         """Update object by ID"""
-        obj = self.get_by_id(id)
+        obj = await self.get_by_id(db, id)
         if obj:
             for key, value in obj_data.items():
                 setattr(obj, key, value)
-            self.db.commit()
-            self.db.refresh(obj)
+            await db.commit()
+            await db.refresh(obj)
             return obj
         return None
 
-    def delete(self, id: int) -> bool:
+    async def delete(self, db: AsyncSession, id: int) -> bool:
         """Delete object by ID"""
-        obj = self.get_by_id(id)
+        obj = await self.get_by_id(db, id)
         if obj:
-            self.db.delete(obj)
-            self.db.commit()
+            await db.delete(obj)
+            await db.commit()
             return True
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,105 @@
+from typing import Dict, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.click import URLClick
+from src.repositories.base_repo import BaseRepo, AsyncBaseRepo
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _add_clicks_statement(dialect_name: str):
+    statement = _UPSERT_INSERTS[dialect_name](URLClick)
+    return statement.on_conflict_do_update(
+        index_elements=[URLClick.short_code],
+        set_={
+            "clicks": URLClick.clicks + statement.excluded.clicks,
+            "last_clicked_at": statement.excluded.last_clicked_at,
+        }
+    )
+
+
+def _click_rows(counts: Dict[str, int], clicked_at: datetime) -> list:
+    # Sorted, so concurrent flushes from every worker lock the rows they share
+    # in the same order and cannot deadlock each other
+    return [
+        {"short_code": short_code, "clicks": clicks, "last_clicked_at": clicked_at}
+        for short_code, clicks in sorted(counts.items())
+    ]
+
+
+class ClickRepository(BaseRepo[URLClick]):
+    """Repository for per-link click counters"""
+
+    def __init__(self):
+        super().__init__(URLClick)
+
+    def add_clicks(self, db: Session, counts: Dict[str, int], clicked_at: Optional[datetime] = None) -> None:
+        """
+        Add aggregated click counts with a single bulk upsert
+
+        Args:
+            db: The session to run in
+            counts: Clicks per short code since the last flush
+            clicked_at: Time recorded as last_clicked_at (defaults to now)
+        """
+        if not counts:
+            return
+        statement = _add_clicks_statement(db.get_bind().dialect.name)
+        db.execute(statement, _click_rows(counts, clicked_at or datetime.utcnow()))
+        db.commit()
+
+    def get_clicks(self, db: Session, short_code: str) -> int:
+        """
+        Retrieve the flushed click count of a short code
+
+        Args:
+            db: The session to run in
+            short_code: The short code to look up
+
+        Returns:
+            int: Number of recorded clicks (0 if none)
+        """
+        counter = db.get(URLClick, short_code)
+        return counter.clicks if counter else 0
+
+
+class AsyncClickRepository(AsyncBaseRepo[URLClick]):
+    """Async repository for per-link click counters"""
+
+    def __init__(self):
+        super().__init__(URLClick)
+
+    async def add_clicks(self, db: AsyncSession, counts: Dict[str, int], clicked_at: Optional[datetime] = None) -> None:
+        """
+        Add aggregated click counts with a single bulk upsert
+
+        Args:
+            db: The async session to run in
+            counts: Clicks per short code since the last flush
+            clicked_at: Time recorded as last_clicked_at (defaults to now)
+        """
+        if not counts:
+            return
+        statement = _add_clicks_statement(db.get_bind().dialect.name)
+        await db.execute(statement, _click_rows(counts, clicked_at or datetime.utcnow()))
+        await db.commit()
+
+    async def get_clicks(self, db: AsyncSession, short_code: str) -> int:
+        """
+        Retrieve the flushed click count of a short code
+
+        Args:
+            db: The async session to run in
+            short_code: The short code to look up
+
+        Returns:
+            int: Number of recorded clicks (0 if none)
+        """
+        counter = await db.get(URLClick, short_code)
+        return counter.clicks if counter else 0
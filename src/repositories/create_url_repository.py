@@ -1,64 +1,388 @@
-from typing import Optional, List
+import secrets
+from typing import Dict, Iterator, Optional, List
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, and_, bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import datetime
 from sqlalchemy.exc import IntegrityError
 
-from src.models.url import URL
-from src.repositories.base_repo import BaseRepo
+from src.models.url import URL, URLDigest
+from src.repositories.base_repo import BaseRepo, AsyncBaseRepo
+from src.repositories.id_allocator import IdBlockAllocator, url_id_allocator
+from src.repositories.url_partition_repository import UrlPartitionRepository, url_partitions
+from src.utils.base62 import encode_base62
+from src.utils.url_digest import url_digest
+
+
+def _url_insert(url_id: int, original_url: str, expiration_time: Optional[datetime]):
+    """
+    Build the row for an ID allocated up front together with its single INSERT
+
+    Returns:
+        tuple: The (transient) URL object handed back to callers and the INSERT statement
+    """
+    url = URL(
+        id=url_id,
+        original_url=original_url,
+        original_url_hash=url_digest(original_url),
+        short_code=encode_base62(url_id),
+        created_at=datetime.utcnow(),
+        expiration_time=expiration_time
+    )
+    statement = insert(URL).values(
+        id=url.id,
+        original_url=url.original_url,
+        original_url_hash=url.original_url_hash,
+        short_code=url.short_code,
+        created_at=url.created_at,
+        expiration_time=url.expiration_time
+    )
+    return url, statement
+
+
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE ... RETURNING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+_RETURNED_COLUMNS = (URL.id, URL.original_url, URL.original_url_hash, URL.short_code, URL.created_at, URL.expiration_time)
+
+
+# Column-only and built once: a dedup hit is answered without building a URL instance
+_BY_DIGEST = select(*_RETURNED_COLUMNS).where(URL.original_url_hash == bindparam("digest")).limit(1)
+
+# On a partitioned urls table the digest index is not unique and may still
+# list rows whose digest was since claimed by a newer link: go through
+# url_digests instead, whose (url_id, created_at) prunes to one partition
+_THROUGH_URL_DIGESTS = select(*_RETURNED_COLUMNS).join(
+    URLDigest, and_(URLDigest.url_id == URL.id, URLDigest.created_at == URL.created_at)
+)
+_BY_CLAIMED_DIGEST = _THROUGH_URL_DIGESTS.where(URLDigest.original_url_hash == bindparam("digest"))
+_SHORT_CODE_EXISTS = select(URL.id).where(URL.short_code == bindparam("short_code")).limit(1)
+
+
+def _upsert_statement(dialect_name: str, **values):
+    """
+    INSERT the row, or on a digest conflict return the existing row instead.
+    The no-op DO UPDATE (rather than DO NOTHING) is what makes RETURNING
+    produce the existing row, so dedup and insert take one statement.
+    """
+    statement = _UPSERT_INSERTS[dialect_name](URL).values(**values)
+    return statement.on_conflict_do_update(
+        index_elements=[URL.original_url_hash],
+        set_={"original_url_hash": statement.excluded.original_url_hash}
+    ).returning(*_RETURNED_COLUMNS)
+
+
+def _temporary_short_code() -> str:
+    # Unique per attempt (unlike the shared "TEMP" literal) and never committed
+    return "~" + secrets.token_hex(4)
+
+
+# Rows per bulk statement; keeps each statement well under driver parameter limits
+BULK_CHUNK_SIZE = 1000
+
+
+def _chunks(items: list, size: int = BULK_CHUNK_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _bulk_insert_statement(dialect_name: str):
+    # Rows that lost a race with a concurrent create are skipped (and not returned)
+    return _UPSERT_INSERTS[dialect_name](URL).on_conflict_do_nothing(
+        index_elements=[URL.original_url_hash]
+    ).returning(*_RETURNED_COLUMNS)
+
+
+def _digest_lookup(digests: List[str], partitioned: bool):
+    if partitioned:
+        return _THROUGH_URL_DIGESTS.where(URLDigest.original_url_hash.in_(digests))
+    return select(*_RETURNED_COLUMNS).where(URL.original_url_hash.in_(digests))
+
+
+def _claim_digests_statement(dialect_name: str, now: datetime):
+    """
+    INSERT ... ON CONFLICT (original_url_hash) into url_digests, the unique
+    index a partitioned urls table cannot have. A digest held by an expired
+    link is taken over; one held by a live link is left alone and not
+    returned, so RETURNING lists exactly the digests this transaction now owns.
+    A concurrent claim of the same digest waits for this one to commit or roll
+    back, then re-checks the row it finds, so one URL never gets two codes.
+    """
+    statement = _UPSERT_INSERTS[dialect_name](URLDigest)
+    return statement.on_conflict_do_update(
+        index_elements=[URLDigest.original_url_hash],
+        set_={
+            "url_id": statement.excluded.url_id,
+            "created_at": statement.excluded.created_at,
+            "short_code": statement.excluded.short_code,
+            "expiration_time": statement.excluded.expiration_time,
+        },
+        where=and_(URLDigest.expiration_time != None, URLDigest.expiration_time <= now),
+    ).returning(URLDigest.original_url_hash)
+
+
+def _release_dangling_digests_statement(digests: List[str]):
+    # Digests whose urls row is gone (deleted by short code). Run after a claim
+    # waited on them, this statement sees every row their owners committed
+    owner = select(URL.id).where(URL.id == URLDigest.url_id, URL.created_at == URLDigest.created_at)
+    return delete(URLDigest).where(
+        URLDigest.original_url_hash.in_(digests), ~owner.exists()
+    ).execution_options(synchronize_session=False)
+
+
+def _digest_params(rows: List[dict]) -> List[dict]:
+    return [{
+        "original_url_hash": row["original_url_hash"],
+        "url_id": row["id"],
+        "created_at": row["created_at"],
+        "short_code": row["short_code"],
+        "expiration_time": row["expiration_time"],
+    } for row in rows]
+
+
+def _prepare_bulk_rows(rows: List[dict], ids: Optional[List[int]]) -> None:
+    created_at = datetime.utcnow()
+    for index, row in enumerate(rows):
+        row["created_at"] = created_at
+        if ids is not None:
+            row["id"] = ids[index]
+            row["short_code"] = encode_base62(ids[index])
+        else:
+            # Only used on SQLite, which has a single writer, so codes unique
+            # within this transaction cannot collide with anyone else's
+            row["short_code"] = f"~{index}"
+
+
+def _short_code_updates(created: Dict[str, dict]) -> List[dict]:
+    updates = []
+    for row in created.values():
+        row["short_code"] = encode_base62(row["id"])
+        updates.append({"id": row["id"], "short_code": row["short_code"]})
+    return updates
 
 
 class CreateUrlRepository(BaseRepo[URL]):
     """Repository for User Story 1: Create Short URL"""
 
-    def __init__(self, db: Session):
-        super().__init__(db, URL)
+    def __init__(self, id_allocator: IdBlockAllocator = url_id_allocator,
+                 partitions: UrlPartitionRepository = url_partitions):
+        super().__init__(URL)
+        self.id_allocator = id_allocator
+        self.partitions = partitions
 
-    def create_url_with_id_based_short_code(self, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+    def supports_id_allocation(self, db: Session) -> bool:
+        """Whether IDs (and therefore short codes) can be allocated before the INSERT"""
+        return self.id_allocator.is_supported(db)
+
+    def supports_upsert(self, db: Session) -> bool:
+        """Whether the database supports INSERT ... ON CONFLICT ... RETURNING"""
+        return db.get_bind().dialect.name in _UPSERT_INSERTS
+
+    def claim_digests(self, db: Session, rows: List[dict]) -> set:
         """
-        Create a new URL record in the database with ID-based short code.
-        This method follows a two-step process:
-        1. Creates the URL record without a short code (using a temporary placeholder)
-        2. Updates the record with a Base62-encoded ID as the short code
+        Claim the digests of rows (with allocated ids) in url_digests, releasing
+        and claiming once more those held by a deleted link
+
+        Args:
+            db: The session to run in
+            rows: Dicts with original_url_hash, id, created_at, short_code and expiration_time
+
+        Returns:
+            set: The digests claimed, whose rows the caller must write in this transaction
+        """
+        statement = _claim_digests_statement(db.get_bind().dialect.name, datetime.utcnow())
+        claimed = set()
+        for chunk in _chunks(rows):
+            claimed.update(db.execute(statement, _digest_params(chunk)).scalars())
+        held = [row for row in rows if row["original_url_hash"] not in claimed]
+        released = sum(
+            db.execute(_release_dangling_digests_statement([row["original_url_hash"] for row in chunk])).rowcount
+            for chunk in _chunks(held)
+        )
+        if released:
+            for chunk in _chunks(held):
+                claimed.update(db.execute(statement, _digest_params(chunk)).scalars())
+        return claimed
+
+    def _insert_through_digests(self, db: Session, rows: List[dict]) -> Dict[str, dict]:
+        """Insert the rows whose digest could be claimed; the caller commits"""
+        claimed = self.claim_digests(db, rows)
+        created = {row["original_url_hash"]: row for row in rows if row["original_url_hash"] in claimed}
+        for chunk in _chunks(list(created.values())):
+            db.execute(insert(URL), chunk)
+        return created
+
+    def upsert_url(self, db: Session, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Atomically return the existing URL record for this original URL or create
+        a new one, using INSERT ... ON CONFLICT (original_url_hash) ... RETURNING.
+        Concurrent creates of the same URL always resolve to a single short code.
+
+        On PostgreSQL the ID is block-allocated, so this is a single statement;
+        once urls is partitioned the digest is claimed in url_digests first and
+        the row inserted in the same transaction. On SQLite the new row is
+        inserted with a temporary code that is replaced by the Base62-encoded
+        ID in the same transaction.
 
         Args:
+            db: The session to run in
             original_url: The original URL to shorten
-            expiration_time: Optional expiration datetime
+            expiration_time: Optional expiration datetime (ignored if the URL already exists)
 
         Returns:
-            Optional[URL]: The created URL object with Base62-encoded short code, or None if creation failed
+            Optional[URL]: The existing or created URL object, or None if creation failed
+        """
+        dialect_name = db.get_bind().dialect.name
+        values = {
+            "original_url": original_url,
+            "original_url_hash": url_digest(original_url),
+            "created_at": datetime.utcnow(),
+            "expiration_time": expiration_time,
+        }
+        if self.supports_id_allocation(db):
+            values["id"] = self.id_allocator.next_id(db)
+            values["short_code"] = encode_base62(values["id"])
+        else:
+            values["short_code"] = _temporary_short_code()
+        if self.partitions.is_partitioned(db):
+            return self._upsert_through_digest(db, values)
+        try:
+            row = db.execute(_upsert_statement(dialect_name, **values)).one()
+            url = URL(**row._asdict())
+            if url.short_code == values["short_code"] and "id" not in values:
+                url.short_code = encode_base62(url.id)
+                db.execute(update(URL).where(URL.id == url.id).values(short_code=url.short_code))
+            db.commit()
+            return url
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    def _upsert_through_digest(self, db: Session, values: dict) -> Optional[URL]:
+        try:
+            if self._insert_through_digests(db, [values]):
+                url = URL(**values)
+            else:
+                # Held by a live link, whose row is committed by now
+                found = db.execute(_BY_CLAIMED_DIGEST, {"digest": values["original_url_hash"]}).first()
+                url = URL(**found._asdict()) if found is not None else None
+            db.commit()
+            return url
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    def get_by_digests(self, db: Session, digests: List[str]) -> Dict[str, dict]:
         """
-        def encode_base62(num: int) -> str:
-            """
-            Encode a positive integer into Base62 string
+        Look up many original URLs at once through the digest index
 
-            Args:
-                num: The positive integer to encode
+        Args:
+            db: The session to run in
+            digests: original_url_hash values to look up
 
-            Returns:
-                str: The Base62 encoded string
-            """
-            if num == 0:
-                return "0"
+        Returns:
+            Dict[str, dict]: Column values of the matching rows, keyed by digest
+        """
+        found = {}
+        partitioned = self.partitions.is_partitioned(db)
+        for chunk in _chunks(digests):
+            for row in db.execute(_digest_lookup(chunk, partitioned)):
+                found[row.original_url_hash] = row._asdict()
+        return found
 
-            chars = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
-            result = ""
+    def bulk_create_urls(self, db: Session, rows: List[dict]) -> Optional[Dict[str, dict]]:
+        """
+        Insert many URL records with a few multi-row INSERT statements and a
+        single commit. Rows whose digest already exists are skipped.
 
-            while num > 0:
-                result = chars[num % 62] + result
-                num //= 62
+        Args:
+            db: The session to run in
+            rows: Dicts with original_url, original_url_hash and expiration_time
 
-            return result
+        Returns:
+            Optional[Dict[str, dict]]: Column values of the inserted rows keyed by digest,
+            or None if the insert failed
+        """
+        if not rows:
+            return {}
+        dialect_name = db.get_bind().dialect.name
+        ids = self.id_allocator.next_ids(db, len(rows)) if self.supports_id_allocation(db) else None
+        _prepare_bulk_rows(rows, ids)
+        if self.partitions.is_partitioned(db):
+            try:
+                created = self._insert_through_digests(db, rows)
+                db.commit()
+                return created
+            except IntegrityError:
+                db.rollback()
+                return None
+        statement = _bulk_insert_statement(dialect_name)
+        created = {}
+        try:
+            for chunk in _chunks(rows):
+                for row in db.execute(statement, chunk):
+                    created[row.original_url_hash] = row._asdict()
+            if ids is None and created:
+                db.execute(update(URL), _short_code_updates(created))
+            db.commit()
+            return created
+        except IntegrityError:
+            db.rollback()
+            return None
 
+    def create_url_with_allocated_id(self, db: Session, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Create a new URL record whose ID comes from a block reserved on the ID
+        sequence, so the Base62 short code is known before the row is written
+        and the create is a single INSERT.
+
+        Args:
+            db: The session to run in
+            original_url: The original URL to shorten
+            expiration_time: Optional expiration datetime
+
+        Returns:
+            Optional[URL]: The created URL object with Base62-encoded short code, or None if creation failed
+        """
+        url, statement = _url_insert(self.id_allocator.next_id(db), original_url, expiration_time)
+        try:
+            db.execute(statement)
+            db.commit()
+            return url
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    def create_url_with_id_based_short_code(self, db: Session, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Create a new URL record in the database with ID-based short code.
+        This method follows a two-step process:
+        1. Creates the URL record without a short code (using a temporary placeholder)
+        2. Updates the record with a Base62-encoded ID as the short code
+
+        Args:
+            db: The session to run in
+            original_url: The original URL to shorten
+            expiration_time: Optional expiration datetime
+
+        Returns:
+            Optional[URL]: The created URL object with Base62-encoded short code, or None if creation failed
+        """
         # Create the URL record with a temporary short code that will be replaced
         url = URL(
             original_url=original_url,
+            original_url_hash=url_digest(original_url),
             short_code="TEMP",  # Placeholder that will be replaced with Base62-encoded ID
             expiration_time=expiration_time
         )
-        self.db.add(url)
+        db.add(url)
         try:
-            self.db.commit()
-            self.db.refresh(url)
+            db.commit()
+            db.refresh(url)
 
             # Now update with the Base62-encoded ID as the short code
             base62_code = encode_base62(url.id)
@@ -70,18 +394,279 @@ class CreateUrlRepository(BaseRepo[URL]):
 
             # Update the short code with the Base62-encoded ID
             url.short_code = base62_code
-            self.db.commit()
-            self.db.refresh(url)
+            db.commit()
+            db.refresh(url)
+            return url
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    def create_url(self, db: Session, original_url: str, short_code: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Create a new URL record in the database with error handling
+
+        Args:
+            db: The session to run in
+            original_url: The original URL to shorten
+            short_code: The generated short code
+            expiration_time: Optional expiration datetime
+
+        Returns:
+            Optional[URL]: The created URL object, or None if creation failed
+        """
+        url = URL(
+            original_url=original_url,
+            original_url_hash=url_digest(original_url),
+            short_code=short_code,
+            expiration_time=expiration_time
+        )
+        db.add(url)
+        try:
+            db.commit()
+            db.refresh(url)
+            return url
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    def exists_by_short_code(self, db: Session, short_code: str) -> bool:
+        """
+        Check if a short code already exists
+
+        Args:
+            db: The session to run in
+            short_code: The short code to check
+
+        Returns:
+            bool: True if exists, False otherwise
+        """
+        return db.scalar(_SHORT_CODE_EXISTS, {"short_code": short_code}) is not None
+
+    def get_by_original_url(self, db: Session, original_url: str) -> Optional[Row]:
+        """
+        Retrieve a URL by its original URL through the unique digest index
+
+        Args:
+            db: The session to run in
+            original_url: The original URL to look up
+
+        Returns:
+            Optional[Row]: The row's _RETURNED_COLUMNS if found, None otherwise
+        """
+        statement = _BY_CLAIMED_DIGEST if self.partitions.is_partitioned(db) else _BY_DIGEST
+        return db.execute(statement, {"digest": url_digest(original_url)}).first()
+
+
+class AsyncCreateUrlRepository(AsyncBaseRepo[URL]):
+    """Async repository for User Story 1: Create Short URL"""
+
+    def __init__(self, id_allocator: IdBlockAllocator = url_id_allocator,
+                 partitions: UrlPartitionRepository = url_partitions):
+        super().__init__(URL)
+        self.id_allocator = id_allocator
+        self.partitions = partitions
+
+    def supports_id_allocation(self, db: AsyncSession) -> bool:
+        """Whether IDs (and therefore short codes) can be allocated before the INSERT"""
+        return self.id_allocator.is_supported(db)
+
+    def supports_upsert(self, db: AsyncSession) -> bool:
+        """Whether the database supports INSERT ... ON CONFLICT ... RETURNING"""
+        return db.get_bind().dialect.name in _UPSERT_INSERTS
+
+    async def claim_digests(self, db: AsyncSession, rows: List[dict]) -> set:
+        """Claim the digests of rows in url_digests (see CreateUrlRepository.claim_digests)"""
+        statement = _claim_digests_statement(db.get_bind().dialect.name, datetime.utcnow())
+        claimed = set()
+        for chunk in _chunks(rows):
+            claimed.update((await db.execute(statement, _digest_params(chunk))).scalars())
+        held = [row for row in rows if row["original_url_hash"] not in claimed]
+        released = 0
+        for chunk in _chunks(held):
+            result = await db.execute(_release_dangling_digests_statement([row["original_url_hash"] for row in chunk]))
+            released += result.rowcount
+        if released:
+            for chunk in _chunks(held):
+                claimed.update((await db.execute(statement, _digest_params(chunk))).scalars())
+        return claimed
+
+    async def _insert_through_digests(self, db: AsyncSession, rows: List[dict]) -> Dict[str, dict]:
+        """Insert the rows whose digest could be claimed; the caller commits"""
+        claimed = await self.claim_digests(db, rows)
+        created = {row["original_url_hash"]: row for row in rows if row["original_url_hash"] in claimed}
+        for chunk in _chunks(list(created.values())):
+            await db.execute(insert(URL), chunk)
+        return created
+
+    async def upsert_url(self, db: AsyncSession, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Atomically return the existing URL record for this original URL or create
+        a new one (see CreateUrlRepository.upsert_url)
+
+        Args:
+            db: The async session to run in
+            original_url: The original URL to shorten
+            expiration_time: Optional expiration datetime (ignored if the URL already exists)
+
+        Returns:
+            Optional[URL]: The existing or created URL object, or None if creation failed
+        """
+        dialect_name = db.get_bind().dialect.name
+        values = {
+            "original_url": original_url,
+            "original_url_hash": url_digest(original_url),
+            "created_at": datetime.utcnow(),
+            "expiration_time": expiration_time,
+        }
+        if self.supports_id_allocation(db):
+            values["id"] = await self.id_allocator.next_id_async(db)
+            values["short_code"] = encode_base62(values["id"])
+        else:
+            values["short_code"] = _temporary_short_code()
+        if await self.partitions.is_partitioned_async(db):
+            return await self._upsert_through_digest(db, values)
+        try:
+            row = (await db.execute(_upsert_statement(dialect_name, **values))).one()
+            url = URL(**row._asdict())
+            if url.short_code == values["short_code"] and "id" not in values:
+                url.short_code = encode_base62(url.id)
+                await db.execute(update(URL).where(URL.id == url.id).values(short_code=url.short_code))
+            await db.commit()
+            return url
+        except IntegrityError:
+            await db.rollback()
+            return None
+
+    async def _upsert_through_digest(self, db: AsyncSession, values: dict) -> Optional[URL]:
+        try:
+            if await self._insert_through_digests(db, [values]):
+                url = URL(**values)
+            else:
+                found = (await db.execute(_BY_CLAIMED_DIGEST, {"digest": values["original_url_hash"]})).first()
+                url = URL(**found._asdict()) if found is not None else None
+            await db.commit()
+            return url
+        except IntegrityError:
+            await db.rollback()
+            return None
+
+    async def get_by_digests(self, db: AsyncSession, digests: List[str]) -> Dict[str, dict]:
+        """
+        Look up many original URLs at once through the digest index
+
+        Args:
+            db: The async session to run in
+            digests: original_url_hash values to look up
+
+        Returns:
+            Dict[str, dict]: Column values of the matching rows, keyed by digest
+        """
+        found = {}
+        partitioned = await self.partitions.is_partitioned_async(db)
+        for chunk in _chunks(digests):
+            for row in await db.execute(_digest_lookup(chunk, partitioned)):
+                found[row.original_url_hash] = row._asdict()
+        return found
+
+    async def bulk_create_urls(self, db: AsyncSession, rows: List[dict]) -> Optional[Dict[str, dict]]:
+        """
+        Insert many URL records with a few multi-row INSERT statements and a
+        single commit (see CreateUrlRepository.bulk_create_urls)
+
+        Args:
+            db: The async session to run in
+            rows: Dicts with original_url, original_url_hash and expiration_time
+
+        Returns:
+            Optional[Dict[str, dict]]: Column values of the inserted rows keyed by digest,
+            or None if the insert failed
+        """
+        if not rows:
+            return {}
+        dialect_name = db.get_bind().dialect.name
+        ids = await self.id_allocator.next_ids_async(db, len(rows)) if self.supports_id_allocation(db) else None
+        _prepare_bulk_rows(rows, ids)
+        if await self.partitions.is_partitioned_async(db):
+            try:
+                created = await self._insert_through_digests(db, rows)
+                await db.commit()
+                return created
+            except IntegrityError:
+                await db.rollback()
+                return None
+        statement = _bulk_insert_statement(dialect_name)
+        created = {}
+        try:
+            for chunk in _chunks(rows):
+                for row in await db.execute(statement, chunk):
+                    created[row.original_url_hash] = row._asdict()
+            if ids is None and created:
+                await db.execute(update(URL), _short_code_updates(created))
+            await db.commit()
+            return created
+        except IntegrityError:
+            await db.rollback()
+            return None
+
+    async def create_url_with_allocated_id(self, db: AsyncSession, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Create a new URL record whose ID comes from a block reserved on the ID
+        sequence, so the create is a single INSERT
+
+        Args:
+            db: The async session to run in
+            original_url: The original URL to shorten
+            expiration_time: Optional expiration datetime
+
+        Returns:
+            Optional[URL]: The created URL object with Base62-encoded short code, or None if creation failed
+        """
+        url_id = await self.id_allocator.next_id_async(db)
+        url, statement = _url_insert(url_id, original_url, expiration_time)
+        try:
+            await db.execute(statement)
+            await db.commit()
+            return url
+        except IntegrityError:
+            await db.rollback()
+            return None
+
+    async def create_url_with_id_based_short_code(self, db: AsyncSession, original_url: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+        """
+        Create a new URL record in the database with ID-based short code.
+        The placeholder row is flushed to obtain its ID and the Base62 short code
+        is written in the same transaction, so "TEMP" is never committed.
+
+        Args:
+            db: The async session to run in
+            original_url: The original URL to shorten
+            expiration_time: Optional expiration datetime
+
+        Returns:
+            Optional[URL]: The created URL object with Base62-encoded short code, or None if creation failed
+        """
+        url = URL(
+            original_url=original_url,
+            original_url_hash=url_digest(original_url),
+            short_code="TEMP",  # Placeholder that will be replaced with Base62-encoded ID
+            expiration_time=expiration_time
+        )
+        db.add(url)
+        try:
+            await db.flush()
+            url.short_code = encode_base62(url.id)[:10]
+            await db.commit()
             return url
         except IntegrityError:
-            self.db.rollback()
+            await db.rollback()
             return None
 
-    def create_url(self, original_url: str, short_code: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
+    async def create_url(self, db: AsyncSession, original_url: str, short_code: str, expiration_time: Optional[datetime] = None) -> Optional[URL]:
         """
         Create a new URL record in the database with error handling
 
         Args:
+            db: The async session to run in
             original_url: The original URL to shorten
             short_code: The generated short code
             expiration_time: Optional expiration datetime
@@ -91,38 +676,42 @@ class CreateUrlRepository(BaseRepo[URL]):
         """
         url = URL(
             original_url=original_url,
+            original_url_hash=url_digest(original_url),
             short_code=short_code,
             expiration_time=expiration_time
         )
-        self.db.add(url)
+        db.add(url)
         try:
-            self.db.commit()
-            self.db.refresh(url)
+            await db.commit()
             return url
         except IntegrityError:
-            self.db.rollback()
+            await db.rollback()
             return None
 
-    def exists_by_short_code(self, short_code: str) -> bool:
+    async def exists_by_short_code(self, db: AsyncSession, short_code: str) -> bool:
         """
         Check if a short code already exists
 
         Args:
+            db: The async session to run in
             short_code: The short code to check
 
         Returns:
             bool: True if exists, False otherwise
         """
-        return self.db.query(URL).filter(URL.short_code == short_code).first() is not None
+        found = await db.scalar(_SHORT_CODE_EXISTS, {"short_code": short_code})
+        return found is not None
 
-    def get_by_original_url(self, original_url: str) -> Optional[URL]:
+    async def get_by_original_url(self, db: AsyncSession, original_url: str) -> Optional[Row]:
         """
-        Retrieve a URL by its original URL
+        Retrieve a URL by its original URL through the unique digest index
 
         Args:
+            db: The async session to run in
             original_url: The original URL to look up
 
         Returns:
-            Optional[URL]: The URL object if found, None otherwise
+            Optional[Row]: The row's _RETURNED_COLUMNS if found, None otherwise
         """
-        return self.db.query(URL).filter(URL.original_url == original_url).first()
\ No newline at end of file
+        statement = _BY_CLAIMED_DIGEST if await self.partitions.is_partitioned_async(db) else _BY_DIGEST
+        return (await db.execute(statement, {"digest": url_digest(original_url)})).first()
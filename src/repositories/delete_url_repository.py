@@ -1,49 +1,150 @@
 from typing import Optional
+from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, delete, select, text
 
 from src.models.url import URL
-from src.repositories.base_repo import BaseRepo
+from src.repositories.base_repo import BaseRepo, AsyncBaseRepo
+
+
+# Upper bound on how long a sweeper chunk waits for a row lock on PostgreSQL
+SWEEP_LOCK_TIMEOUT = text("SET LOCAL lock_timeout = '1s'")
+
+# Built once and reused by every request: one statement, no row loaded first
+_DELETE_BY_SHORT_CODE = (
+    delete(URL).where(URL.short_code == bindparam("short_code")).execution_options(synchronize_session=False)
+)
+
+
+def _expired_chunk_delete(batch_size: int, now: datetime):
+    """
+    DELETE ... WHERE id IN (SELECT id ... LIMIT n). The subquery is served by the
+    partial index on expiration_time, and SKIP LOCKED (PostgreSQL only) lets
+    concurrent sweepers and writers pass each other instead of queueing.
+    """
+    expired_ids = (
+        select(URL.id)
+        .where(URL.expiration_time != None, URL.expiration_time < now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return delete(URL).where(URL.id.in_(expired_ids.scalar_subquery())).execution_options(synchronize_session=False)
 
 
 class DeleteUrlRepository(BaseRepo[URL]):
     """Repository for User Story 4: Delete Shortened URL"""
 
-    def __init__(self, db: Session):
-        super().__init__(db, URL)
+    def __init__(self):
+        super().__init__(URL)
+
+    def delete_by_short_code(self, db: Session, short_code: str) -> bool:
+        """
+        Delete a URL by short code
+
+        Args:
+            db: The session to run in
+            short_code: The short code to delete
+
+        Returns:
+            bool: True if deleted, False if not found
+        """
+        result = db.execute(_DELETE_BY_SHORT_CODE, {"short_code": short_code})
+        db.commit()
+        return result.rowcount > 0
+
+    def delete_expired_batch(self, db: Session, batch_size: int, now: Optional[datetime] = None) -> int:
+        """
+        Delete at most batch_size expired URLs in one short transaction
+
+        Args:
+            db: The session to run in
+            batch_size: Maximum number of rows to delete
+            now: Reference time for expiry (defaults to the current UTC time)
+
+        Returns:
+            int: Number of deleted URLs
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(SWEEP_LOCK_TIMEOUT)
+        result = db.execute(_expired_chunk_delete(batch_size, now or datetime.utcnow()))
+        db.commit()
+        return result.rowcount
+
+    def delete_expired_urls(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        Delete all expired URLs, one bounded chunk per transaction
+
+        Args:
+            db: The session to run in
+            batch_size: Number of rows deleted per transaction
 
-    def delete_by_short_code(self, short_code: str) -> bool:
+        Returns:
+            int: Number of deleted URLs
+        """
+        now = datetime.utcnow()
+        count = 0
+        while True:
+            deleted = self.delete_expired_batch(db, batch_size, now)
+            count += deleted
+            if deleted < batch_size:
+                return count
+
+
+class AsyncDeleteUrlRepository(AsyncBaseRepo[URL]):
+    """Async repository for User Story 4: Delete Shortened URL"""
+
+    def __init__(self):
+        super().__init__(URL)
+
+    async def delete_by_short_code(self, db: AsyncSession, short_code: str) -> bool:
         """
         Delete a URL by short code
 
         Args:
+            db: The async session to run in
             short_code: The short code to delete
 
         Returns:
             bool: True if deleted, False if not found
         """
-        url = self.db.query(self.model).filter(self.model.short_code == short_code).first()
-        if url:
-            self.db.delete(url)
-            self.db.commit()
-            return True
-        return False
+        result = await db.execute(_DELETE_BY_SHORT_CODE, {"short_code": short_code})
+        await db.commit()
+        return result.rowcount > 0
 
-    def delete_expired_urls(self) -> int:
+    async def delete_expired_batch(self, db: AsyncSession, batch_size: int, now: Optional[datetime] = None) -> int:
         """
-        Delete all expired URLs
+        Delete at most batch_size expired URLs in one short transaction
+
+        Args:
+            db: The async session to run in
+            batch_size: Maximum number of rows to delete
+            now: Reference time for expiry (defaults to the current UTC time)
 
         Returns:
             int: Number of deleted URLs
         """
-        from datetime import datetime
-        expired_urls = self.db.query(self.model).filter(
-            self.model.expiration_time != None,
-            self.model.expiration_time < datetime.utcnow()
-        ).all()
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(SWEEP_LOCK_TIMEOUT)
+        result = await db.execute(_expired_chunk_delete(batch_size, now or datetime.utcnow()))
+        await db.commit()
+        return result.rowcount
+
+    async def delete_expired_urls(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """
+        Delete all expired URLs, one bounded chunk per transaction
 
-        count = len(expired_urls)
-        for url in expired_urls:
-            self.db.delete(url)
+        Args:
+            db: The async session to run in
+            batch_size: Number of rows deleted per transaction
 
-        self.db.commit()
-        return count
\ No newline at end of file
+        Returns:
+            int: Number of deleted URLs
+        """
+        now = datetime.utcnow()
+        count = 0
+        while True:
+            deleted = await self.delete_expired_batch(db, batch_size, now)
+            count += deleted
+            if deleted < batch_size:
+                return count
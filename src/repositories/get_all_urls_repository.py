@@ -1,21 +1,126 @@
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, bindparam, select
 
 from src.models.url import URL
-from src.repositories.base_repo import BaseRepo
+from src.repositories.base_repo import BaseRepo, AsyncBaseRepo
+
+# Columns of the listing; pages and streamed rows are plain tuples, never ORM objects
+LISTING_COLUMNS = (URL.id, URL.short_code, URL.original_url, URL.created_at, URL.expiration_time)
+
+
+# Built once and reused by every request; ids start at 1, so after=0 is the first page
+_PAGE = (
+    select(*LISTING_COLUMNS)
+    .where(URL.id > bindparam("after"))
+    .order_by(URL.id)
+    .limit(bindparam("limit"))
+)
+_ALL = select(*LISTING_COLUMNS).order_by(URL.id)
+
+
+def _stream_query(after: Optional[int], batch_size: int):
+    statement = select(*LISTING_COLUMNS).order_by(URL.id)
+    if after is not None:
+        statement = statement.where(URL.id > after)
+    # stream_results asks the driver for a server-side cursor; yield_per bounds
+    # how many rows are buffered client-side at once
+    return statement.execution_options(stream_results=True, yield_per=batch_size)
 
 
 class GetAllUrlsRepository(BaseRepo[URL]):
     """Repository for User Story 3: View All Shortened URLs"""
 
-    def __init__(self, db: Session):
-        super().__init__(db, URL)
+    def __init__(self):
+        super().__init__(URL)
+
+    def get_all_urls(self, db: Session) -> List[Row]:
+        """
+        Retrieve all URLs in the database
+
+        Args:
+            db: The session to run in
+
+        Returns:
+            List[Row]: Rows of LISTING_COLUMNS in id order
+        """
+        return list(db.execute(_ALL))
+
+    def get_urls_page(self, db: Session, limit: int, after: Optional[int] = None) -> List[Row]:
+        """
+        Retrieve one page of URLs in id order (keyset pagination)
+
+        Args:
+            db: The session to run in
+            limit: Maximum number of URLs to return
+            after: Only return URLs whose id is greater than this cursor
+
+        Returns:
+            List[Row]: Rows of LISTING_COLUMNS
+        """
+        return list(db.execute(_PAGE, {"after": after or 0, "limit": limit}))
+
+    def stream_urls(self, db: Session, after: Optional[int] = None, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Iterate over every URL in id order through a server-side cursor, so memory
+        use does not depend on the size of the table
+
+        Args:
+            db: The session to run in
+            after: Only return URLs whose id is greater than this cursor
+            batch_size: Number of rows fetched from the cursor at a time
+
+        Returns:
+            Iterator[tuple]: Rows of LISTING_COLUMNS
+        """
+        yield from db.execute(_stream_query(after, batch_size))
+
 
-    def get_all_urls(self) -> List[URL]:
+class AsyncGetAllUrlsRepository(AsyncBaseRepo[URL]):
+    """Async repository for User Story 3: View All Shortened URLs"""
+
+    def __init__(self):
+        super().__init__(URL)
+
+    async def get_all_urls(self, db: AsyncSession) -> List[Row]:
         """
         Retrieve all URLs in the database
 
+        Args:
+            db: The async session to run in
+
+        Returns:
+            List[Row]: Rows of LISTING_COLUMNS in id order
+        """
+        return list(await db.execute(_ALL))
+
+    async def get_urls_page(self, db: AsyncSession, limit: int, after: Optional[int] = None) -> List[Row]:
+        """
+        Retrieve one page of URLs in id order (keyset pagination)
+
+        Args:
+            db: The async session to run in
+            limit: Maximum number of URLs to return
+            after: Only return URLs whose id is greater than this cursor
+
+        Returns:
+            List[Row]: Rows of LISTING_COLUMNS
+        """
+        return list(await db.execute(_PAGE, {"after": after or 0, "limit": limit}))
+
+    async def stream_urls(self, db: AsyncSession, after: Optional[int] = None, batch_size: int = 1000) -> AsyncIterator[tuple]:
+        """
+        Iterate over every URL in id order through a server-side cursor
+
+        Args:
+            db: The async session to run in
+            after: Only return URLs whose id is greater than this cursor
+            batch_size: Number of rows fetched from the cursor at a time
+
         Returns:
-            List[URL]: List of all URL objects
+            AsyncIterator[tuple]: Rows of LISTING_COLUMNS
         """
-        return self.db.query(self.model).all()
+        result = await db.stream(_stream_query(after, batch_size))
+        async for row in result:
+            yield row
@@ -0,0 +1,180 @@
+import os
+import threading
+from typing import List, Optional
+from sqlalchemy import Sequence, func, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Serial sequence behind urls.id. The migration that introduces block allocation
+# sets its INCREMENT BY to ID_BLOCK_SIZE, so every nextval() reserves a whole block
+URL_ID_SEQUENCE_NAME = "urls_id_seq"
+
+_INCREMENT_SQL = text(
+    "SELECT increment_by FROM pg_sequences "
+    "WHERE schemaname = current_schema() AND sequencename = :name"
+)
+
+
+class IdBlockAllocator:
+    """
+    Hands out primary keys from blocks reserved on a database sequence.
+
+    Each nextval() on a sequence whose increment is N returns the first ID of a
+    block of N IDs that no other worker (and no plain INSERT relying on the
+    column default) will receive. IDs are then handed out from memory, so the
+    short code can be computed before the row is inserted and a sequence round
+    trip is only paid once per block.
+    """
+
+    def __init__(self, sequence_name: str = URL_ID_SEQUENCE_NAME):
+        self.sequence = Sequence(sequence_name)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0
+        # Block size as configured on the sequence itself, read once per process
+        self._increment: Optional[int] = None
+        self.blocks_reserved = 0
+
+    @staticmethod
+    def is_supported(db) -> bool:
+        """
+        Check whether the session's database can reserve ID blocks
+
+        Args:
+            db: A Session or AsyncSession
+
+        Returns:
+            bool: True for PostgreSQL, False for databases without sequences (e.g. SQLite)
+        """
+        return db.get_bind().dialect.name == "postgresql"
+
+    def next_id(self, db: Session) -> int:
+        """
+        Take the next free ID, reserving a new block from the sequence if needed
+
+        Args:
+            db: The session used to reserve a block
+
+        Returns:
+            int: An ID that is safe to insert explicitly
+        """
+        value = self._take()
+        while value is None:
+            if self._increment is None:
+                self._increment = db.scalar(_INCREMENT_SQL, {"name": self.sequence.name})
+            self._install(db.scalar(select(self.sequence.next_value())))
+            value = self._take()
+        return value
+
+    async def next_id_async(self, db: AsyncSession) -> int:
+        """
+        Async counterpart of next_id()
+
+        Args:
+            db: The async session used to reserve a block
+
+        Returns:
+            int: An ID that is safe to insert explicitly
+        """
+        value = self._take()
+        while value is None:
+            if self._increment is None:
+                self._increment = await db.scalar(_INCREMENT_SQL, {"name": self.sequence.name})
+            self._install(await db.scalar(select(self.sequence.next_value())))
+            value = self._take()
+        return value
+
+    def next_ids(self, db: Session, count: int) -> List[int]:
+        """
+        Take `count` IDs at once, reserving every missing block in one round trip
+
+        Args:
+            db: The session used to reserve blocks
+            count: Number of IDs needed
+
+        Returns:
+            List[int]: IDs that are safe to insert explicitly
+        """
+        ids = self._take_many(count)
+        if len(ids) < count:
+            if self._increment is None:
+                self._increment = db.scalar(_INCREMENT_SQL, {"name": self.sequence.name})
+            starts = db.scalars(self._blocks_statement(count - len(ids))).all()
+            self._extend_from_blocks(ids, count, starts)
+        return ids
+
+    async def next_ids_async(self, db: AsyncSession, count: int) -> List[int]:
+        """
+        Async counterpart of next_ids()
+
+        Args:
+            db: The async session used to reserve blocks
+            count: Number of IDs needed
+
+        Returns:
+            List[int]: IDs that are safe to insert explicitly
+        """
+        ids = self._take_many(count)
+        if len(ids) < count:
+            if self._increment is None:
+                self._increment = await db.scalar(_INCREMENT_SQL, {"name": self.sequence.name})
+            starts = (await db.scalars(self._blocks_statement(count - len(ids)))).all()
+            self._extend_from_blocks(ids, count, starts)
+        return ids
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "block_size": self._increment,
+                "blocks_reserved": self.blocks_reserved,
+                "remaining_in_block": self._limit - self._next,
+            }
+
+    def reset(self) -> None:
+        """Forget the current block (e.g. in a freshly forked worker)"""
+        with self._lock:
+            self._next = self._limit = 0
+
+    def _take(self) -> Optional[int]:
+        with self._lock:
+            if self._next < self._limit:
+                value = self._next
+                self._next += 1
+                return value
+            return None
+
+    def _take_many(self, count: int) -> List[int]:
+        with self._lock:
+            stop = min(self._next + count, self._limit)
+            ids = list(range(self._next, stop)) if stop > self._next else []
+            self._next = max(self._next, stop)
+            return ids
+
+    def _blocks_statement(self, missing: int):
+        # One nextval() per generated row: each row is a block owned by this worker
+        blocks = -(-missing // (self._increment or 1))
+        return select(self.sequence.next_value()).select_from(func.generate_series(1, blocks))
+
+    def _extend_from_blocks(self, ids: List[int], count: int, starts: List[int]) -> None:
+        increment = self._increment or 1
+        for start in starts:
+            needed = count - len(ids)
+            ids.extend(range(start, start + min(needed, increment)))
+            if needed < increment:
+                self._install(start, offset=needed)
+
+    def _install(self, start: int, offset: int = 0) -> None:
+        with self._lock:
+            self.blocks_reserved += 1
+            # Another thread may have refilled while we waited on the database;
+            # the block fetched here is then abandoned, which only leaves a gap
+            if self._next >= self._limit:
+                self._next, self._limit = start + offset, start + (self._increment or 1)
+
+
+# Process-wide allocator for urls.id
+url_id_allocator = IdBlockAllocator()
+
+# A forked worker must not hand out IDs from the block its parent reserved
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=url_id_allocator.reset)
@@ -1,44 +1,161 @@
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, bindparam, func, select
 from datetime import datetime
 
 from src.models.url import URL
-from src.repositories.base_repo import BaseRepo
+from src.repositories.base_repo import BaseRepo, AsyncBaseRepo
+from src.utils.base62 import decode_base62, encode_base62
+
+# Largest value of urls.id (INTEGER); longer codes cannot be primary keys
+URL_ID_MAX = 2 ** 31 - 1
+
+
+def _id_for_short_code(short_code: str) -> Optional[int]:
+    """
+    Primary key a short code was generated from, if it is one of ours
+
+    Codes are encode_base62(id), so only codes that re-encode to themselves
+    (no leading zeros, Base62 characters only, within the id range) qualify.
+    Anything else is a legacy or custom code that lives only in the index.
+    """
+    try:
+        url_id = decode_base62(short_code)
+    except ValueError:
+        return None
+    if url_id > URL_ID_MAX or encode_base62(url_id) != short_code:
+        return None
+    return url_id
+
+
+# Columns the redirect path reads (and the redirect cache keeps)
+REDIRECT_COLUMNS = (URL.short_code, URL.original_url, URL.created_at, URL.expiration_time)
+
+
+# Built once: constructing a select() per request costs about as much as the
+# hydration the projection saves. Both lookups check the code, so a legacy row
+# whose random code decodes to another row's id never matches by primary key.
+# Neither names created_at, so on a partitioned urls table they probe each
+# partition's (small) index; expired partitions are retired, which keeps the
+# number of partitions, and so of probes, bounded
+_REDIRECT_BY_ID = select(*REDIRECT_COLUMNS).where(
+    URL.id == bindparam("url_id"), URL.short_code == bindparam("short_code")
+)
+_REDIRECT_BY_SHORT_CODE = select(*REDIRECT_COLUMNS).where(URL.short_code == bindparam("short_code")).limit(1)
+_URL_BY_SHORT_CODE = select(URL).where(URL.short_code == bindparam("short_code")).limit(1)
+
+
+def _redirect_queries(short_code: str):
+    """
+    Column-only lookups of a short code: by primary key when the code is the
+    Base62 form of an id, then through the short_code index
+    """
+    url_id = _id_for_short_code(short_code)
+    if url_id is not None:
+        yield _REDIRECT_BY_ID, {"url_id": url_id, "short_code": short_code}
+    yield _REDIRECT_BY_SHORT_CODE, {"short_code": short_code}
+
+
+def _short_codes_query(created_since: Optional[datetime]):
+    query = select(URL.short_code)
+    if created_since is not None:
+        query = query.where(URL.created_at >= created_since)
+    return query.execution_options(stream_results=True)
 
 
 class RedirectToUrlRepository(BaseRepo[URL]):
     """Repository for User Story 2: Redirect to Original URL"""
 
-    def __init__(self, db: Session):
-        super().__init__(db, URL)
+    def __init__(self):
+        super().__init__(URL)
 
-    def get_by_short_code(self, short_code: str) -> Optional[URL]:
+    def get_by_short_code(self, db: Session, short_code: str) -> Optional[URL]:
         """
-        Retrieve a URL by its short code
+        Retrieve a URL by its short code, by primary key when the code is the
+        Base62 form of an id and through the short_code index otherwise
 
         Args:
+            db: The session to run in
             short_code: The short code to look up
 
         Returns:
             Optional[URL]: The URL object if found, None otherwise
         """
-        return self.db.query(self.model).filter(self.model.short_code == short_code).first()
+        url_id = _id_for_short_code(short_code)
+        if url_id is not None:
+            # Primary-key lookup; the code check guards against legacy rows
+            # whose random code happens to decode to another row's id
+            url = db.get(self.model, url_id)
+            if url is not None and url.short_code == short_code:
+                return url
+        return db.scalar(_URL_BY_SHORT_CODE, {"short_code": short_code})
 
-    def get_by_short_code_and_check_expiry(self, short_code: str) -> Optional[URL]:
+    def get_by_short_code_and_check_expiry(self, db: Session, short_code: str) -> Optional[URL]:
         """
         Retrieve a URL by short code and check if it's expired
 
         Args:
+            db: The session to run in
             short_code: The short code to look up
 
         Returns:
             Optional[URL]: The URL object if found and not expired, None otherwise
         """
-        url = self.get_by_short_code(short_code)
+        url = self.get_by_short_code(db, short_code)
         if url and self.is_expired(url):
             return None
         return url
 
+    def get_redirect(self, db: Session, short_code: str) -> Optional[Row]:
+        """
+        Retrieve the redirect columns of an unexpired short code
+
+        Selects only REDIRECT_COLUMNS, so no URL instance is built, tracked in
+        the session's identity map or expired on commit. Rows are copied into
+        a CachedUrl when they are cached.
+
+        Args:
+            db: The session to run in
+            short_code: The short code to look up
+
+        Returns:
+            Optional[Row]: The REDIRECT_COLUMNS if found and not expired, None otherwise
+        """
+        for query, params in _redirect_queries(short_code):
+            row = db.execute(query, params).first()
+            if row is not None:
+                return None if self.is_expired(row) else row
+        return None
+
+    def count_short_codes(self, db: Session) -> int:
+        """
+        Count stored short codes, used to size the short code filter
+
+        Args:
+            db: The session to run in
+
+        Returns:
+            int: Number of rows in urls
+        """
+        return db.scalar(select(func.count()).select_from(self.model))
+
+    def stream_short_codes(self, db: Session, created_since: Optional[datetime] = None,
+                           batch_size: int = 10000) -> Iterator[str]:
+        """
+        Stream every short code (or those created since a point in time) with a
+        server-side cursor, batch_size rows per fetch
+
+        Args:
+            db: The session to run in
+            created_since: Only codes created at or after this time
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            str: Short codes
+        """
+        yield from db.scalars(_short_codes_query(created_since).execution_options(yield_per=batch_size))
+
     def is_expired(self, url: URL) -> bool:
         """
         Check if a URL is expired
@@ -51,4 +168,102 @@ class RedirectToUrlRepository(BaseRepo[URL]):
         """
         if url.expiration_time is None:
             return False
-        return datetime.utcnow() > url.expiration_time
\ No newline at end of file
+        return datetime.utcnow() > url.expiration_time
+
+
+class AsyncRedirectToUrlRepository(AsyncBaseRepo[URL]):
+    """Async repository for User Story 2: Redirect to Original URL"""
+
+    def __init__(self):
+        super().__init__(URL)
+
+    async def get_by_short_code(self, db: AsyncSession, short_code: str) -> Optional[URL]:
+        """
+        Retrieve a URL by its short code, by primary key when the code is the
+        Base62 form of an id and through the short_code index otherwise
+
+        Args:
+            db: The async session to run in
+            short_code: The short code to look up
+
+        Returns:
+            Optional[URL]: The URL object if found, None otherwise
+        """
+        url_id = _id_for_short_code(short_code)
+        if url_id is not None:
+            url = await db.get(self.model, url_id)
+            if url is not None and url.short_code == short_code:
+                return url
+        return await db.scalar(_URL_BY_SHORT_CODE, {"short_code": short_code})
+
+    async def get_by_short_code_and_check_expiry(self, db: AsyncSession, short_code: str) -> Optional[URL]:
+        """
+        Retrieve a URL by short code and check if it's expired
+
+        Args:
+            db: The async session to run in
+            short_code: The short code to look up
+
+        Returns:
+            Optional[URL]: The URL object if found and not expired, None otherwise
+        """
+        url = await self.get_by_short_code(db, short_code)
+        if url and self.is_expired(url):
+            return None
+        return url
+
+    async def get_redirect(self, db: AsyncSession, short_code: str) -> Optional[Row]:
+        """
+        Retrieve the redirect columns of an unexpired short code
+
+        Selects only REDIRECT_COLUMNS, so no URL instance is built, tracked in
+        the session's identity map or expired on commit. Rows are copied into
+        a CachedUrl when they are cached.
+
+        Args:
+            db: The async session to run in
+            short_code: The short code to look up
+
+        Returns:
+            Optional[Row]: The REDIRECT_COLUMNS if found and not expired, None otherwise
+        """
+        for query, params in _redirect_queries(short_code):
+            row = (await db.execute(query, params)).first()
+            if row is not None:
+                return None if self.is_expired(row) else row
+        return None
+
+    async def count_short_codes(self, db: AsyncSession) -> int:
+        """
+        Count stored short codes, used to size the short code filter
+
+        Args:
+            db: The async session to run in
+
+        Returns:
+            int: Number of rows in urls
+        """
+        return await db.scalar(select(func.count()).select_from(self.model))
+
+    async def stream_short_codes(self, db: AsyncSession, created_since: Optional[datetime] = None,
+                                 batch_size: int = 10000) -> AsyncIterator[str]:
+        """
+        Stream every short code (or those created since a point in time) with a
+        server-side cursor, batch_size rows per fetch
+
+        Args:
+            db: The async session to run in
+            created_since: Only codes created at or after this time
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            str: Short codes
+        """
+        result = await db.stream_scalars(
+            _short_codes_query(created_since).execution_options(yield_per=batch_size)
+        )
+        async for short_code in result:
+            yield short_code
+
+    # Expiry is checked in memory, so the sync implementation is shared as-is
+    is_expired = RedirectToUrlRepository.is_expired
@@ -0,0 +1,201 @@
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.url import URL, URLDigest
+from src.utils.url_partitions import DEFAULT_PARTITION, create_partition_sql, parse_bounds
+
+_RELKIND_SQL = text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)")
+
+# Partitions of urls with their bounds and the planner's row estimate
+_PARTITIONS_SQL = text(
+    "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound, c.reltuples AS rows "
+    "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+)
+
+# Creating, detaching or dropping a partition briefly locks urls itself; rather
+# than queue every redirect behind a long-running query, give up and retry next run
+PARTITION_LOCK_TIMEOUT = text("SET LOCAL lock_timeout = '1s'")
+
+
+class UrlPartitionRepository:
+    """
+    Partitions of the urls table on PostgreSQL, where the table is
+    range-partitioned by created_at with one partition per UTC day.
+
+    Whether urls is partitioned is read from the catalog once per process:
+    restart workers after running the partitioning migration.
+    """
+
+    def __init__(self, table: str = URL.__tablename__):
+        self.table = table
+        self._partitioned: Optional[bool] = None
+
+    def is_partitioned(self, db: Session) -> bool:
+        """
+        Check whether urls is a partitioned table
+
+        Args:
+            db: The session to run in
+
+        Returns:
+            bool: True on PostgreSQL once the partitioning migration has run
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        if self._partitioned is None:
+            self._partitioned = db.scalar(_RELKIND_SQL, {"table": self.table}) == "p"
+        return self._partitioned
+
+    async def is_partitioned_async(self, db: AsyncSession) -> bool:
+        """
+        Async counterpart of is_partitioned()
+
+        Args:
+            db: The async session to run in
+
+        Returns:
+            bool: True on PostgreSQL once the partitioning migration has run
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        if self._partitioned is None:
+            self._partitioned = await db.scalar(_RELKIND_SQL, {"table": self.table}) == "p"
+        return self._partitioned
+
+    def list_partitions(self, db: Session) -> List[dict]:
+        """
+        List the partitions of urls
+
+        Args:
+            db: The session to run in
+
+        Returns:
+            List[dict]: name, start and end (None for the default partition) and
+            the estimated row count of each partition, ordered by start
+        """
+        partitions = []
+        for row in db.execute(_PARTITIONS_SQL, {"table": self.table}):
+            bounds = parse_bounds(row.bound)
+            partitions.append({
+                "name": row.name,
+                "start": bounds[0] if bounds else None,
+                "end": bounds[1] if bounds else None,
+                "rows": max(int(row.rows), 0),
+            })
+        return sorted(partitions, key=lambda partition: partition["start"] or datetime.max)
+
+    def create_partition(self, db: Session, day: date) -> None:
+        """
+        Create the partition for rows created on `day`, if it does not exist
+
+        Args:
+            db: The session to run in
+            day: The UTC day the partition covers
+        """
+        db.execute(PARTITION_LOCK_TIMEOUT)
+        db.execute(text(create_partition_sql(day, self.table)))
+        db.commit()
+
+    def count_default_rows(self, db: Session) -> int:
+        """
+        Count the rows that fell outside every daily partition
+
+        Args:
+            db: The session to run in
+
+        Returns:
+            int: Rows in the default partition (0 if there is none)
+        """
+        if db.scalar(_RELKIND_SQL, {"table": DEFAULT_PARTITION}) is None:
+            return 0
+        return db.scalar(text(f"SELECT count(*) FROM {self._quote(db, DEFAULT_PARTITION)}"))
+
+    def is_fully_expired(self, db: Session, name: str, now: datetime) -> bool:
+        """
+        Check that every link in a partition has expired
+
+        Args:
+            db: The session to run in
+            name: The partition
+            now: Reference time for expiry
+
+        Returns:
+            bool: True if no row in the partition can still redirect
+        """
+        live = text(
+            f"SELECT EXISTS (SELECT 1 FROM {self._quote(db, name)} "
+            "WHERE expiration_time IS NULL OR expiration_time > :now)"
+        )
+        return not db.scalar(live, {"now": now})
+
+    def drop_partition(self, db: Session, name: str) -> None:
+        """
+        Drop a partition and its rows: retention without a DELETE
+
+        Args:
+            db: The session to run in
+            name: The partition
+        """
+        db.execute(PARTITION_LOCK_TIMEOUT)
+        db.execute(text(f"DROP TABLE {self._quote(db, name)}"))
+        db.commit()
+
+    def archive_partition(self, db: Session, name: str, schema: str) -> None:
+        """
+        Detach a partition from urls and move it to an archive schema, where it
+        stays queryable as an ordinary table but is no longer scanned by lookups
+
+        Args:
+            db: The session to run in
+            name: The partition
+            schema: The archive schema (created if missing)
+        """
+        partition, schema = self._quote(db, name), self._quote(db, schema)
+        db.execute(PARTITION_LOCK_TIMEOUT)
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        db.execute(text(f"ALTER TABLE {self._quote(db, self.table)} DETACH PARTITION {partition}"))
+        db.execute(text(f"ALTER TABLE {partition} SET SCHEMA {schema}"))
+        db.commit()
+
+    def delete_expired_digests(self, db: Session, now: datetime, batch_size: int = 1000) -> int:
+        """
+        Purge the url_digests rows of expired links, one bounded chunk per
+        transaction. Creates take such digests over anyway; purging keeps
+        url_digests as small as the set of live links
+
+        Args:
+            db: The session to run in
+            now: Reference time for expiry
+            batch_size: Number of rows deleted per transaction
+
+        Returns:
+            int: Number of deleted digests
+        """
+        expired = (
+            select(URLDigest.original_url_hash)
+            .where(URLDigest.expiration_time != None, URLDigest.expiration_time <= now)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        statement = delete(URLDigest).where(
+            URLDigest.original_url_hash.in_(expired.scalar_subquery())
+        ).execution_options(synchronize_session=False)
+        count = 0
+        while True:
+            deleted = db.execute(statement).rowcount
+            db.commit()
+            count += deleted
+            if deleted < batch_size:
+                return count
+
+    @staticmethod
+    def _quote(db: Session, identifier: str) -> str:
+        return db.get_bind().dialect.identifier_preparer.quote(identifier)
+
+
+# Process-wide instance, so the catalog is only asked once
+url_partitions = UrlPartitionRepository()
@@ -11,6 +11,14 @@ class URLShortenResponse(BaseModel):
     data: Optional[dict] = None
     message: Optional[str] = None
 
+class URLBatchResponse(BaseModel):
+    status: str
+    created: int = 0
+    existing: int = 0
+    failed: int = 0
+    data: list[dict] = []
+    message: Optional[str] = None
+
 class URLResponse(BaseModel):
     original_url: str
     short_code: str
@@ -26,6 +34,7 @@ class URLItem(BaseModel):
 class GetAllUrlsResponse(BaseModel):
     status: str
     data: list[URLItem] = []
+    next_cursor: Optional[int] = None  # Pass as ?after= to fetch the next page
     message: Optional[str] = None
 
 class URLDeleteResponse(BaseModel):
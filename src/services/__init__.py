@@ -1,13 +1,20 @@
 from .base_service import BaseService
-from .create_url_service import CreateUrlService
-from .redirect_to_url_service import RedirectToUrlService
-from .get_all_urls_service import GetAllUrlsService
-from .delete_url_service import DeleteUrlService
+from .create_url_service import CreateUrlService, AsyncCreateUrlService
+from .redirect_to_url_service import RedirectToUrlService, AsyncRedirectToUrlService
+from .get_all_urls_service import GetAllUrlsService, AsyncGetAllUrlsService
+from .delete_url_service import DeleteUrlService, AsyncDeleteUrlService
+from .batch_create_url_service import BatchCreateUrlService, AsyncBatchCreateUrlService
 
 __all__ = [
     "BaseService",
     "CreateUrlService",
     "RedirectToUrlService", 
     "GetAllUrlsService",
-    "DeleteUrlService"
+    "DeleteUrlService",
+    "AsyncCreateUrlService",
+    "AsyncRedirectToUrlService",
+    "AsyncGetAllUrlsService",
+    "AsyncDeleteUrlService",
+    "BatchCreateUrlService",
+    "AsyncBatchCreateUrlService"
 ]
\ No newline at end of file
@@ -1,9 +1,10 @@
 from abc import ABC
-from sqlalchemy.orm import Session
 
 
 class BaseService(ABC):
-    """Base service class with common functionality"""
-    
-    def __init__(self, db: Session):
-        self.db = db
\ No newline at end of file
+    """
+    Base service class with common functionality.
+
+    Services hold no session: they are built once per process, together with
+    their repositories, and every method takes the session it should use.
+    """
@@ -0,0 +1,146 @@
+from typing import Dict, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.redirect_cache import redirect_cache
+from src.cache.shared_cache import shared_redirect_cache
+from src.cache.short_code_filter import short_code_filter
+from src.schemas.url import URLShortenRequest
+from src.services.create_url_service import CreateUrlService, AsyncCreateUrlService
+from src.utils.url_digest import url_digest
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _success(row: dict, created: bool) -> dict:
+    return {
+        "status": "success",
+        "created": created,
+        "short_code": row["short_code"],
+        "original_url": row["original_url"],
+        "expires_at": row["expiration_time"],
+    }
+
+
+class _BatchPlan:
+    """Validated batch items grouped by digest, so each distinct URL is handled once"""
+
+    def __init__(self, size: int):
+        self.results: List[dict] = [None] * size
+        self.rows: Dict[str, dict] = {}
+        self.positions: Dict[str, List[int]] = {}
+
+    def fail(self, index: int, message: str) -> None:
+        self.results[index] = {"status": "failure", "message": message}
+
+    def resolve(self, found: Dict[str, dict], created: bool) -> None:
+        for digest, row in found.items():
+            for index in self.positions.pop(digest, ()):
+                self.results[index] = _success(row, created)
+            self.rows.pop(digest, None)
+
+
+class BatchCreateUrlService(CreateUrlService):
+    """Service for batch creation of short URLs (User Story 1 at bulk scale)"""
+
+    def _plan(self, items: list) -> _BatchPlan:
+        """
+        Validate every item and group the valid ones by URL digest
+
+        Args:
+            items: Raw batch items (dicts shaped like URLShortenRequest)
+
+        Returns:
+            _BatchPlan: Per-item failures plus the distinct rows still to resolve
+        """
+        plan = _BatchPlan(len(items))
+        for index, item in enumerate(items):
+            try:
+                if isinstance(item, Exception):
+                    raise ValueError(str(item))
+                request = URLShortenRequest.model_validate(item)
+                validated_url = self._validate_and_sanitize_url(str(request.original_url))
+            except ValidationError as e:
+                plan.fail(index, _validation_message(e))
+                continue
+            except ValueError as e:
+                plan.fail(index, str(e))
+                continue
+            digest = url_digest(validated_url)
+            if digest not in plan.rows:
+                plan.rows[digest] = {
+                    "original_url": validated_url,
+                    "original_url_hash": digest,
+                    "expiration_time": self._calculate_expiration_time(request.expiration_minutes),
+                }
+                plan.positions[digest] = []
+            plan.positions[digest].append(index)
+        return plan
+
+    def _finish(self, plan: _BatchPlan, created: Dict[str, dict]) -> Tuple[List[dict], dict]:
+        for row in created.values():
+            redirect_cache.invalidate(row["short_code"])
+            short_code_filter.add(row["short_code"])
+        for digest in plan.rows:
+            for index in plan.positions[digest]:
+                plan.fail(index, "Failed to create short URL")
+        summary = {"created": 0, "existing": 0, "failed": 0}
+        for result in plan.results:
+            if result["status"] == "failure":
+                summary["failed"] += 1
+            elif result["created"]:
+                summary["created"] += 1
+            else:
+                summary["existing"] += 1
+        return plan.results, summary
+
+    def create_short_urls(self, db: Session, items: list) -> Tuple[List[dict], dict]:
+        """
+        Create short URLs for a batch of items with set-based database access:
+        one indexed lookup per chunk of distinct URLs, then multi-row inserts
+        and a single commit for the new ones
+
+        Args:
+            db: The session to run in
+            items: Raw batch items (dicts shaped like URLShortenRequest)
+
+        Returns:
+            Tuple[List[dict], dict]: Per-item results in input order and created/existing/failed counts
+        """
+        plan = self._plan(items)
+        plan.resolve(self.repository.get_by_digests(db, list(plan.rows)), created=False)
+        created = self.repository.bulk_create_urls(db, list(plan.rows.values())) or {}
+        plan.resolve(created, created=True)
+        # URLs created concurrently between the lookup and the insert
+        plan.resolve(self.repository.get_by_digests(db, list(plan.rows)), created=False)
+        shared_redirect_cache.announce([row["short_code"] for row in created.values()])
+        return self._finish(plan, created)
+
+
+class AsyncBatchCreateUrlService(AsyncCreateUrlService, BatchCreateUrlService):
+    """Async service for batch creation of short URLs"""
+
+    async def create_short_urls(self, db: AsyncSession, items: list) -> Tuple[List[dict], dict]:
+        """
+        Create short URLs for a batch of items (see BatchCreateUrlService.create_short_urls)
+
+        Args:
+            db: The async session to run in
+            items: Raw batch items (dicts shaped like URLShortenRequest)
+
+        Returns:
+            Tuple[List[dict], dict]: Per-item results in input order and created/existing/failed counts
+        """
+        plan = self._plan(items)
+        plan.resolve(await self.repository.get_by_digests(db, list(plan.rows)), created=False)
+        created = await self.repository.bulk_create_urls(db, list(plan.rows.values())) or {}
+        plan.resolve(created, created=True)
+        plan.resolve(await self.repository.get_by_digests(db, list(plan.rows)), created=False)
+        await shared_redirect_cache.announce_async([row["short_code"] for row in created.values()])
+        return self._finish(plan, created)
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Optional, Set
+
+from src.db.config import (
+    CDN_PURGE_URL,
+    CDN_PURGE_METHOD,
+    CDN_PURGE_HEADER,
+    CDN_PURGE_INTERVAL_SECONDS,
+    CDN_PURGE_TIMEOUT_SECONDS,
+    CDN_PURGE_MAX_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CdnPurger:
+    """
+    Background purge of deleted links from the CDN in front of the redirects.
+
+    Deleting a link only queues its short code; a background task sends one
+    purge request per queued code every interval_seconds, off the event loop.
+    Codes whose purge fails are queued again, so a CDN outage delays purges
+    rather than losing them, up to max_pending codes.
+    """
+
+    def __init__(self, url_template: str = CDN_PURGE_URL, method: str = CDN_PURGE_METHOD,
+                 header: str = CDN_PURGE_HEADER, interval_seconds: float = CDN_PURGE_INTERVAL_SECONDS,
+                 timeout_seconds: float = CDN_PURGE_TIMEOUT_SECONDS, max_pending: int = CDN_PURGE_MAX_PENDING):
+        self.url_template = url_template
+        self.method = method.upper()
+        self.headers = {}
+        if header:
+            name, _, value = header.partition(":")
+            self.headers[name.strip()] = value.strip()
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.purged = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_purge_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url_template)
+
+    def purge(self, short_code: str) -> None:
+        """
+        Queue a deleted short code for purging
+
+        Args:
+            short_code: The short code that was deleted
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._pending) < self.max_pending:
+                self._pending.add(short_code)
+            else:
+                self.dropped += 1
+
+    def drain(self) -> Set[str]:
+        """
+        Take every queued short code
+
+        Returns:
+            Set[str]: Codes queued since the last drain
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            return pending
+
+    def send(self, short_code: str) -> None:
+        """
+        Purge one short code, blocking until the CDN answers
+
+        Args:
+            short_code: The short code to purge
+
+        Raises:
+            OSError: If the request fails or the CDN answers with an error status
+        """
+        request = urllib.request.Request(
+            self.url_template.format(short_code=short_code), method=self.method, headers=self.headers
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds):
+                pass
+        except urllib.error.HTTPError as e:
+            # Nothing cached under that URL: there is nothing left to purge
+            if e.code != 404:
+                raise
+
+    async def flush(self) -> int:
+        """
+        Purge every queued short code
+
+        Returns:
+            int: Number of codes purged
+        """
+        purged = 0
+        failed = []
+        for short_code in self.drain():
+            try:
+                await asyncio.to_thread(self.send, short_code)
+                purged += 1
+            except OSError as e:
+                failed.append(short_code)
+                self.last_error = str(e)
+        if failed:
+            self.failed += len(failed)
+            logger.warning("CDN purge failed for %d short codes: %s", len(failed), self.last_error)
+            for short_code in failed:
+                self.purge(short_code)
+        if purged:
+            self.purged += purged
+            self.last_purge_at = datetime.utcnow()
+        return purged
+
+    def start(self) -> None:
+        """Start purging in the background on the running event loop"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_forever(), name="cdn-purger")
+
+    async def stop(self) -> None:
+        """Cancel the background task, then send the purges still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "pending": pending,
+            "purged": self.purged,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "last_purge_at": self.last_purge_at.isoformat() if self.last_purge_at else None,
+            "last_error": self.last_error,
+        }
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("CDN purge failed")
+
+
+# Process-wide queue fed by the delete endpoints
+cdn_purger = CdnPurger()
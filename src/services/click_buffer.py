@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.db.config import (
+    DB_MODE,
+    CLICK_TRACKING_ENABLED,
+    CLICK_FLUSH_INTERVAL_SECONDS,
+    CLICK_BUFFER_MAX_KEYS,
+)
+from src.db.async_session import get_async_sessionmaker
+from src.db.session import get_sessionmaker
+from src.repositories.click_repository import ClickRepository, AsyncClickRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ClickBuffer:
+    """
+    Write-behind aggregation of redirect clicks.
+
+    The redirect path only increments an in-memory counter per short code; a
+    background task periodically swaps the counters out and writes them with one
+    bulk upsert, so a hot link costs one row update per flush instead of one per
+    click. Counts pending in memory are lost if the process dies before the next
+    flush, and once max_keys distinct codes are pending, clicks on new codes are
+    dropped (and counted as dropped) until the buffer is flushed.
+    """
+
+    def __init__(self, flush_interval_seconds: float = CLICK_FLUSH_INTERVAL_SECONDS,
+                 max_keys: int = CLICK_BUFFER_MAX_KEYS,
+                 enabled: bool = CLICK_TRACKING_ENABLED):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_keys = max_keys
+        self.enabled = enabled
+        self.repository = ClickRepository()
+        self.async_repository = AsyncClickRepository()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._full: Optional[asyncio.Event] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.total_flushed = 0
+        self.last_flushed_keys = 0
+        self.last_duration_seconds = 0.0
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def record(self, short_code: str) -> None:
+        """
+        Count one click on a short code
+
+        Args:
+            short_code: The short code that was redirected
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            count = self._counts.get(short_code)
+            if count is not None:
+                self._counts[short_code] = count + 1
+            elif len(self._counts) < self.max_keys:
+                self._counts[short_code] = 1
+            else:
+                self.dropped += 1
+                if self._full is not None:
+                    self._full.set()
+                return
+            self.recorded += 1
+
+    def pending(self, short_code: str) -> int:
+        """
+        Number of clicks on a short code not yet written to the database
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            int: Clicks waiting for the next flush
+        """
+        with self._lock:
+            return self._counts.get(short_code, 0)
+
+    def drain(self) -> Dict[str, int]:
+        """
+        Take every pending counter, leaving the buffer empty
+
+        Returns:
+            Dict[str, int]: Clicks per short code since the last drain
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            return counts
+
+    def flush(self, session_factory) -> int:
+        """
+        Write pending clicks through a sync session factory
+
+        Args:
+            session_factory: Callable returning a new Session
+
+        Returns:
+            int: Number of short codes written
+        """
+        started = time.perf_counter()
+        counts = self.drain()
+        if counts:
+            try:
+                with session_factory() as db:
+                    self.repository.add_clicks(db, counts)
+            except Exception:
+                self._restore(counts)
+                raise
+        self._record(counts, time.perf_counter() - started)
+        return len(counts)
+
+    async def flush_async(self, session_factory) -> int:
+        """
+        Write pending clicks through an async session factory
+
+        Args:
+            session_factory: Callable returning a new AsyncSession
+
+        Returns:
+            int: Number of short codes written
+        """
+        started = time.perf_counter()
+        counts = self.drain()
+        if counts:
+            try:
+                async with session_factory() as db:
+                    await self.async_repository.add_clicks(db, counts)
+            except Exception:
+                self._restore(counts)
+                raise
+        self._record(counts, time.perf_counter() - started)
+        return len(counts)
+
+    def start(self) -> None:
+        """Start flushing in the background on the running event loop"""
+        if self.enabled and self._task is None:
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._run_forever(), name="click-flusher")
+
+    async def stop(self) -> None:
+        """Cancel the background task, then write whatever is still pending"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._full = None
+        try:
+            await self._flush_default()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.exception("Final click flush failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending_keys = len(self._counts)
+            pending_clicks = sum(self._counts.values())
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "max_keys": self.max_keys,
+            "pending_keys": pending_keys,
+            "pending_clicks": pending_clicks,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "total_flushed": self.total_flushed,
+            "last_flushed_keys": self.last_flushed_keys,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            "last_error": self.last_error,
+        }
+
+    async def _flush_default(self) -> None:
+        if DB_MODE == "async":
+            await self.flush_async(get_async_sessionmaker())
+        else:
+            # Sync writes run in a worker thread so requests keep flowing
+            await asyncio.to_thread(self.flush, get_sessionmaker())
+
+    async def _run_forever(self) -> None:
+        while True:
+            # Flush on the interval, or early once the buffer runs out of keys
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self._flush_default()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Click flush failed")
+
+    def _restore(self, counts: Dict[str, int]) -> None:
+        # Put counts from a failed flush back so the next flush retries them
+        with self._lock:
+            for short_code, count in counts.items():
+                if short_code in self._counts or len(self._counts) < self.max_keys:
+                    self._counts[short_code] = self._counts.get(short_code, 0) + count
+                else:
+                    self.dropped += count
+
+    def _record(self, counts: Dict[str, int], duration: float) -> None:
+        self.flushes += 1
+        self.total_flushed += sum(counts.values())
+        self.last_flushed_keys = len(counts)
+        self.last_duration_seconds = duration
+        self.last_flush_at = datetime.utcnow()
+        self.last_error = None
+        if counts:
+            logger.debug("Flushed clicks for %d short codes in %.3fs", len(counts), duration)
+
+
+# Process-wide buffer fed by the redirect endpoints
+click_buffer = ClickBuffer()
+
+# Clicks counted before a fork are the parent's to flush, not every child's
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=click_buffer.drain)
@@ -1,47 +1,28 @@
 import secrets
 import string
-import re
 import os
 import time
 from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories.create_url_repository import CreateUrlRepository
+from src.repositories.create_url_repository import CreateUrlRepository, AsyncCreateUrlRepository
 from src.models.url import URL
 from src.db.config import MINUTES_TTL_APP
 from src.services.base_service import BaseService
-
-
-def encode_base62(num: int) -> str:
-    """
-    Encode a positive integer into Base62 string
-
-    Args:
-        num: The positive integer to encode
-
-    Returns:
-        str: The Base62 encoded string
-    """
-    if num == 0:
-        return "0"
-
-    chars = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    result = ""
-
-    while num > 0:
-        result = chars[num % 62] + result
-        num //= 62
-
-    return result
+from src.cache.redirect_cache import redirect_cache
+from src.cache.shared_cache import shared_redirect_cache
+from src.cache.short_code_filter import short_code_filter
+from src.utils.base62 import decode_base62, encode_base62  # noqa: F401  (re-exported)
+from src.utils.url_validator import canonicalize_url, is_valid_url
 
 
 class CreateUrlService(BaseService):
     """Service for User Story 1: Create Short URL"""
 
-    def __init__(self, db: Session):
-        super().__init__(db)
-        self.repository = CreateUrlRepository(db)
+    def __init__(self):
+        self.repository = CreateUrlRepository()
         # Read short code length from environment, default to 6
         self.SHORT_CODE_LENGTH = int(os.getenv('SHORT_CODE_LENGTH', 6))
         self.SHORT_CODE_CHARS = string.ascii_letters + string.digits
@@ -56,50 +37,29 @@ class CreateUrlService(BaseService):
         Returns:
             bool: True if URL is valid, False otherwise
         """
-        if not url:
-            return False
-        
-        # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'http://' + url
-        
-        # URL validation regex
-        url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:'
-            r'(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-            r'localhost|'  # localhost
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'  # ...or ip
-            r')'
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE
-        )
-        return url_pattern.match(url) is not None
+        return is_valid_url(url)
 
     def _validate_and_sanitize_url(self, url: str) -> str:
         """
-        Validate and sanitize URL
+        Validate and canonicalize URL into the redirect target that is stored
 
         Args:
             url: The URL to validate and sanitize
 
         Returns:
-            str: The sanitized URL
+            str: The canonical URL, emitted unchanged by redirects
 
         Raises:
             ValueError: If URL is invalid
         """
         if not url:
             raise ValueError("URL cannot be empty")
-        
-        # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'http://' + url
 
-        if not self.validate_url(url):
+        canonical_url = canonicalize_url(url)
+        if canonical_url is None:
             raise ValueError(f"Invalid URL format: {url}")
-        
-        return url
+
+        return canonical_url
 
     def _generate_short_code_from_id(self, url_id: int) -> str:
         """
@@ -113,10 +73,13 @@ class CreateUrlService(BaseService):
         """
         return encode_base62(url_id)
 
-    def _generate_short_code(self) -> str:
+    def _generate_short_code(self, db: Session) -> str:
         """
         Generate a unique short code (deprecated - kept for backward compatibility)
 
+        Args:
+            db: The session to check existing codes in
+
         Returns:
             str: A random short code
         """
@@ -125,17 +88,35 @@ class CreateUrlService(BaseService):
                 secrets.choice(self.SHORT_CODE_CHARS)
                 for _ in range(self.SHORT_CODE_LENGTH)
             )
-            if not self.repository.exists_by_short_code(short_code):
+            if not self.repository.exists_by_short_code(db, short_code):
                 return short_code
 
         # If we can't generate a unique code after 100 attempts, raise an error
         raise Exception("Could not generate unique short code after 100 attempts")
 
-    def create_short_url(self, original_url: str, expiration_minutes: Optional[int] = None) -> URL:
+    def _calculate_expiration_time(self, expiration_minutes: Optional[int] = None) -> Optional[datetime]:
+        """
+        Calculate the expiration time of a new short URL
+
+        Args:
+            expiration_minutes: Optional expiration time in minutes requested by the client
+
+        Returns:
+            Optional[datetime]: The expiration time, or None if the URL never expires
+        """
+        if expiration_minutes:
+            return datetime.utcnow() + timedelta(minutes=expiration_minutes)
+        elif MINUTES_TTL_APP:
+            # Use default TTL from config
+            return datetime.utcnow() + timedelta(minutes=MINUTES_TTL_APP)
+        return None
+
+    def create_short_url(self, db: Session, original_url: str, expiration_minutes: Optional[int] = None) -> URL:
         """
         Create a short URL from an original URL using Base62 encoding of the database ID
 
         Args:
+            db: The session to run in
             original_url: The original URL to shorten
             expiration_minutes: Optional expiration time in minutes
 
@@ -149,26 +130,93 @@ class CreateUrlService(BaseService):
         # Validate and sanitize URL
         validated_url = self._validate_and_sanitize_url(original_url)
 
+        # Where supported, dedup and insert happen atomically in one statement
+        if self.repository.supports_upsert(db):
+            url = self.repository.upsert_url(db, validated_url, self._calculate_expiration_time(expiration_minutes))
+            if url is None:
+                raise Exception("Failed to create URL")
+            redirect_cache.invalidate(url.short_code)
+            short_code_filter.add(url.short_code)
+            shared_redirect_cache.announce([url.short_code])
+            return url
+
         # Check if this URL was already shortened
-        existing_url = self.repository.get_by_original_url(validated_url)
+        existing_url = self.repository.get_by_original_url(db, validated_url)
         if existing_url:
             return existing_url
 
         # Calculate expiration time if provided
-        expiration_time = None
-        if expiration_minutes:
-            expiration_time = datetime.utcnow() + timedelta(minutes=expiration_minutes)
-        elif MINUTES_TTL_APP:
-            # Use default TTL from config
-            expiration_time = datetime.utcnow() + timedelta(minutes=MINUTES_TTL_APP)
+        expiration_time = self._calculate_expiration_time(expiration_minutes)
+
+        # Create URL record with Base62-encoded ID as the short code. Where the
+        # database has sequences the ID is allocated up front (single INSERT);
+        # otherwise fall back to insert-then-update
+        if self.repository.supports_id_allocation(db):
+            url = self.repository.create_url_with_allocated_id(
+                db,
+                original_url=validated_url,
+                expiration_time=expiration_time
+            )
+        else:
+            url = self.repository.create_url_with_id_based_short_code(
+                db,
+                original_url=validated_url,
+                expiration_time=expiration_time
+            )
+
+        if url is None:
+            raise Exception("Failed to create URL")
+
+        # The code may have been probed before it existed; drop the cached miss
+        # here, and on the other workers through the announcement
+        redirect_cache.invalidate(url.short_code)
+        short_code_filter.add(url.short_code)
+        shared_redirect_cache.announce([url.short_code])
+
+        return url
+
 
-        # Create URL record with Base62-encoded ID as the short code
-        url = self.repository.create_url_with_id_based_short_code(
-            original_url=validated_url,
-            expiration_time=expiration_time
-        )
+class AsyncCreateUrlService(CreateUrlService):
+    """Async service for User Story 1: Create Short URL"""
+
+    def __init__(self):
+        self.repository = AsyncCreateUrlRepository()
+        self.SHORT_CODE_LENGTH = int(os.getenv('SHORT_CODE_LENGTH', 6))
+        self.SHORT_CODE_CHARS = string.ascii_letters + string.digits
+
+    async def create_short_url(self, db: AsyncSession, original_url: str, expiration_minutes: Optional[int] = None) -> URL:
+        """
+        Create a short URL from an original URL using Base62 encoding of the database ID
+
+        Args:
+            db: The async session to run in
+            original_url: The original URL to shorten
+            expiration_minutes: Optional expiration time in minutes
+
+        Returns:
+            URL: The created URL object
+
+        Raises:
+            ValueError: If URL is invalid
+            Exception: If unable to create the URL
+        """
+        validated_url = self._validate_and_sanitize_url(original_url)
+        expiration_time = self._calculate_expiration_time(expiration_minutes)
+
+        if self.repository.supports_upsert(db):
+            url = await self.repository.upsert_url(db, validated_url, expiration_time)
+        elif existing_url := await self.repository.get_by_original_url(db, validated_url):
+            return existing_url
+        elif self.repository.supports_id_allocation(db):
+            url = await self.repository.create_url_with_allocated_id(db, validated_url, expiration_time)
+        else:
+            url = await self.repository.create_url_with_id_based_short_code(db, validated_url, expiration_time)
 
         if url is None:
             raise Exception("Failed to create URL")
 
-        return url
\ No newline at end of file
+        redirect_cache.invalidate(url.short_code)
+        short_code_filter.add(url.short_code)
+        await shared_redirect_cache.announce_async([url.short_code])
+
+        return url
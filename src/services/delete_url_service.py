@@ -1,26 +1,68 @@
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories.delete_url_repository import DeleteUrlRepository
+from src.repositories.delete_url_repository import DeleteUrlRepository, AsyncDeleteUrlRepository
 from src.models.url import URL
+from src.cache.redirect_cache import RedirectCache, redirect_cache
+from src.cache.shared_cache import SharedRedirectCache, shared_redirect_cache
 from src.services.base_service import BaseService
+from src.services.cdn_purger import CdnPurger, cdn_purger
 
 
 class DeleteUrlService(BaseService):
     """Service for User Story 4: Delete Shortened URL"""
 
-    def __init__(self, db: Session):
-        super().__init__(db)
-        self.repository = DeleteUrlRepository(db)
+    def __init__(self, cache: RedirectCache = redirect_cache, purger: CdnPurger = cdn_purger,
+                 shared: SharedRedirectCache = shared_redirect_cache):
+        self.repository = DeleteUrlRepository()
+        self.cache = cache
+        self.purger = purger
+        self.shared = shared
 
-    def delete_url(self, short_code: str) -> bool:
+    def delete_url(self, db: Session, short_code: str) -> bool:
         """
-        Delete a URL by its short code
+        Delete a URL by its short code and evict it from the redirect caches and the CDN
 
         Args:
+            db: The session to run in
             short_code: The short code to delete
 
         Returns:
             bool: True if deleted, False otherwise
         """
-        return self.repository.delete_by_short_code(short_code)
\ No newline at end of file
+        deleted = self.repository.delete_by_short_code(db, short_code)
+        self.cache.invalidate(short_code)
+        if deleted:
+            self.shared.invalidate(short_code)
+            self.purger.purge(short_code)
+        return deleted
+
+
+class AsyncDeleteUrlService(BaseService):
+    """Async service for User Story 4: Delete Shortened URL"""
+
+    def __init__(self, cache: RedirectCache = redirect_cache, purger: CdnPurger = cdn_purger,
+                 shared: SharedRedirectCache = shared_redirect_cache):
+        self.repository = AsyncDeleteUrlRepository()
+        self.cache = cache
+        self.purger = purger
+        self.shared = shared
+
+    async def delete_url(self, db: AsyncSession, short_code: str) -> bool:
+        """
+        Delete a URL by its short code and evict it from the redirect caches and the CDN
+
+        Args:
+            db: The async session to run in
+            short_code: The short code to delete
+
+        Returns:
+            bool: True if deleted, False otherwise
+        """
+        deleted = await self.repository.delete_by_short_code(db, short_code)
+        self.cache.invalidate(short_code)
+        if deleted:
+            await self.shared.invalidate_async(short_code)
+            self.purger.purge(short_code)
+        return deleted
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from src.db.config import (
+    DB_MODE,
+    EXPIRY_SWEEPER_ENABLED,
+    EXPIRY_SWEEPER_INTERVAL_SECONDS,
+    EXPIRY_SWEEPER_BATCH_SIZE,
+    EXPIRY_SWEEPER_MAX_BATCHES,
+    EXPIRY_SWEEPER_PAUSE_SECONDS,
+)
+from src.db.async_session import get_async_sessionmaker
+from src.db.session import get_sessionmaker
+from src.repositories.delete_url_repository import DeleteUrlRepository, AsyncDeleteUrlRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    """
+    Background task that purges expired URLs during the app lifespan.
+
+    Each run deletes in chunks of batch_size rows, one short transaction per
+    chunk, pausing between chunks and stopping after max_batches so a large
+    backlog is worked off over several runs instead of in one long burst.
+    """
+
+    def __init__(self, interval_seconds: float = EXPIRY_SWEEPER_INTERVAL_SECONDS,
+                 batch_size: int = EXPIRY_SWEEPER_BATCH_SIZE,
+                 max_batches: int = EXPIRY_SWEEPER_MAX_BATCHES,
+                 pause_seconds: float = EXPIRY_SWEEPER_PAUSE_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.pause_seconds = pause_seconds
+        self.repository = DeleteUrlRepository()
+        self.async_repository = AsyncDeleteUrlRepository()
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.total_purged = 0
+        self.last_purged = 0
+        self.last_duration_seconds = 0.0
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def run_once(self, session_factory) -> int:
+        """
+        Purge expired URLs through a sync session factory
+
+        Args:
+            session_factory: Callable returning a new Session
+
+        Returns:
+            int: Number of rows purged
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        purged = 0
+        with session_factory() as db:
+            for _ in range(self.max_batches):
+                deleted = self.repository.delete_expired_batch(db, self.batch_size, now)
+                purged += deleted
+                if deleted < self.batch_size:
+                    break
+                time.sleep(self.pause_seconds)
+        self._record(purged, time.perf_counter() - started)
+        return purged
+
+    async def run_once_async(self, session_factory) -> int:
+        """
+        Purge expired URLs through an async session factory
+
+        Args:
+            session_factory: Callable returning a new AsyncSession
+
+        Returns:
+            int: Number of rows purged
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        purged = 0
+        async with session_factory() as db:
+            for _ in range(self.max_batches):
+                deleted = await self.async_repository.delete_expired_batch(db, self.batch_size, now)
+                purged += deleted
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause_seconds)
+        self._record(purged, time.perf_counter() - started)
+        return purged
+
+    def start(self) -> None:
+        """Start sweeping in the background on the running event loop"""
+        if EXPIRY_SWEEPER_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run_forever(), name="expiry-sweeper")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": EXPIRY_SWEEPER_ENABLED,
+            "running": self._task is not None,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "total_purged": self.total_purged,
+            "last_purged": self.last_purged,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error,
+        }
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                if DB_MODE == "async":
+                    await self.run_once_async(get_async_sessionmaker())
+                else:
+                    # Sync deletes run in a worker thread so requests keep flowing
+                    await asyncio.to_thread(self.run_once, get_sessionmaker())
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Expiry sweep failed")
+
+    def _record(self, purged: int, duration: float) -> None:
+        self.runs += 1
+        self.total_purged += purged
+        self.last_purged = purged
+        self.last_duration_seconds = duration
+        self.last_run_at = datetime.utcnow()
+        self.last_error = None
+        logger.info("Expiry sweep purged %d URLs in %.3fs", purged, duration)
+
+
+# Process-wide sweeper started by the application lifespan
+expiry_sweeper = ExpirySweeper()
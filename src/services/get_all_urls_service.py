@@ -1,23 +1,100 @@
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories.get_all_urls_repository import GetAllUrlsRepository
-from src.models.url import URL
+from src.repositories.get_all_urls_repository import GetAllUrlsRepository, AsyncGetAllUrlsRepository
+from src.db.config import URLS_STREAM_BATCH_SIZE
 from src.services.base_service import BaseService
 
 
 class GetAllUrlsService(BaseService):
     """Service for User Story 3: View All Shortened URLs"""
 
-    def __init__(self, db: Session):
-        super().__init__(db)
-        self.repository = GetAllUrlsRepository(db)
+    def __init__(self):
+        self.repository = GetAllUrlsRepository()
 
-    def get_all_urls(self) -> List[URL]:
+    def get_all_urls(self, db: Session) -> List[Row]:
         """
         Retrieve all URLs in the system
 
+        Args:
+            db: The session to run in
+
+        Returns:
+            List[Row]: (id, short_code, original_url, created_at, expiration_time) rows
+        """
+        return self.repository.get_all_urls(db)
+
+    def get_urls_page(self, db: Session, limit: int, after: Optional[int] = None) -> List[Row]:
+        """
+        Retrieve one page of URLs after a keyset cursor
+
+        Args:
+            db: The session to run in
+            limit: Maximum number of URLs to return
+            after: The id of the last URL of the previous page, if any
+
+        Returns:
+            List[Row]: (id, short_code, original_url, created_at, expiration_time) rows
+        """
+        return self.repository.get_urls_page(db, limit, after)
+
+    def stream_urls(self, db: Session, after: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Iterate over every URL without loading the table into memory
+
+        Args:
+            db: The session to run in
+            after: Only return URLs whose id is greater than this cursor
+
+        Returns:
+            Iterator[tuple]: (id, short_code, original_url, created_at, expiration_time) rows
+        """
+        return self.repository.stream_urls(db, after, URLS_STREAM_BATCH_SIZE)
+
+
+class AsyncGetAllUrlsService(BaseService):
+    """Async service for User Story 3: View All Shortened URLs"""
+
+    def __init__(self):
+        self.repository = AsyncGetAllUrlsRepository()
+
+    async def get_all_urls(self, db: AsyncSession) -> List[Row]:
+        """
+        Retrieve all URLs in the system
+
+        Args:
+            db: The async session to run in
+
+        Returns:
+            List[Row]: (id, short_code, original_url, created_at, expiration_time) rows
+        """
+        return await self.repository.get_all_urls(db)
+
+    async def get_urls_page(self, db: AsyncSession, limit: int, after: Optional[int] = None) -> List[Row]:
+        """
+        Retrieve one page of URLs after a keyset cursor
+
+        Args:
+            db: The async session to run in
+            limit: Maximum number of URLs to return
+            after: The id of the last URL of the previous page, if any
+
+        Returns:
+            List[Row]: (id, short_code, original_url, created_at, expiration_time) rows
+        """
+        return await self.repository.get_urls_page(db, limit, after)
+
+    def stream_urls(self, db: AsyncSession, after: Optional[int] = None) -> AsyncIterator[tuple]:
+        """
+        Iterate over every URL without loading the table into memory
+
+        Args:
+            db: The async session to run in
+            after: Only return URLs whose id is greater than this cursor
+
         Returns:
-            List[URL]: List of all URL objects
+            AsyncIterator[tuple]: (id, short_code, original_url, created_at, expiration_time) rows
         """
-        return self.repository.get_all_urls()
+        return self.repository.stream_urls(db, after, URLS_STREAM_BATCH_SIZE)
@@ -1,26 +1,137 @@
 from typing import Optional
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories.redirect_to_url_repository import RedirectToUrlRepository
-from src.models.url import URL
+from src.repositories.redirect_to_url_repository import RedirectToUrlRepository, AsyncRedirectToUrlRepository
+from src.cache.redirect_cache import CachedUrl, RedirectCache, redirect_cache
+from src.cache.shared_cache import SharedRedirectCache, shared_redirect_cache
+from src.cache.short_code_filter import ShortCodeFilter, short_code_filter
 from src.services.base_service import BaseService
 
 
 class RedirectToUrlService(BaseService):
     """Service for User Story 2: Redirect to Original URL"""
 
-    def __init__(self, db: Session):
-        super().__init__(db)
-        self.repository = RedirectToUrlRepository(db)
+    def __init__(self, cache: RedirectCache = redirect_cache,
+                 code_filter: ShortCodeFilter = short_code_filter,
+                 shared: SharedRedirectCache = shared_redirect_cache):
+        self.repository = RedirectToUrlRepository()
+        self.cache = cache
+        self.code_filter = code_filter
+        self.shared = shared
 
-    def get_original_url(self, short_code: str) -> Optional[URL]:
+    def get_original_url(self, db: Session, short_code: str,
+                         primary_db: Optional[Session] = None, recent_write: bool = False) -> Optional[CachedUrl]:
         """
-        Retrieve the original URL by short code
+        Retrieve the original URL by short code, consulting the redirect cache,
+        the short code filter and the shared cache before the database
 
         Args:
+            db: The session to run in; a read replica's session when replicas are configured
             short_code: The short code to look up
+            primary_db: Set when db is a read replica: misses and replica errors
+                        are re-checked on the primary, so a code created moments
+                        ago resolves despite replication lag
+            recent_write: The client is inside its read-your-writes window: skip
+                          cached misses and the short code filter, which may
+                          not have a code created on another worker yet
 
         Returns:
-            Optional[URL]: The URL object if found and not expired, None otherwise
+            Optional[CachedUrl]: The URL data if found and not expired, None otherwise
         """
-        return self.repository.get_by_short_code_and_check_expiry(short_code)
\ No newline at end of file
+        cached = self.cache.get(short_code)
+        if cached is not RedirectCache.MISS and not (cached is None and recent_write):
+            return cached
+        consulted = not recent_write
+        if consulted and not self.code_filter.might_contain(short_code):
+            return None
+        shared = self.shared.get(short_code)
+        if shared is not None:
+            return self.cache.put(shared)
+
+        url = self._lookup(db, short_code, primary_db)
+        if url is None:
+            if consulted and self.code_filter.ready:
+                # Only a miss the filter let through is a false positive
+                self.code_filter.record_false_positive()
+            self.cache.put_missing(short_code)
+            return None
+        cached = self.cache.put(url)
+        self.shared.put(cached)
+        return cached
+
+    def _lookup(self, db: Session, short_code: str, primary_db: Optional[Session]):
+        if primary_db is None:
+            return self.repository.get_redirect(db, short_code)
+        try:
+            url = self.repository.get_redirect(db, short_code)
+        except SQLAlchemyError:
+            url = None
+        if url is None:
+            url = self.repository.get_redirect(primary_db, short_code)
+        return url
+
+
+class AsyncRedirectToUrlService(BaseService):
+    """Async service for User Story 2: Redirect to Original URL"""
+
+    def __init__(self, cache: RedirectCache = redirect_cache,
+                 code_filter: ShortCodeFilter = short_code_filter,
+                 shared: SharedRedirectCache = shared_redirect_cache):
+        self.repository = AsyncRedirectToUrlRepository()
+        self.cache = cache
+        self.code_filter = code_filter
+        self.shared = shared
+
+    async def get_original_url(self, db: AsyncSession, short_code: str,
+                               primary_db: Optional[AsyncSession] = None,
+                               recent_write: bool = False) -> Optional[CachedUrl]:
+        """
+        Retrieve the original URL by short code, consulting the redirect cache,
+        the short code filter and the shared cache before the database
+
+        Args:
+            db: The async session to run in; a read replica's session when replicas are configured
+            short_code: The short code to look up
+            primary_db: Set when db is a read replica: misses and replica errors
+                        are re-checked on the primary, so a code created moments
+                        ago resolves despite replication lag
+            recent_write: The client is inside its read-your-writes window: skip
+                          cached misses and the short code filter, which may
+                          not have a code created on another worker yet
+
+        Returns:
+            Optional[CachedUrl]: The URL data if found and not expired, None otherwise
+        """
+        cached = self.cache.get(short_code)
+        if cached is not RedirectCache.MISS and not (cached is None and recent_write):
+            return cached
+        consulted = not recent_write
+        if consulted and not self.code_filter.might_contain(short_code):
+            return None
+        shared = await self.shared.get_async(short_code)
+        if shared is not None:
+            return self.cache.put(shared)
+
+        url = await self._lookup(db, short_code, primary_db)
+        if url is None:
+            if consulted and self.code_filter.ready:
+                # Only a miss the filter let through is a false positive
+                self.code_filter.record_false_positive()
+            self.cache.put_missing(short_code)
+            return None
+        cached = self.cache.put(url)
+        self.shared.put(cached)
+        return cached
+
+    async def _lookup(self, db: AsyncSession, short_code: str, primary_db: Optional[AsyncSession]):
+        if primary_db is None:
+            return await self.repository.get_redirect(db, short_code)
+        try:
+            url = await self.repository.get_redirect(db, short_code)
+        except SQLAlchemyError:
+            url = None
+        if url is None:
+            url = await self.repository.get_redirect(primary_db, short_code)
+        return url
@@ -0,0 +1,63 @@
+# Shared Base62 codec: short codes are the Base62 form of urls.id
+BASE62_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+_BASE = len(BASE62_ALPHABET)
+_DIGIT_VALUES = {char: value for value, char in enumerate(BASE62_ALPHABET)}
+
+# Every two-digit string, so encoding takes one division per pair of digits
+_BASE_SQUARED = _BASE * _BASE
+_DIGIT_PAIRS = [high + low for high in BASE62_ALPHABET for low in BASE62_ALPHABET]
+
+
+def encode_base62(num: int) -> str:
+    """
+    Encode a non-negative integer into Base62 string
+
+    Args:
+        num: The non-negative integer to encode
+
+    Returns:
+        str: The Base62 encoded string
+
+    Raises:
+        ValueError: If the integer is negative
+    """
+    if num < 0:
+        raise ValueError(f"Cannot Base62-encode a negative integer: {num}")
+    if num < _BASE:
+        return BASE62_ALPHABET[num]
+
+    # Short codes are at most a few pairs long, where prepending to a str is
+    # cheaper than collecting digits and joining them
+    result = ""
+    while num >= _BASE_SQUARED:
+        result = _DIGIT_PAIRS[num % _BASE_SQUARED] + result
+        num //= _BASE_SQUARED
+
+    return (_DIGIT_PAIRS[num] if num >= _BASE else BASE62_ALPHABET[num]) + result
+
+
+def decode_base62(code: str) -> int:
+    """
+    Decode a Base62 string back into the integer it encodes
+
+    Args:
+        code: The Base62 string to decode
+
+    Returns:
+        int: The decoded integer
+
+    Raises:
+        ValueError: If the string is empty or contains non-Base62 characters
+    """
+    if not code:
+        raise ValueError("Base62 code cannot be empty")
+
+    num = 0
+    try:
+        for char in code:
+            num = num * _BASE + _DIGIT_VALUES[char]
+    except KeyError:
+        raise ValueError(f"Invalid Base62 code: {code}") from None
+
+    return num
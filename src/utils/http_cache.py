@@ -0,0 +1,163 @@
+import calendar
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional
+
+from src.db.config import (
+    REDIRECT_STATUS_CODE,
+    REDIRECT_MAX_AGE_SECONDS,
+    REDIRECT_CDN_MAX_AGE_SECONDS,
+    REDIRECT_NO_STORE_WITHIN_SECONDS,
+    REDIRECT_SURROGATE_KEY_HEADER,
+    CDN_PURGE_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+# 301/308 are permanent and 302/307 temporary; 307/308 keep the request method
+REDIRECT_STATUS_CODES = (301, 302, 307, 308)
+
+if REDIRECT_STATUS_CODE not in REDIRECT_STATUS_CODES:
+    raise ValueError(f"REDIRECT_STATUS_CODE must be one of {REDIRECT_STATUS_CODES}, not {REDIRECT_STATUS_CODE}")
+
+if REDIRECT_CDN_MAX_AGE_SECONDS > REDIRECT_MAX_AGE_SECONDS and not CDN_PURGE_URL:
+    logger.warning("REDIRECT_CDN_MAX_AGE_SECONDS=%d without CDN_PURGE_URL: shared caches keep serving "
+                   "deleted links for up to %ds", REDIRECT_CDN_MAX_AGE_SECONDS, REDIRECT_CDN_MAX_AGE_SECONDS)
+
+
+def seconds_until(expiration_time: Optional[datetime], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Seconds left before a link expires
+
+    Args:
+        expiration_time: The row's expiration_time (naive UTC), or None
+        now: Current naive UTC time
+
+    Returns:
+        Optional[float]: Seconds to expiry, or None for links that never expire
+    """
+    if expiration_time is None:
+        return None
+    return (expiration_time - (now or datetime.utcnow())).total_seconds()
+
+
+def cache_control(seconds_left: Optional[float], max_age: int = REDIRECT_MAX_AGE_SECONDS,
+                  cdn_max_age: int = REDIRECT_CDN_MAX_AGE_SECONDS,
+                  no_store_within: int = REDIRECT_NO_STORE_WITHIN_SECONDS) -> str:
+    """
+    Cache-Control value for a redirect
+
+    Both lifetimes are cut to the time left before the link expires, so no
+    cache serves it afterwards; a link about to expire is not cached at all.
+
+    Args:
+        seconds_left: Seconds to the link's expiry, None if it never expires
+        max_age: Longest a browser may reuse the redirect
+        cdn_max_age: Longest a shared cache may reuse it (s-maxage)
+        no_store_within: Links expiring sooner than this are sent no-store
+
+    Returns:
+        str: e.g. "public, max-age=60, s-maxage=3600" or "no-store"
+    """
+    if seconds_left is not None:
+        if seconds_left < no_store_within:
+            return "no-store"
+        max_age = min(max_age, int(seconds_left))
+        cdn_max_age = min(cdn_max_age, int(seconds_left))
+    if max_age <= 0 and cdn_max_age <= 0:
+        return "no-store"
+    value = f"public, max-age={max(max_age, 0)}"
+    if cdn_max_age != max_age:
+        value += f", s-maxage={max(cdn_max_age, 0)}"
+    return value
+
+
+def entity_tag(short_code: str, original_url: str, expiration_time=None) -> str:
+    """
+    Strong ETag for a redirect, derived from everything the response depends on
+
+    Args:
+        short_code: The requested short code
+        original_url: The redirect target
+        expiration_time: The link's expiry (a datetime or Unix seconds), if any
+
+    Returns:
+        str: The quoted entity tag
+    """
+    if isinstance(expiration_time, datetime):
+        # Whole Unix seconds, so origin and edge nodes (whose snapshot stores
+        # expiries that way) send the same tag for the same link
+        expiration_time = calendar.timegm(expiration_time.utctimetuple())
+    digest = hashlib.blake2b(
+        f"{short_code}\0{original_url}\0{expiration_time or ''}".encode("utf-8"), digest_size=12
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def redirect_headers(short_code: str, original_url: str, seconds_left: Optional[float],
+                     created_at: Optional[datetime] = None, expiration_time=None) -> dict:
+    """
+    Headers of a redirect response: Location and its caching validators
+
+    Args:
+        short_code: The requested short code
+        original_url: The redirect target
+        seconds_left: Seconds to the link's expiry, None if it never expires
+        created_at: When the link was created, sent as Last-Modified
+        expiration_time: The link's expiry, part of the ETag
+
+    Returns:
+        dict: Response headers
+    """
+    headers = {
+        "location": original_url,
+        "cache-control": cache_control(seconds_left),
+        "etag": entity_tag(short_code, original_url, expiration_time),
+    }
+    if created_at is not None:
+        # Links are never edited in place, only created and deleted
+        headers["last-modified"] = http_date(created_at)
+    if REDIRECT_SURROGATE_KEY_HEADER:
+        # Lets a CDN purge every cached variant of the link by key
+        headers[REDIRECT_SURROGATE_KEY_HEADER.lower()] = short_code
+    return headers
+
+
+def not_modified(request_headers: Mapping[str, str], etag: str, created_at: Optional[datetime] = None) -> bool:
+    """
+    Whether a conditional request can be answered with 304 Not Modified
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+
+    Args:
+        request_headers: The request's headers
+        etag: The current entity tag
+        created_at: The link's creation time, if known
+
+    Returns:
+        bool: True if the client's cached copy is still current
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/ prefixes are ignored
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None or created_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return created_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
@@ -0,0 +1,127 @@
+import atexit
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from src.db.config import LOG_MODE, LOG_LEVEL, LOG_QUEUE_SIZE, ACCESS_LOG_SAMPLE_RATE
+
+# Format of the development (verbose, human readable) mode
+DEV_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Argument types that can cross to the listener thread without being rendered first
+_PLAIN_ARGS = (str, int, float, bool, type(None))
+
+# uvicorn.access records carry (client, method, path, http_version, status)
+_ACCESS_FIELDS = ("client", "method", "path", "http_version", "status")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with `extra` fields kept as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.name == "uvicorn.access" and isinstance(record.args, tuple) and len(record.args) == len(_ACCESS_FIELDS):
+            entry.update(zip(_ACCESS_FIELDS, record.args))
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks or formats on the logging thread.
+
+    Messages whose arguments are plain values are rendered by the listener
+    thread; anything else is rendered here so mutable objects are captured as
+    they were. When the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args and not (isinstance(record.args, tuple) and all(isinstance(arg, _PLAIN_ARGS) for arg in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Pass a fraction of records, but always pass warnings and access logs of 5xx responses"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        args = record.args
+        if isinstance(args, tuple) and len(args) == len(_ACCESS_FIELDS) and isinstance(args[4], int) and args[4] >= 500:
+            return True
+        return random.random() < self.rate
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(mode: str = LOG_MODE) -> None:
+    """
+    Configure the root logger for the given mode
+
+    "dev" keeps the verbose, synchronous console output. "prod" writes JSON
+    lines from a background thread fed through a bounded queue, and samples
+    uvicorn's access log at ACCESS_LOG_SAMPLE_RATE.
+
+    Args:
+        mode: "dev" or "prod"
+    """
+    global _listener
+    level = LOG_LEVEL or ("DEBUG" if mode == "dev" else "INFO")
+    if mode != "prod":
+        logging.basicConfig(level=level, format=DEV_FORMAT)
+        return
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [NonBlockingQueueHandler(log_queue)]
+    root.setLevel(level)
+    # Route uvicorn's loggers through the same pipeline
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").addFilter(SamplingFilter(ACCESS_LOG_SAMPLE_RATE))
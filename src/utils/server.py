@@ -0,0 +1,89 @@
+import importlib.util
+import math
+import os
+
+from src.db.config import (
+    LOG_MODE,
+    LOG_LEVEL,
+    SERVE_MODE,
+    SERVER_HOST,
+    SERVER_PORT,
+    WEB_CONCURRENCY,
+    SERVER_BACKLOG,
+    KEEPALIVE_TIMEOUT_SECONDS,
+    GRACEFUL_SHUTDOWN_SECONDS,
+    SERVER_LIMIT_CONCURRENCY,
+)
+
+# cgroup v2 CPU quota of the container, "<quota> <period>" or "max <period>"
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus(cgroup_cpu_max: str = CGROUP_CPU_MAX) -> int:
+    """
+    Number of CPUs this process can actually use
+
+    Honours the scheduler affinity mask and a container's cgroup CPU quota,
+    both of which os.cpu_count() ignores.
+
+    Args:
+        cgroup_cpu_max: Path of the cgroup v2 cpu.max file
+
+    Returns:
+        int: Usable CPUs, at least 1
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cgroup_cpu_max) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options(mode: str = SERVE_MODE) -> dict:
+    """
+    Keyword arguments for uvicorn.run("main:app", ...)
+
+    "dev" keeps the single auto-reloading process. "prod" runs one worker per
+    usable CPU (or WEB_CONCURRENCY) under uvicorn's supervisor, which restarts
+    workers that die and, on SIGTERM, stops accepting connections and gives
+    in-flight requests GRACEFUL_SHUTDOWN_SECONDS to finish before the
+    lifespan shutdown flushes clicks and closes the pools. uvloop and
+    httptools are used when installed.
+
+    Args:
+        mode: "dev" or "prod"
+
+    Returns:
+        dict: Options for uvicorn.run()
+    """
+    options = {"host": SERVER_HOST, "port": SERVER_PORT}
+    if LOG_MODE == "prod":
+        # log_config=None leaves uvicorn's loggers to configure_logging()
+        options.update(log_config=None, log_level=(LOG_LEVEL or "INFO").lower())
+    else:
+        options["log_level"] = "debug" if mode != "prod" else (LOG_LEVEL or "INFO").lower()
+    if mode != "prod":
+        options["reload"] = LOG_MODE != "prod"
+        return options
+
+    options.update(
+        workers=WEB_CONCURRENCY or available_cpus(),
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS,
+        limit_concurrency=SERVER_LIMIT_CONCURRENCY or None,
+    )
+    return options
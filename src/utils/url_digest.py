@@ -0,0 +1,50 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+# Ports that are implied by the scheme and therefore dropped during normalization
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Width of the hex digest stored in urls.original_url_hash
+URL_DIGEST_LENGTH = 64
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for deduplication: lowercase scheme and host, drop the
+    default port and use "/" for an empty path
+
+    Args:
+        url: The (already validated) URL
+
+    Returns:
+        str: The normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = f"[{host}]" if ":" in host else host
+    if parts.username or parts.password:
+        userinfo = parts.username or ""
+        if parts.password:
+            userinfo += f":{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, parts.fragment))
+
+
+def url_digest(url: str) -> str:
+    """
+    Fixed-width digest of the normalized URL, used for indexed deduplication
+
+    Args:
+        url: The URL to hash
+
+    Returns:
+        str: The SHA-256 hex digest (64 characters)
+    """
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
@@ -0,0 +1,67 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+# On PostgreSQL, urls is range-partitioned by created_at (migration
+# f3c9a1d5b720) into one partition per UTC day, named urls_pYYYYMMDD. Rows
+# outside every range land in urls_default, which should stay empty
+PARTITION_PREFIX = "urls_p"
+DEFAULT_PARTITION = "urls_default"
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def partition_name(day: date) -> str:
+    """Name of the partition holding rows created on `day`"""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def create_partition_sql(day: date, table: str = "urls") -> str:
+    """
+    CREATE TABLE statement for the partition of `day`
+
+    Args:
+        day: The UTC day the partition covers
+        table: The partitioned table
+
+    Returns:
+        str: The statement; a no-op if the partition already exists
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+    )
+
+
+def parse_bounds(expression: str) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Range of a partition from its bound expression (pg_get_expr(relpartbound))
+
+    Returns:
+        Optional[Tuple[datetime, datetime]]: Inclusive start and exclusive end, or
+        None for the default partition and unbounded (MINVALUE/MAXVALUE) ranges
+    """
+    match = _BOUNDS.search(expression or "")
+    if match is None:
+        return None
+    try:
+        return datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))
+    except ValueError:
+        return None
+
+
+def days_to_create(existing: Iterable[date], today: date, days_ahead: int) -> List[date]:
+    """
+    Days from today through today + days_ahead that have no partition yet
+
+    Args:
+        existing: Days that already have a partition
+        today: The current UTC day
+        days_ahead: How many days past today to cover
+
+    Returns:
+        List[date]: Missing days, in order
+    """
+    existing = set(existing)
+    days = (today + timedelta(days=offset) for offset in range(days_ahead + 1))
+    return [day for day in days if day not in existing]
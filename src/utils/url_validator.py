@@ -0,0 +1,64 @@
+import re
+from typing import Optional
+from urllib.parse import quote, urlsplit
+
+# Scheme assumed when a URL is submitted without one
+DEFAULT_SCHEME_PREFIX = "http://"
+
+# Compiled once at import; used on every write, never on redirect
+URL_PATTERN = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:'
+    r'(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
+    r'localhost|'  # localhost
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'  # ...or ip
+    r')'
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE
+)
+
+# Characters left as-is when escaping a redirect target (same set Starlette's
+# RedirectResponse uses, so a stored target can be sent as the Location header)
+LOCATION_SAFE_CHARS = ":/%#?=@[]!$&'()*+,;"
+
+
+def canonicalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Turn a submitted URL into the exact redirect target that is stored
+
+    Adds the default scheme when missing, validates the result and escapes it
+    for use as a Location header, so redirects can emit it unchanged.
+
+    Args:
+        url: The URL as submitted
+
+    Returns:
+        Optional[str]: The canonical redirect target, or None if the URL is invalid
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')):
+        url = DEFAULT_SCHEME_PREFIX + url
+    if URL_PATTERN.match(url) is None:
+        return None
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if not (parts.scheme and parts.netloc):
+        return None
+    return quote(url, safe=LOCATION_SAFE_CHARS)
+
+
+def is_valid_url(url: Optional[str]) -> bool:
+    """
+    Check whether a URL can be stored as a redirect target
+
+    Args:
+        url: The URL to check
+
+    Returns:
+        bool: True if canonicalize_url() accepts it
+    """
+    return canonicalize_url(url) is not None
@@ -0,0 +1,32 @@
+"""
+Shared fixtures: a fresh in-memory SQLite database per test, with every table
+created, as a session factory (for code that opens its own sessions) or as one
+open session.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.url import Base
+import src.models.click  # noqa: F401  (registers url_clicks on Base.metadata)
+
+
+@pytest.fixture
+def session_factory():
+    # StaticPool: every session shares the one connection the database lives in
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
@@ -0,0 +1,116 @@
+"""
+In-process stand-in for redis-server, for tests of the shared cache.
+
+Speaks RESP2 on a local port from a background thread and implements the
+commands the shared cache sends: PING, AUTH, SELECT, GET, SET (EX/PX/NX),
+PTTL, DEL, PUBLISH and SUBSCRIBE. Tests can point the cache at a real redis-server
+instead by setting SHARED_CACHE_TEST_URL.
+"""
+
+import asyncio
+import threading
+import time
+
+from src.cache.resp import encode_command, read_reply_async
+
+
+def _bulk(value) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RespServer:
+    def __init__(self):
+        self.data = {}
+        self.channels = {}
+        self._clients = set()
+        self.port = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    def start(self) -> "RespServer":
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._serve, "127.0.0.1", self.port or 0))
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        async def shutdown():
+            self._server.close()
+            for client in list(self._clients):
+                client.cancel()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _serve(self, reader, writer):
+        self._clients.add(asyncio.current_task())
+        try:
+            while True:
+                command = await read_reply_async(reader)
+                writer.write(self._execute(command, writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.channels.values():
+                writers.discard(writer)
+            self._clients.discard(asyncio.current_task())
+            writer.close()
+
+    def _execute(self, command, writer) -> bytes:
+        name = command[0].decode().upper()
+        args = command[1:]
+        if name in ("PING", "AUTH", "SELECT"):
+            return b"+OK\r\n" if name != "PING" else b"+PONG\r\n"
+        if name == "GET":
+            entry = self.data.get(args[0])
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self.data[args[0]]
+                entry = None
+            return _bulk(entry[0] if entry else None)
+        if name == "SET":
+            key, value, options = args[0], args[1], [arg.decode().upper() for arg in args[2:]]
+            expires = None
+            if "PX" in options:
+                expires = time.monotonic() + int(options[options.index("PX") + 1]) / 1000
+            elif "EX" in options:
+                expires = time.monotonic() + int(options[options.index("EX") + 1])
+            current = self.data.get(key)
+            if "NX" in options and current is not None and (current[1] is None or current[1] > time.monotonic()):
+                return _bulk(None)
+            self.data[key] = (value, expires)
+            return b"+OK\r\n"
+        if name == "PTTL":
+            entry = self.data.get(args[0])
+            if entry is None:
+                return b":-2\r\n"
+            return b":-1\r\n" if entry[1] is None else b":%d\r\n" % int((entry[1] - time.monotonic()) * 1000)
+        if name == "DEL":
+            return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args)
+        if name == "PUBLISH":
+            subscribers = self.channels.get(args[0], set())
+            for subscriber in subscribers:
+                subscriber.write(encode_command((b"message", args[0], args[1])))
+            return b":%d\r\n" % len(subscribers)
+        if name == "SUBSCRIBE":
+            self.channels.setdefault(args[0], set()).add(writer)
+            return b"*3\r\n" + _bulk(b"subscribe") + _bulk(args[0]) + b":1\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
@@ -0,0 +1,47 @@
+"""
+Tests for the async (DB_MODE=async) service stack against an in-memory SQLite
+database through aiosqlite.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models.url import Base
+from src.cache.redirect_cache import RedirectCache
+from src.services.create_url_service import AsyncCreateUrlService
+from src.services.redirect_to_url_service import AsyncRedirectToUrlService
+from src.services.delete_url_service import AsyncDeleteUrlService
+
+
+async def run_create_redirect_delete():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    cache = RedirectCache(max_entries=100, max_bytes=10**6, ttl_seconds=60)
+
+    create_service = AsyncCreateUrlService()
+    async with session_factory() as db:
+        first = await create_service.create_short_url(db, "https://example.com/a")
+        again = await create_service.create_short_url(db, "https://example.com/a")
+        other = await create_service.create_short_url(db, "example.com/b")
+        assert first.short_code == again.short_code
+        assert other.short_code != first.short_code
+        assert other.original_url == "http://example.com/b"
+
+    redirect_service = AsyncRedirectToUrlService(cache)
+    async with session_factory() as db:
+        url = await redirect_service.get_original_url(db, first.short_code)
+        assert url.original_url == "https://example.com/a"
+        assert await AsyncDeleteUrlService(cache).delete_url(db, first.short_code)
+        assert await redirect_service.get_original_url(db, first.short_code) is None
+
+    await engine.dispose()
+
+
+def test_async_create_redirect_delete():
+    asyncio.run(run_create_redirect_delete())
@@ -0,0 +1,45 @@
+"""
+Tests for the shared Base62 codec and primary-key resolution of short codes:
+1. decode_base62 inverts encode_base62; non-Base62 input and negative
+   integers are rejected
+2. Redirect lookups resolve generated codes by id and fall back to the
+   short_code index for legacy codes, even ones that decode to another id
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from src.models.url import URL
+from src.repositories.redirect_to_url_repository import RedirectToUrlRepository
+from src.services.create_url_service import decode_base62, encode_base62
+
+
+def test_decode_inverts_encode():
+    for num in [0, 1, 61, 62, 3843, 3844, 238327, 238328, 10 ** 6, 2 ** 31 - 1, 2 ** 63]:
+        assert decode_base62(encode_base62(num)) == num
+    assert decode_base62("4c92") == 1000000
+    for code in ["", "abc-", "~1"]:
+        with pytest.raises(ValueError):
+            decode_base62(code)
+    for num in [-1, -100]:
+        with pytest.raises(ValueError):
+            encode_base62(num)
+
+
+def test_lookup_by_primary_key_with_legacy_fallback(db):
+    db.add_all([
+        URL(id=5, original_url="https://example.com/generated", short_code=encode_base62(5)),
+        # Legacy code "a" decodes to 10, the id of a different row
+        URL(id=7, original_url="https://example.com/legacy", short_code="a"),
+        URL(id=10, original_url="https://example.com/ten", short_code="legacy10"),
+    ])
+    db.commit()
+    repository = RedirectToUrlRepository()
+    assert repository.get_by_short_code(db, "5").original_url == "https://example.com/generated"
+    assert repository.get_by_short_code(db, "a").original_url == "https://example.com/legacy"
+    assert repository.get_by_short_code(db, "legacy10").id == 10
+    assert repository.get_by_short_code(db, "05") is None
+    assert repository.get_by_short_code(db, "zzzzzzzzzz") is None
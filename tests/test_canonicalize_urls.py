@@ -0,0 +1,49 @@
+"""
+Tests for write-time URL canonicalization:
+1. The validator adds the default scheme and rejects invalid URLs
+2. The one-off command rewrites legacy rows, recomputes their digest and
+   expires rows that can never redirect
+"""
+
+import sys
+import os
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import select
+
+from src.commands.canonicalize_urls import canonicalize_existing_urls
+from src.models.url import URL
+from src.utils.url_digest import url_digest
+from src.utils.url_validator import canonicalize_url
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("example.com/path") == "http://example.com/path"
+    assert canonicalize_url(" https://example.com/café ") == "https://example.com/caf%C3%A9"
+    assert canonicalize_url("https://example.com/%7Euser?q=1") == "https://example.com/%7Euser?q=1"
+    assert canonicalize_url("not a url") is None
+    assert canonicalize_url("") is None
+
+
+def test_command_canonicalizes_legacy_rows_in_batches(session_factory):
+    with session_factory() as db:
+        db.add_all([
+            URL(original_url="example.com/a", short_code="a", original_url_hash=url_digest("example.com/a")),
+            URL(original_url="http://example.com/b", short_code="b", original_url_hash=url_digest("http://example.com/b")),
+            URL(original_url="http://example.com/c", short_code="c", original_url_hash=url_digest("http://example.com/c")),
+            URL(original_url="example.com/c", short_code="c2"),
+            URL(original_url="not a url", short_code="bad"),
+        ])
+        db.commit()
+
+    totals = canonicalize_existing_urls(session_factory, batch_size=2)
+    assert totals == {"scanned": 5, "canonicalized": 2, "hash_conflicts": 1, "expired_invalid": 1}
+
+    with session_factory() as db:
+        rows = {url.short_code: url for url in db.scalars(select(URL))}
+        assert rows["a"].original_url == "http://example.com/a"
+        assert rows["a"].original_url_hash == url_digest("http://example.com/a")
+        assert rows["c2"].original_url == "http://example.com/c" and rows["c2"].original_url_hash is None
+        assert rows["bad"].expiration_time <= datetime.utcnow()
+        assert rows["b"].expiration_time is None
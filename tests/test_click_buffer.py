@@ -0,0 +1,52 @@
+"""
+Tests for write-behind click counting against SQLite:
+1. Clicks are aggregated in memory and written with one upsert per flush
+2. Later flushes add to the stored counts
+3. A full buffer drops clicks on new codes but keeps counting known ones
+4. Upsert rows come in short code order, so flushes lock rows in one order
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+
+from src.repositories.click_repository import ClickRepository, _click_rows
+from src.services.click_buffer import ClickBuffer
+
+
+def test_flush_aggregates_and_accumulates_clicks(session_factory):
+    buffer = ClickBuffer(enabled=True)
+
+    for _ in range(5):
+        buffer.record("abc")
+    buffer.record("xyz")
+    assert buffer.pending("abc") == 5
+    assert buffer.flush(session_factory) == 2
+    assert buffer.pending("abc") == 0
+
+    buffer.record("abc")
+    buffer.flush(session_factory)
+
+    with session_factory() as db:
+        repository = ClickRepository()
+        assert repository.get_clicks(db, "abc") == 6
+        assert repository.get_clicks(db, "xyz") == 1
+        assert repository.get_clicks(db, "missing") == 0
+    assert buffer.stats()["total_flushed"] == 7
+
+
+def test_full_buffer_drops_new_codes_only():
+    buffer = ClickBuffer(max_keys=2, enabled=True)
+    for short_code in ["a", "b", "c", "a"]:
+        buffer.record(short_code)
+    assert buffer.drain() == {"a": 2, "b": 1}
+    assert buffer.dropped == 1
+
+
+def test_click_rows_are_sorted_by_short_code():
+    clicked_at = datetime(2026, 1, 1)
+    rows = _click_rows({"zz": 1, "ab": 2, "m": 3}, clicked_at)
+    assert [row["short_code"] for row in rows] == ["ab", "m", "zz"]
+    assert rows[0] == {"short_code": "ab", "clicks": 2, "last_clicked_at": clicked_at}
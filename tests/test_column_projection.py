@@ -0,0 +1,59 @@
+"""
+Tests for the column-only read paths: redirects, dedup lookups and listing
+pages return the selected columns without loading URL instances into the
+session.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.url import URL
+from src.repositories.create_url_repository import CreateUrlRepository
+from src.repositories.get_all_urls_repository import GetAllUrlsRepository
+from src.repositories.redirect_to_url_repository import RedirectToUrlRepository
+from src.utils.url_digest import url_digest
+
+
+@pytest.fixture(autouse=True)
+def urls(db):
+    now = datetime.utcnow()
+    db.add_all([
+        URL(id=5, original_url="https://example.com/five", original_url_hash=url_digest("https://example.com/five"),
+            short_code="5"),
+        # Legacy code "a" decodes to 10, the id of a different row
+        URL(id=7, original_url="https://example.com/legacy", short_code="a"),
+        URL(id=10, original_url="https://example.com/ten", short_code="legacy10",
+            expiration_time=now - timedelta(minutes=1)),
+    ])
+    db.commit()
+    db.expunge_all()
+
+
+def test_redirect_reads_columns_only(db):
+    repository = RedirectToUrlRepository()
+    url = repository.get_redirect(db, "5")
+    assert tuple(url)[:2] == ("5", "https://example.com/five")
+    assert repository.get_redirect(db, "a").original_url == "https://example.com/legacy"
+    assert repository.get_redirect(db, "legacy10") is None
+    assert repository.get_redirect(db, "zzzzzzzzzz") is None
+    assert len(db.identity_map) == 0
+
+
+def test_dedup_and_listing_read_columns_only(db):
+    creates = CreateUrlRepository()
+    existing = creates.get_by_original_url(db, "https://example.com/five")
+    assert (existing.id, existing.short_code) == (5, "5")
+    assert creates.get_by_original_url(db, "https://example.com/other") is None
+    assert creates.exists_by_short_code(db, "a")
+
+    repository = GetAllUrlsRepository()
+    page = repository.get_urls_page(db, 2)
+    assert [row.id for row in page] == [5, 7]
+    assert [row.short_code for row in repository.get_urls_page(db, 2, after=page[-1].id)] == ["legacy10"]
+    assert len(repository.get_all_urls(db)) == 3
+    assert len(db.identity_map) == 0
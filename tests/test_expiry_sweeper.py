@@ -0,0 +1,31 @@
+"""
+Tests for the batched expiry sweeper against SQLite.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import func, select
+
+from src.models.url import URL
+from src.services.expiry_sweeper import ExpirySweeper
+
+
+def test_sweeper_purges_expired_rows_in_batches(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        for i in range(25):
+            expiration_time = now - timedelta(minutes=1) if i % 5 else now + timedelta(days=1)
+            db.add(URL(original_url=f"https://example.com/{i}", short_code=str(i), expiration_time=expiration_time))
+        db.add(URL(original_url="https://example.com/forever", short_code="forever"))
+        db.commit()
+
+    sweeper = ExpirySweeper(batch_size=7, max_batches=2, pause_seconds=0)
+    assert sweeper.run_once(session_factory) == 14  # Bounded by max_batches
+    assert sweeper.run_once(session_factory) == 6
+    assert sweeper.stats()["total_purged"] == 20
+
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(URL)) == 6
@@ -0,0 +1,101 @@
+"""
+Tests for HTTP caching of redirects: Cache-Control never outlives the link,
+conditional requests get a 304, and deleted links are purged from the CDN.
+"""
+
+import sys
+import os
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timedelta
+
+from src.api.urls import redirect_response
+from src.cache.redirect_cache import CachedUrl, RedirectCache
+from src.cache.redirect_snapshot import _expiry_seconds
+from src.services.cdn_purger import CdnPurger
+from src.services.delete_url_service import DeleteUrlService
+from src.utils.http_cache import cache_control, entity_tag, http_date, not_modified
+
+
+def test_cache_control_never_outlives_the_link():
+    assert cache_control(None, max_age=60, cdn_max_age=3600) == "public, max-age=60, s-maxage=3600"
+    assert cache_control(None, max_age=60, cdn_max_age=60) == "public, max-age=60"
+    assert cache_control(600.5, max_age=60, cdn_max_age=3600) == "public, max-age=60, s-maxage=600"
+    assert cache_control(30, max_age=60, cdn_max_age=3600, no_store_within=60) == "no-store"
+    assert cache_control(None, max_age=0, cdn_max_age=0) == "no-store"
+
+
+def test_origin_and_edge_tags_agree():
+    expires = datetime(2030, 1, 1, 12, 0, 0)
+    origin = entity_tag("abc", "https://example.com/", expires)
+    # Edge nodes only know the expiry as stored in the snapshot
+    assert origin == entity_tag("abc", "https://example.com/", _expiry_seconds(expires))
+    assert origin != entity_tag("abc", "https://example.com/other", expires)
+    assert entity_tag("abc", "https://example.com/") != origin
+
+
+def test_conditional_requests():
+    created = datetime(2026, 1, 1, 8, 30, 15, 123456)
+    etag = entity_tag("abc", "https://example.com/")
+    assert not_modified({"if-none-match": etag}, etag)
+    assert not_modified({"if-none-match": f'"other", W/{etag}'}, etag)
+    assert not not_modified({"if-none-match": '"other"'}, etag, created)
+    # If-None-Match wins over a matching If-Modified-Since
+    assert not not_modified({"if-none-match": '"other"', "if-modified-since": http_date(created)}, etag, created)
+    assert not_modified({"if-modified-since": http_date(created)}, etag, created)
+    assert not not_modified({"if-modified-since": http_date(created - timedelta(seconds=1))}, etag, created)
+    assert not not_modified({"if-modified-since": "yesterday"}, etag, created)
+
+
+def test_redirect_response_headers_and_304():
+    url = CachedUrl("cached1", "https://example.com/", datetime(2026, 1, 1), datetime.utcnow() + timedelta(hours=2))
+    response = redirect_response("cached1", url)
+    assert response.status_code == 307
+    assert response.headers["location"] == "https://example.com/"
+    # No CDN_PURGE_URL, so shared caches get no longer lifetime than browsers
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["last-modified"] == "Thu, 01 Jan 2026 00:00:00 GMT"
+    assert response.headers["surrogate-key"] == "cached1"
+
+    revalidated = redirect_response("cached1", url, {"if-none-match": response.headers["etag"]})
+    assert revalidated.status_code == 304 and revalidated.headers["etag"] == response.headers["etag"]
+    assert redirect_response("cached1", None).headers["cache-control"] == "no-store"
+
+
+class _PurgeHandler(BaseHTTPRequestHandler):
+    received = []
+
+    def do_PURGE(self):
+        self.received.append((self.path, self.headers.get("Fastly-Key")))
+        self.send_response(404 if self.path.endswith("/uncached") else 200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_deleted_links_are_purged():
+    server = HTTPServer(("127.0.0.1", 0), _PurgeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        purger = CdnPurger(f"http://127.0.0.1:{server.server_port}/api/v1/{{short_code}}", header="Fastly-Key: t0k")
+        service = DeleteUrlService(cache=RedirectCache(), purger=purger)
+        service.repository.delete_by_short_code = lambda db, short_code: short_code != "missing"
+        service.delete_url(None, "abc")
+        service.delete_url(None, "uncached")
+        service.delete_url(None, "missing")
+        assert purger.stats()["pending"] == 2
+        assert asyncio.run(purger.flush()) == 2
+        assert sorted(_PurgeHandler.received) == [("/api/v1/abc", "t0k"), ("/api/v1/uncached", "t0k")]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # The CDN is unreachable now: the code stays queued for the next flush
+    purger.purge("abc")
+    assert asyncio.run(purger.flush()) == 0
+    assert purger.stats()["pending"] == 1 and purger.failed == 1
@@ -0,0 +1,62 @@
+"""
+Tests for the block-based ID allocator, using a stand-in for a PostgreSQL
+sequence declared with INCREMENT BY 3.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.repositories.id_allocator import IdBlockAllocator
+
+
+class FakeResult(list):
+    def all(self):
+        return list(self)
+
+
+class FakeSequenceSession:
+    def __init__(self, start, increment):
+        self.value = start - increment
+        self.increment = increment
+        self.nextval_calls = 0
+
+    def scalars(self, statement):
+        # SELECT nextval(...) FROM generate_series(1, :blocks)
+        blocks = max(statement.compile().params.values())
+        return FakeResult([self.scalar(statement) for _ in range(blocks)])
+
+    def scalar(self, statement, params=None):
+        if params is not None:  # increment_by lookup
+            return self.increment
+        self.nextval_calls += 1
+        self.value += self.increment
+        return self.value
+
+
+def test_ids_come_from_reserved_blocks():
+    db = FakeSequenceSession(start=10, increment=3)
+    allocator = IdBlockAllocator()
+    ids = [allocator.next_id(db) for _ in range(7)]
+    assert ids == [10, 11, 12, 13, 14, 15, 16]
+    assert db.nextval_calls == 3
+
+
+def test_workers_never_share_ids():
+    db = FakeSequenceSession(start=1, increment=5)
+    first, second = IdBlockAllocator(), IdBlockAllocator()
+    ids = []
+    for _ in range(12):
+        ids.append(first.next_id(db))
+        ids.append(second.next_id(db))
+    assert len(ids) == len(set(ids))
+
+
+def test_bulk_ids_reserve_all_blocks_at_once():
+    db = FakeSequenceSession(start=1, increment=4)
+    allocator = IdBlockAllocator()
+    assert allocator.next_id(db) == 1
+    ids = allocator.next_ids(db, 10)
+    assert ids == [2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+    assert allocator.next_id(db) == 12
+    assert allocator.next_id(db) == 13
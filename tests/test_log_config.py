@@ -0,0 +1,41 @@
+"""
+Tests for the production logging pipeline: records are rendered as JSON on
+the listener side, and a full queue drops records instead of blocking.
+"""
+
+import sys
+import os
+import json
+import logging
+import queue
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.log_config import JsonFormatter, NonBlockingQueueHandler, SamplingFilter
+
+
+def make_record(msg, args, name="app", level=logging.INFO, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_queue_handler_defers_plain_args_and_drops_when_full():
+    log_queue = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.handle(make_record("redirect %s", ("abc",), short_code="abc"))
+    handler.handle(make_record("dropped %s", ("x",)))
+    assert handler.dropped == 1
+
+    record = log_queue.get_nowait()
+    assert record.args == ("abc",)  # Rendered by the listener, not the caller
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "redirect abc" and entry["short_code"] == "abc"
+
+
+def test_access_sampling_keeps_server_errors():
+    sampler = SamplingFilter(rate=0.0)
+    access = ("127.0.0.1:1", "GET", "/api/v1/abc", "1.1")
+    assert not sampler.filter(make_record('%s - "%s %s HTTP/%s" %d', access + (307,), "uvicorn.access"))
+    assert sampler.filter(make_record('%s - "%s %s HTTP/%s" %d', access + (503,), "uvicorn.access"))
+    entry = json.loads(JsonFormatter().format(make_record('%s - "%s %s HTTP/%s" %d', access + (307,), "uvicorn.access")))
+    assert entry["status"] == 307 and entry["path"] == "/api/v1/abc"
@@ -0,0 +1,62 @@
+"""
+Tests for the Prometheus metrics registry: counters and histograms recorded
+from several threads are merged at scrape time and rendered in text format,
+and statement timing keeps no state on the connection when a statement fails.
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+
+from src.metrics.registry import MetricsRegistry
+from src.metrics.sql import DB_QUERY_DURATION, instrument_engines
+
+
+def test_thread_shards_are_merged_when_rendered():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(100):
+            requests.inc("redirect")
+            latency.observe(0.05, "redirect")
+        latency.observe(5.0, "redirect")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="redirect"} 400' in lines
+    assert 'latency_seconds_bucket{route="redirect",le="0.1"} 400' in lines
+    assert 'latency_seconds_bucket{route="redirect",le="1.0"} 400' in lines
+    assert 'latency_seconds_bucket{route="redirect",le="+Inf"} 404' in lines
+    assert 'latency_seconds_count{route="redirect"} 404' in lines
+
+
+def _selects_timed() -> int:
+    return sum(DB_QUERY_DURATION.collect().get(("SELECT",), [0, 0.0])[:-1])
+
+
+def test_failed_statements_leave_no_timing_state_behind():
+    instrument_engines()
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        for _ in range(100):
+            with pytest.raises(IntegrityError):
+                conn.execute(text("INSERT INTO t (id) VALUES (1), (1)"))
+        selects = _selects_timed()
+        conn.execute(text("SELECT 1"))
+        assert _selects_timed() == selects + 1
+        assert not [key for key in conn.connection.info if key.startswith("metrics")]
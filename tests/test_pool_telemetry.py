@@ -0,0 +1,36 @@
+"""
+Tests for connection pool telemetry: occupancy and checkout waits are
+reported, and an exhausted pool records a timeout.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from src.db.pool import PoolTelemetry, TimedQueuePool, pool_stats
+
+
+class IsolatedTimedQueuePool(TimedQueuePool):
+    telemetry = PoolTelemetry("test", warn_seconds=10)
+
+
+def test_pool_stats_report_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=IsolatedTimedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    connection = engine.connect()
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 1 and stats["size"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    connection.close()
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2 and stats["timeouts"] == 1
+    assert stats["max_wait_seconds"] >= 0.05
@@ -0,0 +1,185 @@
+"""
+Tests for per-client rate limiting and overload shedding: token buckets refill
+and forget idle keys, the in-flight cap queues briefly and then sheds, and the
+middleware answers 429/503 with Retry-After.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from src.limits.concurrency import ConcurrencyLimiter
+from src.limits.middleware import OverloadMiddleware, RateLimitMiddleware, classify_request, client_key
+from src.limits.token_bucket import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.acquire("a")[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = limiter.acquire("a")
+    assert not allowed and abs(retry_after - 0.5) < 1e-9
+    # Other clients have their own bucket
+    assert limiter.acquire("b")[0]
+
+    clock.now += 0.5
+    assert limiter.tokens("a") == 1
+    assert limiter.acquire("a")[0] and not limiter.acquire("a")[0]
+    clock.now += 10
+    assert limiter.tokens("a") == 3
+    assert limiter.stats()["limited"] == 2
+
+
+def test_idle_keys_are_forgotten_and_key_count_is_bounded():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=3, clock=clock)
+    for i in range(3):
+        limiter.acquire(f"idle{i}")
+    clock.now += 5
+    limiter.acquire("new")
+    # The idle keys held full buckets, so dropping them changed nothing
+    assert limiter.stats()["keys"] == 1 and limiter.evictions == 0
+
+    for i in range(10):
+        limiter.acquire(f"busy{i}")
+    assert limiter.stats()["keys"] == 3 and limiter.evictions == 8
+
+
+def test_requests_are_classified_by_route():
+    assert classify_request("POST", "/api/v1/") == "create"
+    assert classify_request("POST", "/api/v1/batch") == "create"
+    assert classify_request("GET", "/api/v1/abc123") == "redirect"
+    assert classify_request("GET", "/api/v1/urls") is None
+    assert classify_request("GET", "/api/v1/stats/cache") is None
+    assert classify_request("DELETE", "/api/v1/urls/abc123") is None
+    assert classify_request("GET", "/docs") is None
+
+
+def test_client_key_prefers_configured_api_key_header():
+    scope = {"client": ("10.0.0.1", 5000), "headers": [(b"x-forwarded-for", b"1.2.3.4, 10.0.0.9")]}
+    assert client_key(scope) == "ip:10.0.0.1"
+    assert client_key(scope, trust_forwarded_for=True) == "ip:10.0.0.9"
+    scope["headers"].append((b"x-api-key", b"secret"))
+    # Unvalidated keys are ignored unless a header is configured
+    assert client_key(scope) == "ip:10.0.0.1"
+    assert client_key(scope, key_header="X-API-Key") == "key:secret"
+
+
+def test_concurrency_limiter_queues_then_sheds():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue_seconds=0.05, max_queued=1)
+        assert await limiter.acquire()
+        # Shed at once: the queue is full
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not await limiter.acquire()
+        # The queued request times out while the slot is held
+        assert not await queued
+
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        assert await waiting
+        assert limiter.in_flight == 1
+        limiter.release()
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0
+    assert stats["shed"] == 2 and stats["admitted"] == 2
+
+
+def _app(**limits):
+    app = FastAPI()
+    started = asyncio.Event()
+    finish = asyncio.Event()
+
+    @app.post("/api/v1/")
+    async def create():
+        return {"status": "success"}
+
+    @app.get("/api/v1/{short_code}")
+    async def redirect(short_code: str):
+        started.set()
+        await finish.wait()
+        return {"short_code": short_code}
+
+    if "overload" in limits:
+        app.add_middleware(OverloadMiddleware, limiter=limits["overload"])
+    if "rate" in limits:
+        app.add_middleware(RateLimitMiddleware, limiters=limits["rate"])
+    return app, started, finish
+
+
+def test_middleware_answers_429_with_retry_after():
+    async def run():
+        app, _, finish = _app(rate={"create": TokenBucketLimiter(rate=0.1, burst=2)})
+        finish.set()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [(await client.post("/api/v1/")).status_code for _ in range(3)]
+            limited = await client.post("/api/v1/")
+            # An unvalidated key does not buy a fresh bucket
+            rotated = await client.post("/api/v1/", headers={"X-API-Key": "other"})
+            redirect = await client.get("/api/v1/abc")
+        return statuses, limited, rotated, redirect
+
+    statuses, limited, rotated, redirect = asyncio.run(run())
+    assert statuses == [200, 200, 429]
+    assert limited.status_code == 429 and 1 <= int(limited.headers["retry-after"]) <= 10
+    assert rotated.status_code == 429
+    assert redirect.status_code == 200
+
+
+def test_middleware_sheds_with_503_when_saturated():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue_seconds=0.01, max_queued=10)
+        app, started, finish = _app(overload=limiter)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow = asyncio.ensure_future(client.get("/api/v1/slow"))
+            await started.wait()
+            shed = await client.get("/api/v1/fast")
+            finish.set()
+            return (await slow).status_code, shed, limiter.in_flight
+
+    slow_status, shed, in_flight = asyncio.run(run())
+    assert slow_status == 200
+    assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+    assert in_flight == 0
+
+
+def test_shed_responses_carry_cors_headers():
+    import main
+
+    # user_middleware runs outermost first: CORS must wrap the shedding middleware
+    stack = [middleware.cls.__name__ for middleware in main.app.user_middleware]
+    assert stack.index("CORSMiddleware") < stack.index("OverloadMiddleware")
+
+    async def run():
+        app, _, finish = _app(rate={"create": TokenBucketLimiter(rate=0.1, burst=1)})
+        app.add_middleware(CORSMiddleware, allow_origins=["*"], expose_headers=["Retry-After"])
+        finish.set()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"Origin": "https://app.example"}
+            await client.post("/api/v1/", headers=headers)
+            return await client.post("/api/v1/", headers=headers)
+
+    limited = asyncio.run(run())
+    assert limited.status_code == 429
+    assert limited.headers["access-control-allow-origin"] == "*"
+    assert "retry-after" in limited.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,94 @@
+"""
+Tests for read-replica routing: round-robin selection that skips failed
+replicas, redirects that fall back to the primary while a replica lags, and
+the read-your-writes cookie.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.responses import Response
+
+import src.db.replicas as replicas_module
+from src.cache.redirect_cache import RedirectCache
+from src.cache.short_code_filter import ShortCodeFilter
+from src.db.replicas import READ_YOUR_WRITES_COOKIE, ReplicaSet, remember_write, wrote_recently
+from src.models.url import Base, URL
+from src.services.redirect_to_url_service import RedirectToUrlService
+
+
+def _sqlite_replicas(tmp_path, names):
+    urls = [f"sqlite:///{tmp_path / name}" for name in names]
+    return ReplicaSet(urls, lambda url, name: create_engine(url), lambda engine: sessionmaker(bind=engine))
+
+
+def test_replicas_are_chosen_round_robin_skipping_failed_ones(tmp_path):
+    replicas = _sqlite_replicas(tmp_path, ["a.db", "b.db", "c.db"])
+    assert [replicas.choose().name for _ in range(4)] == [
+        "sync_replica_0", "sync_replica_1", "sync_replica_2", "sync_replica_0"
+    ]
+
+    replicas.mark_down(replicas.replicas[1], "connection refused")
+    assert {replicas.choose().name for _ in range(4)} == {"sync_replica_0", "sync_replica_2"}
+
+    for replica in replicas.replicas:
+        replicas.mark_down(replica, "connection refused")
+    assert replicas.choose() is None
+
+    # A passing health check puts them back without waiting for the retry delay
+    asyncio.run(replicas.check())
+    assert all(replica.healthy for replica in replicas.replicas)
+    replicas.dispose()
+
+
+def test_connection_errors_take_a_replica_out_of_rotation(tmp_path):
+    replicas = ReplicaSet(
+        [f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+        lambda url, name: create_engine(url), lambda engine: sessionmaker(bind=engine)
+    )
+    asyncio.run(replicas.check())
+    assert not replicas.replicas[0].healthy
+    assert "unable to open database file" in replicas.stats()[0]["last_error"]
+    assert replicas.choose() is None
+
+
+def test_redirect_falls_back_to_primary_when_replica_lags(tmp_path):
+    primary = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'primary.db'}"))
+    replica = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'replica.db'}"))
+    for factory in (primary, replica):
+        Base.metadata.create_all(factory.kw["bind"])
+    with primary() as db:
+        db.add(URL(original_url="https://example.com/new", short_code="new1"))
+        db.commit()
+
+    cache = RedirectCache(max_entries=100)
+    code_filter = ShortCodeFilter(enabled=False)
+    with primary() as primary_db, replica() as replica_db:
+        without_fallback = RedirectToUrlService(cache=RedirectCache(max_entries=100), code_filter=code_filter)
+        assert without_fallback.get_original_url(replica_db, "new1") is None
+
+        service = RedirectToUrlService(cache=cache, code_filter=code_filter)
+        assert service.get_original_url(replica_db, "new1", primary_db).original_url == "https://example.com/new"
+        assert service.get_original_url(replica_db, "missing", primary_db) is None
+
+
+def test_read_your_writes_cookie(monkeypatch):
+    response = Response()
+    remember_write(response)
+    assert "set-cookie" not in response.headers  # No replicas configured
+
+    monkeypatch.setattr(replicas_module, "DATABASE_REPLICA_URLS", ["sqlite:///replica.db"])
+    remember_write(response, window=10)
+    assert response.headers["set-cookie"].startswith(f"{READ_YOUR_WRITES_COOKIE}=")
+
+    value = response.headers["set-cookie"].split(";")[0].split("=")[1]
+    assert wrote_recently({READ_YOUR_WRITES_COOKIE: value})
+    assert not wrote_recently({READ_YOUR_WRITES_COOKIE: f"{time.time() - 1:.3f}"})
+    assert not wrote_recently({READ_YOUR_WRITES_COOKIE: "garbage"})
+    assert not wrote_recently({})
@@ -0,0 +1,82 @@
+"""
+Tests for the in-process redirect cache:
+1. LRU eviction by entry count and by memory budget
+2. Entries never outlive the row's expiration_time
+3. Unknown codes are cached briefly as misses
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.cache.redirect_cache import CachedUrl, RedirectCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_url(code, expires_in=None):
+    expiration_time = datetime.utcnow() + expires_in if expires_in else None
+    return CachedUrl(code, f"https://example.com/{code}", datetime.utcnow(), expiration_time)
+
+
+def test_hit_and_miss_counters():
+    cache = RedirectCache(max_entries=10, max_bytes=10**6, ttl_seconds=60, negative_ttl_seconds=5)
+    assert cache.get("a") is RedirectCache.MISS
+    cache.put(make_url("a"))
+    assert cache.get("a").original_url == "https://example.com/a"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = RedirectCache(max_entries=2, max_bytes=10**6, ttl_seconds=60)
+    cache.put(make_url("a"))
+    cache.put(make_url("b"))
+    cache.get("a")  # "b" is now least recently used
+    cache.put(make_url("c"))
+    assert cache.get("b") is RedirectCache.MISS
+    assert cache.get("a") is not RedirectCache.MISS
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_budget_eviction():
+    cache = RedirectCache(max_entries=1000, max_bytes=1000, ttl_seconds=60)
+    for i in range(20):
+        cache.put(make_url(str(i)))
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["evictions"] > 0
+
+
+def test_ttl_bounded_by_expiration_time():
+    clock = FakeClock()
+    cache = RedirectCache(max_entries=10, max_bytes=10**6, ttl_seconds=300, clock=clock)
+    cache.put(make_url("soon", expires_in=timedelta(seconds=30)))
+    clock.now += 10
+    assert cache.get("soon") is not RedirectCache.MISS
+    clock.now += 30
+    assert cache.get("soon") is RedirectCache.MISS
+
+    cache.put(make_url("gone", expires_in=timedelta(seconds=-1)))
+    assert cache.get("gone") is RedirectCache.MISS
+
+
+def test_negative_entries_and_invalidation():
+    clock = FakeClock()
+    cache = RedirectCache(max_entries=10, max_bytes=10**6, ttl_seconds=60,
+                          negative_ttl_seconds=5, clock=clock)
+    cache.put_missing("nope")
+    assert cache.get("nope") is None
+    clock.now += 6
+    assert cache.get("nope") is RedirectCache.MISS
+
+    cache.put_missing("new")
+    cache.invalidate("new")
+    assert cache.get("new") is RedirectCache.MISS
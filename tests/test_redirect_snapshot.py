@@ -0,0 +1,77 @@
+"""
+Tests for redirect snapshots: the exported file is found by binary search,
+expired and unknown codes miss, and a replaced file is swapped in.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.cache.redirect_snapshot import RedirectSnapshot, SnapshotReader, write_snapshot
+from src.commands.export_redirect_snapshot import export_redirect_snapshot
+from src.models.url import URL
+
+
+def test_lookup_finds_every_code_and_misses_others(tmp_path):
+    path = str(tmp_path / "redirects.snapshot")
+    rows = sorted((f"c{i}", f"https://example.com/{i}", None) for i in range(1000))
+    result = write_snapshot(rows, path)
+    assert result["records"] == 1000 and result["bytes"] == os.path.getsize(path)
+
+    reader = SnapshotReader(path)
+    for short_code, original_url, _ in rows:
+        assert reader.lookup(short_code) == (True, original_url)
+    assert reader.lookup("c") == (False, None)
+    assert reader.lookup("zzz") == (False, None)
+    assert reader.lookup("x" * 40) == (False, None)
+
+
+def test_expired_codes_are_found_but_not_served(tmp_path):
+    path = str(tmp_path / "redirects.snapshot")
+    expires = datetime(2030, 1, 1)
+    write_snapshot([("a", "https://example.com/a", expires)], path)
+    reader = SnapshotReader(path)
+    assert reader.lookup("a", now=expires.timestamp() - 3600 * 24)[1] == "https://example.com/a"
+    assert reader.lookup("a", now=datetime(2031, 1, 1).timestamp()) == (True, None)
+
+
+def test_unsorted_rows_are_rejected_and_leave_no_file(tmp_path):
+    path = str(tmp_path / "redirects.snapshot")
+    with pytest.raises(ValueError):
+        write_snapshot([("b", "https://b.example", None), ("a", "https://a.example", None)], path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_replaced_snapshot_is_swapped_in(tmp_path):
+    path = str(tmp_path / "redirects.snapshot")
+    write_snapshot([("a", "https://old.example", None)], path)
+    snapshot = RedirectSnapshot(path)
+    assert snapshot.load() and snapshot.lookup("a") == "https://old.example"
+    assert not snapshot.load()
+
+    write_snapshot([("a", "https://new.example", None), ("b", "https://b.example", None)], path)
+    assert snapshot.load()
+    assert snapshot.lookup("a") == "https://new.example" and snapshot.lookup("b") == "https://b.example"
+    assert snapshot.stats()["records"] == 2 and snapshot.swaps == 2
+
+
+def test_export_writes_unexpired_rows(tmp_path, session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        db.add_all([
+            URL(original_url="https://example.com/b", short_code="b"),
+            URL(original_url="https://example.com/A", short_code="A", expiration_time=now + timedelta(days=1)),
+            URL(original_url="https://example.com/gone", short_code="gone", expiration_time=now - timedelta(days=1)),
+        ])
+        db.commit()
+
+    path = str(tmp_path / "redirects.snapshot")
+    assert export_redirect_snapshot(session_factory, path, batch_size=2)["records"] == 2
+    reader = SnapshotReader(path)
+    assert reader.lookup("A")[1] == "https://example.com/A"
+    assert reader.lookup("b")[1] == "https://example.com/b"
+    assert reader.lookup("gone") == (False, None)
@@ -0,0 +1,61 @@
+"""
+Tests for the production serve mode: worker count sized to the usable CPUs,
+uvicorn options per mode, and per-process state reset in forked workers.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+import src.utils.server as server
+from src.repositories.id_allocator import url_id_allocator
+from src.services.click_buffer import click_buffer
+
+
+def test_available_cpus_honours_cgroup_quota(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    assert server.available_cpus(str(cpu_max)) == min(2, len(os.sched_getaffinity(0)))
+
+    cpu_max.write_text("max 100000\n")
+    assert server.available_cpus(str(cpu_max)) == len(os.sched_getaffinity(0))
+    assert server.available_cpus(str(tmp_path / "missing")) >= 1
+
+
+def test_prod_options_run_one_worker_per_cpu(monkeypatch):
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", 0)
+    monkeypatch.setattr(server, "available_cpus", lambda: 3)
+    options = server.server_options("prod")
+    assert options["workers"] == 3
+    assert "reload" not in options
+    assert options["loop"] in ("uvloop", "asyncio") and options["http"] in ("httptools", "h11")
+    assert options["timeout_graceful_shutdown"] == server.GRACEFUL_SHUTDOWN_SECONDS
+
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", 8)
+    assert server.server_options("prod")["workers"] == 8
+
+
+def test_dev_options_keep_single_reloading_process(monkeypatch):
+    monkeypatch.setattr(server, "LOG_MODE", "dev")
+    options = server.server_options("dev")
+    assert options["reload"] is True
+    assert "workers" not in options
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_forked_worker_drops_inherited_state():
+    url_id_allocator._next, url_id_allocator._limit = 100, 200
+    click_buffer.record("abc")
+    try:
+        pid = os.fork()
+        if pid == 0:
+            inherited = url_id_allocator.stats()["remaining_in_block"] or click_buffer.pending("abc")
+            os._exit(1 if inherited else 0)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+        assert click_buffer.pending("abc") == 1  # The parent keeps its own
+    finally:
+        url_id_allocator.reset()
+        click_buffer.drain()
@@ -0,0 +1,190 @@
+"""
+Tests for the shared redirect cache: workers share entries written in one
+pipeline, deletes reach every worker over pub/sub, new codes reach every
+worker's short code filter the same way, a subscription cut off mid-message
+is re-established, and an unreachable server sends lookups to the database. Set SHARED_CACHE_TEST_URL to run them against
+a real redis-server (a scratch database: keys are written to it).
+"""
+
+import sys
+import os
+import asyncio
+import socket
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from src.cache.redirect_cache import CachedUrl, RedirectCache
+from src.cache.resp import RespClient, read_reply_async
+from src.cache.shared_cache import SharedRedirectCache
+from src.cache.short_code_filter import ShortCodeFilter
+from src.models.url import URL
+from src.services.redirect_to_url_service import RedirectToUrlService
+from tests.resp_server import RespServer
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    if os.getenv("SHARED_CACHE_TEST_URL"):
+        yield os.environ["SHARED_CACHE_TEST_URL"]
+        return
+    server = RespServer().start()
+    yield server.url
+    server.stop()
+
+
+def _worker(url: str, **options):
+    local = RedirectCache()
+    shared = SharedRedirectCache(url, key_prefix=f"test-{os.getpid()}:", timeout_seconds=1, local=local, **options)
+    return RedirectToUrlService(cache=local, shared=shared), shared, local
+
+
+def test_entries_are_shared_between_workers(server_url, db):
+    service_a, shared_a, _ = _worker(server_url)
+    service_b, shared_b, _ = _worker(server_url)
+    expires = datetime.utcnow() + timedelta(minutes=30)
+    db.add(URL(original_url="https://example.com/shared", short_code="shared1", expiration_time=expires))
+    db.commit()
+
+    assert service_a.get_original_url(db, "shared1").original_url == "https://example.com/shared"
+    assert asyncio.run(shared_a.flush()) == 1
+    # With the row gone from the database, the answer can only come from the shared cache
+    db.execute(delete(URL))
+    db.commit()
+    url = service_b.get_original_url(db, "shared1")
+    assert (url.original_url, url.expiration_time) == ("https://example.com/shared", expires)
+    assert shared_b.stats()["hits"] == 1
+
+    # The entry expires with the link, not after the configured hour
+    ttl_ms = RespClient(server_url, 1).execute("PTTL", shared_a.key("shared1"))
+    assert 29 * 60 * 1000 < ttl_ms <= 30 * 60 * 1000
+
+
+def test_delete_reaches_every_worker(server_url):
+    _, shared_a, _ = _worker(server_url)
+    _, shared_b, local_b = _worker(server_url)
+    url = CachedUrl("deleted1", "https://example.com/deleted", datetime.utcnow())
+
+    async def run():
+        shared_b.start()
+        for _ in range(100):
+            if shared_b.subscribed:
+                break
+            await asyncio.sleep(0.01)
+        shared_a.put(url)
+        await shared_a.flush()
+        local_b.put(await shared_b.get_async("deleted1"))
+
+        await shared_a.invalidate_async("deleted1")
+        for _ in range(100):
+            if local_b.get("deleted1") is RedirectCache.MISS:
+                break
+            await asyncio.sleep(0.01)
+        # A fill read before the delete cannot bring the link back
+        shared_a.put(url)
+        await shared_a.flush()
+        found = await shared_b.get_async("deleted1")
+        await shared_b.stop()
+        return found
+
+    assert asyncio.run(run()) is None
+    assert local_b.get("deleted1") is RedirectCache.MISS
+    assert shared_b.stats()["invalidations_received"] == 1
+
+
+def test_new_codes_reach_every_workers_filter(server_url, session_factory):
+    filter_a, filter_b = ShortCodeFilter(min_capacity=1000), ShortCodeFilter(min_capacity=1000)
+    filter_a.rebuild(session_factory)
+    filter_b.rebuild(session_factory)
+    prefix = f"test-{os.getpid()}:"
+    shared_a = SharedRedirectCache(server_url, key_prefix=prefix, timeout_seconds=1,
+                                   local=RedirectCache(), code_filter=filter_a)
+    local_b = RedirectCache()
+    shared_b = SharedRedirectCache(server_url, key_prefix=prefix, timeout_seconds=1,
+                                   local=local_b, code_filter=filter_b)
+    service_b = RedirectToUrlService(cache=local_b, code_filter=filter_b, shared=shared_b)
+
+    async def run():
+        shared_b.start()
+        for _ in range(100):
+            if shared_b.subscribed:
+                break
+            await asyncio.sleep(0.01)
+        with session_factory() as db:
+            # Worker B is asked for the code before it exists
+            assert service_b.get_original_url(db, "fresh1") is None
+            local_b.put_missing("fresh1")
+            # Worker A creates it, long before B's next filter refresh
+            db.add(URL(original_url="https://example.com/fresh", short_code="fresh1"))
+            db.commit()
+            await shared_a.announce_async(["fresh1", "fresh2"])
+            for _ in range(100):
+                if filter_b.might_contain("fresh1"):
+                    break
+                await asyncio.sleep(0.01)
+            found = service_b.get_original_url(db, "fresh1")
+        await shared_b.stop()
+        return found
+
+    assert asyncio.run(run()).original_url == "https://example.com/fresh"
+    assert filter_b.might_contain("fresh2")
+    assert shared_b.stats()["announcements_received"] == 1
+    assert shared_a.stats()["announcements_sent"] == 1
+
+
+def test_unreachable_server_falls_back_to_database(db):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+    service, shared, _ = _worker(f"redis://127.0.0.1:{closed_port}/0", retry_seconds=60)
+    db.add_all([URL(original_url="https://example.com/db", short_code="db1"),
+                URL(original_url="https://example.com/db2", short_code="db2")])
+    db.commit()
+
+    assert service.get_original_url(db, "db1").original_url == "https://example.com/db"
+    assert service.get_original_url(db, "db2").original_url == "https://example.com/db2"
+    stats = shared.stats()
+    assert not stats["available"] and stats["errors"] == 1 and stats["bypassed"] == 1
+    assert stats["pending_writes"] == 0
+
+
+def test_subscription_cut_mid_message_is_reestablished():
+    connections = []
+
+    async def serve(reader, writer):
+        connections.append(writer)
+        await read_reply_async(reader)
+        writer.write(b"*3\r\n$9\r\nsubscribe\r\n$17\r\nurl-invalidations\r\n:1\r\n")
+        if len(connections) == 1:
+            # The connection drops halfway through a message's bulk string
+            writer.write(b"*3\r\n$7\r\nmessage\r\n$17\r\nurl-inva")
+            await writer.drain()
+            writer.close()
+            return
+        await reader.read()
+
+    async def run():
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        local = RedirectCache()
+        local.put(CachedUrl("stale1", "https://example.com/stale", datetime.utcnow()))
+        shared = SharedRedirectCache(f"redis://127.0.0.1:{port}/0", timeout_seconds=1, retry_seconds=0.01, local=local)
+        shared.start()
+        for _ in range(200):
+            if len(connections) == 2 and shared.subscribed:
+                break
+            await asyncio.sleep(0.01)
+        alive = not shared._tasks[1].done()
+        await shared.stop()
+        server.close()
+        for writer in connections:
+            writer.close()
+        return shared, local, alive
+
+    shared, local, alive = asyncio.run(run())
+    assert alive and shared.stats()["errors"] == 1
+    # Deletes may have been missed while the subscription was down
+    assert local.get("stale1") is RedirectCache.MISS
@@ -0,0 +1,76 @@
+"""
+Tests for the short code Bloom filter:
+1. No false negatives, and a false-positive rate near the configured target
+2. The filter is built from the table, picks up rows created elsewhere on
+   refresh, and lets the redirect service skip the database for unknown codes
+3. Clients inside their read-your-writes window bypass the filter and cached
+   misses, so a code just created on another worker resolves
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.cache.redirect_cache import RedirectCache
+from src.cache.short_code_filter import BloomFilter, ShortCodeFilter
+from src.models.url import URL
+from src.services.create_url_service import encode_base62
+from src.services.redirect_to_url_service import RedirectToUrlService
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=10000, false_positive_rate=0.01)
+    codes = [encode_base62(i) for i in range(1, 10001)]
+    for code in codes:
+        bloom.add(code)
+    assert all(code in bloom for code in codes)
+    false_positives = sum(encode_base62(i) in bloom for i in range(10001, 30001))
+    assert false_positives / 20000 < 0.02
+    assert 0.005 < bloom.estimated_fpr < 0.015
+
+
+def test_filter_short_circuits_unknown_codes(session_factory):
+    with session_factory() as db:
+        db.add_all([URL(original_url=f"https://example.com/{i}", short_code=encode_base62(i)) for i in range(1, 50)])
+        db.commit()
+
+    code_filter = ShortCodeFilter(min_capacity=1000, enabled=True)
+    assert code_filter.might_contain("zzz")  # Not built yet: everything may exist
+    code_filter.rebuild(session_factory)
+    assert all(code_filter.might_contain(encode_base62(i)) for i in range(1, 50))
+
+    with session_factory() as db:
+        db.add(URL(original_url="https://example.com/other-worker", short_code="other"))
+        db.commit()
+    code_filter.refresh(session_factory)
+    assert code_filter.might_contain("other")
+
+    with session_factory() as db:
+        service = RedirectToUrlService(cache=RedirectCache(max_entries=0), code_filter=code_filter)
+        misses = [code for code in ("nope1", "nope2", "nope3") if service.get_original_url(db, code) is None]
+        assert len(misses) == 3
+        assert service.get_original_url(db, "other").original_url == "https://example.com/other-worker"
+    stats = code_filter.stats()
+    assert stats["definite_misses"] + stats["false_positives"] == 3
+    assert stats["memory_bytes"] > 0
+
+
+def test_recent_writers_bypass_the_filter(session_factory):
+    code_filter = ShortCodeFilter(min_capacity=1000, enabled=True)
+    code_filter.rebuild(session_factory)
+    cache = RedirectCache()
+    service = RedirectToUrlService(cache=cache, code_filter=code_filter)
+
+    with session_factory() as db:
+        # Created by another worker since this worker's last refresh
+        db.add(URL(original_url="https://example.com/elsewhere", short_code="elsewhere"))
+        db.commit()
+        assert service.get_original_url(db, "elsewhere") is None
+        cache.put_missing("elsewhere")
+        url = service.get_original_url(db, "elsewhere", recent_write=True)
+        assert url.original_url == "https://example.com/elsewhere"
+        assert service.get_original_url(db, "elsewhere").original_url == "https://example.com/elsewhere"
+
+        # The filter was skipped, so a recent writer's miss is no false positive
+        assert service.get_original_url(db, "nowhere", recent_write=True) is None
+        assert code_filter.false_positives == 0
@@ -0,0 +1,48 @@
+"""
+Tests for the INSERT ... ON CONFLICT create path on SQLite:
+1. Creating the same URL twice returns the same short code
+2. URLs that only differ in normalization (host case, default port) dedup
+3. New rows get their Base62 ID as short code, never the temporary one
+4. Batch creation dedups against the table and within the batch, in input order
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import func, select
+
+from src.models.url import URL
+from src.services.create_url_service import CreateUrlService, encode_base62
+from src.services.batch_create_url_service import BatchCreateUrlService
+
+
+def test_upsert_dedups_and_encodes_ids(db):
+    service = CreateUrlService()
+    assert service.repository.supports_upsert(db)
+
+    first = service.create_short_url(db, "https://example.com/path")
+    again = service.create_short_url(db, "https://EXAMPLE.com:443/path")
+    other = service.create_short_url(db, "https://example.com/other")
+
+    assert first.short_code == again.short_code == encode_base62(first.id)
+    assert other.short_code == encode_base62(other.id) != first.short_code
+    assert db.scalar(select(func.count()).select_from(URL)) == 2
+    assert db.scalar(select(func.count()).where(URL.short_code.like("~%"))) == 0
+
+
+def test_batch_create_keeps_input_order_and_reports_errors(db):
+    existing = CreateUrlService().create_short_url(db, "https://example.com/existing")
+
+    results, summary = BatchCreateUrlService().create_short_urls(db, [
+        {"original_url": "https://example.com/new"},
+        {"original_url": "not a url"},
+        {"original_url": "https://example.com/existing"},
+        {"original_url": "https://EXAMPLE.com/new"},
+    ])
+
+    assert summary == {"created": 2, "existing": 1, "failed": 1}
+    assert [r["status"] for r in results] == ["success", "failure", "success", "success"]
+    assert results[0]["created"] and results[0]["short_code"] == results[3]["short_code"]
+    assert results[2]["short_code"] == existing.short_code and not results[2]["created"]
+    assert db.scalar(select(func.count()).where(URL.short_code.like("~%"))) == 0
@@ -0,0 +1,100 @@
+"""
+Tests for GET /urls end to end:
+1. Pages carry a next_cursor that, passed back as ?after=, walks every row
+   exactly once and is null on the last page
+2. stream=json is one GetAllUrlsResponse document across chunks (commas
+   between chunks, an empty stream, the closing "next_cursor": null)
+3. stream=ndjson is one JSON object per line, and streams honour ?after=
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.api.urls as urls_api
+import src.controllers.url_controller as url_controller_module
+from src.db.session import get_db
+from src.models.url import URL
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    # Streams open their own session rather than the request's
+    monkeypatch.setattr(urls_api, "get_sessionmaker", lambda: session_factory)
+    # Small chunks, so a handful of rows spans several of them
+    monkeypatch.setattr(url_controller_module, "STREAM_CHUNK_ROWS", 2)
+
+    def get_test_db():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(urls_api.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = get_test_db
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _add_urls(db, count: int) -> list:
+    db.add_all([URL(original_url=f"https://example.com/{i}", short_code=f"code{i}") for i in range(count)])
+    db.commit()
+    return [f"code{i}" for i in range(count)]
+
+
+def test_next_cursor_walks_every_page(client, db):
+    codes = _add_urls(db, 5)
+    seen, after, pages = [], None, 0
+    while True:
+        params = {"limit": 2} if after is None else {"limit": 2, "after": after}
+        response = client.get("/api/v1/urls", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen += [item["short_code"] for item in page["data"]]
+        pages += 1
+        after = page["next_cursor"]
+        if after is None:
+            break
+        assert after == db.query(URL.id).filter(URL.short_code == seen[-1]).scalar()
+    assert seen == codes and pages == 3
+
+    # A last page that happens to be full is followed by an empty one
+    full = client.get("/api/v1/urls", params={"limit": 5}).json()
+    assert full["next_cursor"] is not None
+    empty = client.get("/api/v1/urls", params={"limit": 5, "after": full["next_cursor"]}).json()
+    assert empty == {"status": "success", "data": [], "next_cursor": None, "message": None}
+
+
+def test_json_stream_is_one_document_across_chunks(client, db):
+    response = client.get("/api/v1/urls", params={"stream": "json"})
+    assert response.headers["content-type"].startswith("application/json")
+    assert json.loads(response.text) == {"status": "success", "data": [], "next_cursor": None, "message": None}
+
+    codes = _add_urls(db, 5)
+    response = client.get("/api/v1/urls", params={"stream": "json"})
+    body = response.text
+    assert body.endswith('], "next_cursor": null, "message": null}')
+    document = json.loads(body)
+    assert [item["short_code"] for item in document["data"]] == codes
+    assert document["next_cursor"] is None
+    item = document["data"][0]
+    assert item["short_url"] == "http://testserver/api/v1/code0" and item["expires_at"] is None
+
+
+def test_ndjson_stream_has_one_object_per_line(client, db):
+    assert client.get("/api/v1/urls", params={"stream": "ndjson"}).text == ""
+
+    codes = _add_urls(db, 5)
+    response = client.get("/api/v1/urls", params={"stream": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text.endswith("\n")
+    lines = response.text.splitlines()
+    assert [json.loads(line)["short_code"] for line in lines] == codes
+
+    after = db.query(URL.id).filter(URL.short_code == "code1").scalar()
+    rest = client.get("/api/v1/urls", params={"stream": "ndjson", "after": after}).text.splitlines()
+    assert [json.loads(line)["short_code"] for line in rest] == codes[2:]
@@ -0,0 +1,217 @@
+"""
+Tests for the time-partitioned urls table:
+1. Partition names, DDL and bounds for one partition per UTC day
+2. The maintenance command creates upcoming partitions and retires only past
+   partitions whose links have all expired (dropped, or archived)
+3. Creates on a partitioned table dedup atomically through url_digests: a
+   digest held by a deleted or expired link is taken over, and expired
+   digests are purged
+4. Canonicalizing rows there moves their claims to the new digest
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select, text, update
+
+from src.commands.canonicalize_urls import canonicalize_existing_urls
+from src.commands.manage_url_partitions import manage_url_partitions
+from src.models.url import URL, URLDigest
+from src.repositories.create_url_repository import CreateUrlRepository
+from src.repositories.id_allocator import IdBlockAllocator
+from src.repositories.url_partition_repository import UrlPartitionRepository
+from src.services.batch_create_url_service import BatchCreateUrlService
+from src.services.create_url_service import CreateUrlService
+from src.utils.url_digest import url_digest
+from src.utils.url_partitions import create_partition_sql, days_to_create, parse_bounds, partition_name
+
+
+@pytest.fixture
+def partitioned_db(db):
+    """Session on urls with the non-unique indexes migration f3c9a1d5b720 leaves"""
+    for column in ("short_code", "original_url_hash"):
+        db.execute(text(f"DROP INDEX ix_urls_{column}"))
+        db.execute(text(f"CREATE INDEX ix_urls_{column} ON urls ({column})"))
+    db.commit()
+    return db
+
+
+class PartitionedTable(UrlPartitionRepository):
+    """Catalog of a partitioned urls table held in memory: day -> expiration times"""
+
+    def __init__(self, days=None):
+        super().__init__()
+        self.days = dict(days or {})
+        self.archived = []
+
+    def is_partitioned(self, db) -> bool:
+        return True
+
+    async def is_partitioned_async(self, db) -> bool:
+        return True
+
+    def list_partitions(self, db):
+        partitions = [{"name": partition_name(day), "start": datetime(day.year, day.month, day.day),
+                       "end": datetime(day.year, day.month, day.day) + timedelta(days=1),
+                       "rows": len(rows)} for day, rows in sorted(self.days.items())]
+        return partitions + [{"name": "urls_default", "start": None, "end": None, "rows": 0}]
+
+    def create_partition(self, db, day):
+        self.days.setdefault(day, [])
+
+    def count_default_rows(self, db):
+        return 0
+
+    def is_fully_expired(self, db, name, now):
+        rows = next(rows for day, rows in self.days.items() if partition_name(day) == name)
+        return all(expires is not None and expires <= now for expires in rows)
+
+    def drop_partition(self, db, name):
+        self.days = {day: rows for day, rows in self.days.items() if partition_name(day) != name}
+
+    def archive_partition(self, db, name, schema):
+        self.drop_partition(db, name)
+        self.archived.append(f"{schema}.{name}")
+
+
+class SequenceIds(IdBlockAllocator):
+    """Ids allocated up front, as urls_id_seq hands them out on PostgreSQL"""
+
+    def __init__(self):
+        super().__init__()
+        self.last = 0
+
+    def is_supported(self, db) -> bool:
+        return True
+
+    def next_id(self, db) -> int:
+        self.last += 1
+        return self.last
+
+    def next_ids(self, db, count):
+        return [self.next_id(db) for _ in range(count)]
+
+
+def test_daily_partition_ddl_and_bounds():
+    day = date(2026, 10, 17)
+    assert partition_name(day) == "urls_p20261017"
+    assert create_partition_sql(day) == (
+        "CREATE TABLE IF NOT EXISTS urls_p20261017 PARTITION OF urls "
+        "FOR VALUES FROM ('2026-10-17') TO ('2026-10-18')"
+    )
+    assert parse_bounds("FOR VALUES FROM ('2026-10-17 00:00:00') TO ('2026-10-18 00:00:00')") == (
+        datetime(2026, 10, 17), datetime(2026, 10, 18)
+    )
+    assert parse_bounds("DEFAULT") is None
+    assert parse_bounds("FOR VALUES FROM (MINVALUE) TO ('2026-10-18 00:00:00')") is None
+    assert days_to_create([day, date(2026, 10, 19)], day, 2) == [date(2026, 10, 18)]
+
+
+def test_command_precreates_and_retires_expired_partitions(session_factory):
+    now = datetime(2026, 10, 17, 12, 0)
+    table = PartitionedTable({
+        date(2026, 10, 15): [datetime(2026, 10, 16, 9, 0), datetime(2026, 10, 16, 10, 0)],
+        # One link still live, one that never expires
+        date(2026, 10, 16): [datetime(2026, 10, 16, 9, 0), datetime(2026, 10, 18)],
+        date(2026, 10, 14): [None],
+        # Today's links have expired, but the day is not over yet
+        date(2026, 10, 17): [datetime(2026, 10, 17, 11, 0)],
+    })
+
+    dry = manage_url_partitions(session_factory, days_ahead=2, archive_schema="", dry_run=True,
+                                now=now, repository=table)
+    assert dry["created"] == ["urls_p20261018", "urls_p20261019"] and dry["retired"] == ["urls_p20261015"]
+    assert len(table.days) == 4
+
+    result = manage_url_partitions(session_factory, days_ahead=2, archive_schema="", now=now,
+                                   repository=table)
+    assert result["retired"] == ["urls_p20261015"]
+    assert result["kept"] == ["urls_p20261014", "urls_p20261016"] and not result["failed"]
+    assert sorted(table.days) == [date(2026, 10, 14), date(2026, 10, 16), date(2026, 10, 17),
+                                  date(2026, 10, 18), date(2026, 10, 19)]
+
+    # The next day the last link of the 16th has expired too; archive this time
+    result = manage_url_partitions(session_factory, days_ahead=2, archive_schema="urls_archive",
+                                   now=datetime(2026, 10, 18, 1, 0), repository=table)
+    assert result["created"] == ["urls_p20261020"]
+    assert result["retired"] == ["urls_p20261016", "urls_p20261017"]
+    assert table.archived == ["urls_archive.urls_p20261016", "urls_archive.urls_p20261017"]
+
+
+def test_partitioned_table_dedups_through_url_digests(partitioned_db):
+    db = partitioned_db
+    service = CreateUrlService()
+    service.repository = CreateUrlRepository(id_allocator=SequenceIds(), partitions=PartitionedTable())
+    assert service.repository.supports_upsert(db)
+
+    first = service.create_short_url(db, "https://example.com/partitioned")
+    again = service.create_short_url(db, "https://EXAMPLE.com/partitioned")
+    assert again.short_code == first.short_code
+    assert db.scalar(select(URLDigest.short_code)) == first.short_code
+
+    batch = BatchCreateUrlService()
+    batch.repository = service.repository
+    results, summary = batch.create_short_urls(db, [
+        {"original_url": "https://example.com/partitioned"},
+        {"original_url": "https://example.com/batch"},
+    ])
+    assert summary == {"created": 1, "existing": 1, "failed": 0}
+    assert results[0]["short_code"] == first.short_code
+    assert db.scalar(select(func.count()).select_from(URL)) == 2
+    assert db.scalar(select(func.count()).select_from(URLDigest)) == 2
+
+    # Deleting the link leaves its digest dangling; the next create releases it
+    db.execute(delete(URL).where(URL.short_code == first.short_code))
+    db.commit()
+    replaced = service.create_short_url(db, "https://example.com/partitioned", expiration_minutes=5)
+    assert replaced.short_code != first.short_code
+
+    # Once that link has expired its digest is taken over, though the row remains
+    past = datetime.utcnow() - timedelta(minutes=1)
+    db.execute(update(URL).where(URL.short_code == replaced.short_code).values(expiration_time=past))
+    db.execute(update(URLDigest).where(URLDigest.short_code == replaced.short_code).values(expiration_time=past))
+    db.commit()
+    renewed = service.create_short_url(db, "https://example.com/partitioned").short_code
+    assert renewed not in (first.short_code, replaced.short_code)
+    assert service.repository.get_by_original_url(db, "https://example.com/partitioned").short_code == renewed
+    assert db.scalar(select(func.count()).select_from(URL)) == 3
+
+    # Expired digests are purged by the partition command
+    db.execute(update(URLDigest).where(URLDigest.short_code == renewed).values(expiration_time=past))
+    db.commit()
+    assert PartitionedTable().delete_expired_digests(db, datetime.utcnow(), batch_size=1) == 1
+    assert db.scalar(select(func.count()).select_from(URLDigest)) == 1
+
+
+def test_canonicalizing_moves_claims_in_url_digests(partitioned_db, session_factory):
+    db = partitioned_db
+    created_at = datetime.utcnow()
+    for url_id, short_code, original_url in [
+        (1, "a", "example.com/a"),
+        (2, "c", "http://example.com/c"),
+        (3, "c2", "example.com/c"),
+    ]:
+        digest = url_digest(original_url)
+        db.add(URL(id=url_id, short_code=short_code, original_url=original_url,
+                   original_url_hash=digest, created_at=created_at))
+        db.add(URLDigest(original_url_hash=digest, url_id=url_id, created_at=created_at, short_code=short_code))
+    db.commit()
+
+    totals = canonicalize_existing_urls(session_factory, batch_size=2, partitions=PartitionedTable())
+    assert totals == {"scanned": 3, "canonicalized": 2, "hash_conflicts": 1, "expired_invalid": 0}
+
+    db.expire_all()
+    claims = dict(db.execute(select(URLDigest.original_url_hash, URLDigest.short_code)).all())
+    assert claims == {url_digest("http://example.com/a"): "a", url_digest("http://example.com/c"): "c"}
+    assert db.scalar(select(URL.original_url_hash).where(URL.short_code == "c2")) is None
+
+    # The canonical URL now dedups to the canonicalized row
+    service = CreateUrlService()
+    service.repository = CreateUrlRepository(id_allocator=SequenceIds(), partitions=PartitionedTable())
+    service.repository.id_allocator.last = 3
+    assert service.create_short_url(db, "http://example.com/a").short_code == "a"
+    assert db.scalar(select(func.count()).select_from(URL)) == 3